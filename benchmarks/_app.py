@@ -0,0 +1,171 @@
+"""
+### 🐀 ⇝ `_app.py` - synthetic pest applications for benchmarks
+
+Generates pest apps of any shape: `modules` feature modules (imported by a root module), each
+with `controllers` controllers of `handlers` handlers. Every handler gets a service injected
+which depends on a chain of `depth` services (provided by the root module with the given
+`scope`), and can be protected by `guards` guards. `middlewares` class middlewares (`http`, going
+through `BaseHTTPMiddleware`, or pure `asgi` ones) wrap the whole app.
+"""
+
+from dataclasses import asdict, dataclass
+from inspect import Parameter, Signature
+from typing import Any, Callable, Dict, List, Literal, Tuple
+
+from fastapi import Request, Response
+from starlette.types import ASGIApp, Receive, Send
+from starlette.types import Scope as ASGIScope
+
+from pest import (
+    ClassProvider,
+    Guard,
+    GuardCb,
+    GuardCtx,
+    Pest,
+    Scope,
+    controller,
+    get,
+    module,
+    use_guards,
+)
+from pest.core.application import PestApplication
+from pest.di import inject
+from pest.middleware.base import CallNext, PestASGIMiddleware, PestMiddleware
+
+from ._asgi import Request as Call
+
+try:
+    from typing import Annotated
+except ImportError:
+    from typing_extensions import Annotated
+
+SCOPES = {
+    'singleton': Scope.SINGLETON,
+    'scoped': Scope.SCOPED,
+    'transient': Scope.TRANSIENT,
+}
+
+
+@dataclass
+class AppSpec:
+    """🐀 ⇝ shape of a synthetic app"""
+
+    modules: int = 1
+    controllers: int = 1
+    '''controllers per module'''
+    handlers: int = 1
+    '''handlers per controller'''
+    depth: int = 1
+    '''length of the chain of services injected into each handler'''
+    scope: Literal['singleton', 'scoped', 'transient'] = 'singleton'
+    '''scope of the injected services'''
+    guards: int = 0
+    '''guards per handler'''
+    middlewares: int = 0
+    middleware_kind: Literal['http', 'asgi'] = 'asgi'
+
+    @property
+    def routes(self) -> int:
+        return self.modules * self.controllers * self.handlers
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'routes': self.routes}
+
+
+class AllowGuard(Guard):
+    def can_activate(self, request: Request, *, context: GuardCtx, set_result: GuardCb) -> bool:
+        return True
+
+
+class HttpMiddleware(PestMiddleware):
+    async def use(self, request: Request, call_next: CallNext) -> Response:
+        return await call_next(request)
+
+
+class AsgiMiddleware(PestASGIMiddleware):
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: ASGIScope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
+
+
+def _services(spec: AppSpec) -> List[type]:
+    """a chain of services, each one depending on the previous one"""
+    services: List[type] = []
+    for i in range(spec.depth):
+        annotations = {'dependency': services[-1]} if services else {}
+        services.append(type(f'Service{i}', (), {'__annotations__': annotations}))
+    return services
+
+
+def _handler(name: str, service: type) -> Callable[..., Any]:
+    def handler(*args: Any, **kwargs: Any) -> dict:
+        return {'id': kwargs['id']}
+
+    handler.__name__ = name
+    setattr(
+        handler,
+        '__signature__',
+        Signature(
+            [
+                Parameter('self', Parameter.POSITIONAL_OR_KEYWORD),
+                Parameter('id', Parameter.POSITIONAL_OR_KEYWORD, annotation=int),
+                Parameter(
+                    'service',
+                    Parameter.POSITIONAL_OR_KEYWORD,
+                    annotation=Annotated[service, inject],
+                ),
+            ]
+        ),
+    )
+    return handler
+
+
+def controller_class(spec: AppSpec, name: str, service: type) -> type:
+    """a controller with `spec.handlers` handlers (`GET /<name>/item<k>/{id}`)"""
+    guards = [type(f'{name}Guard{g}', (AllowGuard,), {}) for g in range(spec.guards)]
+    handlers: Dict[str, Any] = {}
+    for k in range(spec.handlers):
+        handler = get(f'/item{k}/{{id}}')(_handler(f'item{k}', service))
+        if guards:
+            handler = use_guards(*guards)(handler)
+        handlers[f'item{k}'] = handler
+
+    return controller(f'/{name.lower()}')(type(f'{name}Controller', (), handlers))
+
+
+def synthetic_app(spec: AppSpec) -> PestApplication:
+    """creates a pest app with the given shape"""
+    services = _services(spec)
+    scope = SCOPES[spec.scope]
+
+    modules = []
+    for m in range(spec.modules):
+        controllers = [
+            controller_class(spec, f'M{m}C{c}', services[-1]) for c in range(spec.controllers)
+        ]
+        modules.append(module(controllers=controllers)(type(f'Module{m}', (), {})))
+
+    root = module(
+        imports=modules,
+        providers=[ClassProvider(provide=svc, use_class=svc, scope=scope) for svc in services],
+    )(type('RootModule', (), {}))
+
+    middleware = HttpMiddleware if spec.middleware_kind == 'http' else AsgiMiddleware
+    return Pest.create(
+        root,
+        middleware=[type(f'Middleware{i}', (middleware,), {}) for i in range(spec.middlewares)],
+    )
+
+
+def calls(spec: AppSpec, limit: int = 100) -> List[Call]:
+    """up to `limit` requests spread over the routes of a synthetic app"""
+    routes: List[Tuple[int, int, int]] = [
+        (m, c, k)
+        for m in range(spec.modules)
+        for c in range(spec.controllers)
+        for k in range(spec.handlers)
+    ]
+    step = max(1, len(routes) // limit)
+    return [('GET', f'/m{m}c{c}/item{k}/{i}') for i, (m, c, k) in enumerate(routes[::step][:limit])]
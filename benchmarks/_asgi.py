@@ -0,0 +1,117 @@
+"""
+### 🐀 ⇝ `_asgi.py` - minimal ASGI driver for benchmarks
+
+Drives an ASGI application in-process, without sockets nor `TestClient` (whose thread portal
+would dominate the measurements), so that what gets measured is the framework itself.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+from starlette.types import ASGIApp, Message
+
+Request = Tuple[str, str]
+'''🐀 ⇝ (method, path) tuple'''
+
+
+@asynccontextmanager
+async def lifespan(app: ASGIApp) -> AsyncIterator[None]:
+    """runs the startup/shutdown lifespan events of an ASGI application"""
+    startup_done = asyncio.Event()
+    shutdown = asyncio.Event()
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    failure: List[Message] = []
+
+    async def receive() -> Message:
+        if messages[0]['type'] == 'lifespan.shutdown':
+            await shutdown.wait()
+        return messages.pop(0)
+
+    async def send(message: Message) -> None:
+        if message['type'].endswith('.failed'):
+            failure.append(message)
+        if message['type'].startswith('lifespan.startup'):
+            startup_done.set()
+
+    task = asyncio.ensure_future(app({'type': 'lifespan', 'state': {}}, receive, send))
+    await startup_done.wait()
+    if failure:
+        raise RuntimeError(failure[0].get('message', 'lifespan startup failed'))
+
+    try:
+        yield
+    finally:
+        shutdown.set()
+        await task
+
+
+def http_scope(method: str, path: str) -> Dict[str, Any]:
+    """creates a bare http scope for a request"""
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'bench')],
+        'client': ('127.0.0.1', 1234),
+        'server': ('bench', 80),
+        'state': {},
+    }
+
+
+async def request(app: ASGIApp, method: str, path: str) -> int:
+    """performs a single request against an ASGI application and returns the status code"""
+    status = 0
+    request_sent = False
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if request_sent:
+            # nothing else will come, just wait until the app stops listening
+            await asyncio.Event().wait()
+        request_sent = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await app(http_scope(method, path), receive, send)
+    return status
+
+
+async def throughput(
+    app: ASGIApp, requests: List[Request], *, duration: float = 1.0, warmup: int = 50
+) -> float:
+    """
+    sequentially sends the given requests (round robin) for `duration` seconds and returns the
+    achieved requests per second
+    """
+    for i in range(warmup):
+        method, path = requests[i % len(requests)]
+        status = await request(app, method, path)
+        if status >= 400:
+            raise RuntimeError(f'{method} {path} responded with {status}')
+
+    count = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        method, path = requests[count % len(requests)]
+        await request(app, method, path)
+        count += 1
+
+    return count / (time.perf_counter() - start)
+
+
+def run(main: Callable[[], Any]) -> Any:
+    """runs a benchmark's main coroutine function"""
+    return asyncio.run(main())
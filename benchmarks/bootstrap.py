@@ -0,0 +1,65 @@
+"""
+### 🐀 ⇝ `bootstrap.py` - application bootstrap benchmark
+
+Measures how long it takes to start (run the startup lifespan of) a synthetic app with 500
+controllers of 4 handlers each, spread over 50 modules, and how long a `get_meta` lookup of a
+handler's `HandlerMeta` takes when the record is stored as is and with a dacite conversion per
+call.
+
+Usage: `python -m benchmarks.bootstrap [--controllers 500] [--rounds 3]`
+"""
+
+import argparse
+import time
+from typing import Any
+
+from pest.metadata.meta import META_KEY, get_meta
+from pest.metadata.types.handler_meta import HandlerMeta
+
+from ._app import AppSpec, controller_class, synthetic_app
+from ._asgi import lifespan, run
+
+HANDLERS = 4
+CONTROLLERS_PER_MODULE = 10
+
+
+def spec(controllers: int) -> AppSpec:
+    return AppSpec(
+        modules=max(1, controllers // CONTROLLERS_PER_MODULE),
+        controllers=min(controllers, CONTROLLERS_PER_MODULE),
+        handlers=HANDLERS,
+    )
+
+
+def lookup(target: Any, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        get_meta(target, HandlerMeta)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(controllers: int, rounds: int) -> None:
+    print(f'{"round": <8}{"routes": >8}{"startup (ms)": >16}')
+
+    for i in range(rounds):
+        application = synthetic_app(spec(controllers))
+        start = time.perf_counter()
+        async with lifespan(application):
+            elapsed = time.perf_counter() - start
+            routes = len(application.routes)
+        print(f'{i + 1: <8}{routes: >8}{elapsed * 1e3: >16.2f}')
+
+    handler = controller_class(spec(1), 'Lookup', object).item0
+    uncached = type('Uncached', (), {META_KEY: dict(getattr(handler, META_KEY))})
+    print(f'\n{"get_meta(handler, HandlerMeta)": <34}{"µs/call": >10}')
+    print(f'{"stored record": <34}{lookup(handler, 10_000): >10.2f}')
+    print(f'{"dacite conversion": <34}{lookup(uncached, 10_000): >10.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--controllers', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    run(lambda: main(args.controllers, args.rounds))
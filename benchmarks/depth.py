@@ -0,0 +1,42 @@
+"""
+### 🐀 ⇝ `depth.py` - module tree depth benchmark
+
+Measures how long it takes to resolve, from the deepest module of a chain of modules, a service
+that depends on a singleton provided by the root module, for depths from 1 to 20. Since modules
+are linked straight to the module that owns a provider, the cost should stay flat.
+
+Usage: `python -m benchmarks.depth [--iterations 2000]`
+"""
+
+import argparse
+import time
+
+from pest.core.module import setup_module
+from tests.cfg.test_modules.deep_tree import LeafConsumer, deep_module_tree, deepest
+
+from ._asgi import run
+
+DEPTHS = [1, 2, 5, 10, 15, 20]
+
+
+async def main(iterations: int) -> None:
+    print(f'{"depth": <8}{"µs/resolution": >16}')
+
+    for depth in DEPTHS:
+        leaf = deepest(await setup_module(deep_module_tree(depth)))
+        await leaf.aget(LeafConsumer)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await leaf.aget(LeafConsumer)
+        elapsed = time.perf_counter() - start
+
+        print(f'{depth: <8}{elapsed / iterations * 1e6: >16.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    run(lambda: main(args.iterations))
@@ -0,0 +1,64 @@
+"""
+### 🐀 ⇝ `hello.py` - hello world benchmark
+
+Measures the throughput (requests/s) of a hello world handler served by pest and by a plain
+FastAPI app, to keep the per-request overhead that pest adds on top of FastAPI measured.
+
+Usage: `python -m benchmarks.hello [--duration 1.0] [--rounds 3]`
+"""
+
+import argparse
+from typing import Any
+
+from fastapi import FastAPI
+
+from pest import Pest, controller, get, module
+
+from ._asgi import lifespan, run, throughput
+
+
+def pest_app() -> Any:
+    @controller('/hello')
+    class HelloController:
+        @get('/')
+        async def hello(self) -> dict:
+            return {'hello': 'world'}
+
+    @module(controllers=[HelloController])
+    class HelloModule:
+        pass
+
+    return Pest.create(HelloModule)
+
+
+def fastapi_app() -> Any:
+    app = FastAPI()
+
+    @app.get('/hello/')
+    async def hello() -> dict:
+        return {'hello': 'world'}
+
+    return app
+
+
+async def main(duration: float, rounds: int) -> None:
+    print(f'{"round": <8}{"pest (req/s)": >16}{"fastapi (req/s)": >18}{"ratio": >10}')
+
+    for i in range(rounds):
+        results = []
+        for factory in (pest_app, fastapi_app):
+            app = factory()
+            async with lifespan(app):
+                results.append(await throughput(app, [('GET', '/hello/')], duration=duration))
+
+        pest, fastapi = results
+        print(f'{i + 1: <8}{pest: >16,.0f}{fastapi: >18,.0f}{pest / fastapi: >10.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=1.0)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    run(lambda: main(args.duration, args.rounds))
@@ -0,0 +1,100 @@
+"""
+### 🐀 ⇝ `injection.py` - handler injection benchmark
+
+Measures the throughput (requests/s) of a handler with 1, 5 and 20 parameters injected by pest
+(`Annotated[Service, inject]`), resolved from a root module while the controller lives three
+modules deep. A plain FastAPI app using `Depends` for the same amount of parameters is measured
+as a reference.
+
+Usage: `python -m benchmarks.injection [--duration 1.0]`
+"""
+
+import argparse
+from inspect import Parameter, Signature
+from typing import Any, Callable, List
+
+from fastapi import Depends, FastAPI
+
+from pest import Pest, controller, get, module
+from pest.di import inject
+
+from ._asgi import lifespan, run, throughput
+
+try:
+    from typing import Annotated
+except ImportError:
+    from typing_extensions import Annotated
+
+PARAMS = [1, 5, 20]
+
+
+def _services(n: int) -> List[type]:
+    return [type(f'Service{i}', (), {}) for i in range(n)]
+
+
+def _endpoint(parameters: List[Parameter]) -> Callable[..., Any]:
+    def endpoint(*args: Any, **kwargs: Any) -> dict:
+        return {'injected': len(kwargs)}
+
+    setattr(endpoint, '__signature__', Signature(parameters))
+    return endpoint
+
+
+def pest_app(n: int) -> Any:
+    services = _services(n)
+
+    handler = _endpoint(
+        [Parameter('self', Parameter.POSITIONAL_OR_KEYWORD)]
+        + [
+            Parameter(f's{i}', Parameter.KEYWORD_ONLY, annotation=Annotated[svc, inject])
+            for i, svc in enumerate(services)
+        ]
+    )
+    ctrl = controller('/bench')(type('BenchController', (), {'handler': get('/')(handler)}))
+
+    leaf = module(controllers=[ctrl])(type('LeafModule', (), {}))
+    middle = module(imports=[leaf])(type('MiddleModule', (), {}))
+    root = module(imports=[middle], providers=services)(type('RootModule', (), {}))
+
+    return Pest.create(root)
+
+
+def fastapi_app(n: int) -> Any:
+    services = [svc() for svc in _services(n)]
+    app = FastAPI()
+
+    def provider(instance: Any) -> Callable[[], Any]:
+        async def dependency() -> Any:
+            return instance
+
+        return dependency
+
+    handler = _endpoint(
+        [
+            Parameter(f's{i}', Parameter.KEYWORD_ONLY, default=Depends(provider(svc)))
+            for i, svc in enumerate(services)
+        ]
+    )
+    app.get('/bench')(handler)
+    return app
+
+
+async def main(duration: float) -> None:
+    print(f'{"params": <8}{"pest (req/s)": >16}{"fastapi (req/s)": >18}')
+
+    for n in PARAMS:
+        results = []
+        for factory in (pest_app, fastapi_app):
+            app = factory(n)
+            async with lifespan(app):
+                results.append(await throughput(app, [('GET', '/bench')], duration=duration))
+
+        print(f'{n: <8}{results[0]: >16,.0f}{results[1]: >18,.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=1.0)
+    args = parser.parse_args()
+
+    run(lambda: main(args.duration))
@@ -0,0 +1,89 @@
+"""
+### 🐀 ⇝ `routing.py` - route dispatch benchmark
+
+Measures how long it takes to find the route of a request in synthetic route tables of 100, 1k
+and 10k routes (half static, half parameterized), with starlette's linear scan (a regex per
+route) and with pest's compiled `RouteIndex`. Matched paths are the worst case for the linear
+scan: the last static route, the last parameterized one (with a trailing slash) and a 404.
+
+Usage: `python -m benchmarks.routing [--iterations 200]`
+"""
+
+import argparse
+import time
+from typing import Callable, List, Optional
+
+from starlette.responses import PlainTextResponse
+from starlette.routing import BaseRoute, Match, Route
+from starlette.types import Scope
+
+from pest.utils.fastapi.dispatch import RouteIndex
+
+SIZES = [100, 1_000, 10_000]
+
+
+def endpoint(request: object) -> PlainTextResponse:
+    return PlainTextResponse('ok')
+
+
+def route_table(size: int) -> List[BaseRoute]:
+    routes: List[BaseRoute] = []
+    for i in range(size // 2):
+        routes.append(Route(f'/resource{i}/items', endpoint, methods=['GET']))
+        routes.append(Route(f'/resource{i}/items/{{id:int}}', endpoint, methods=['GET']))
+    return routes
+
+
+def scope(path: str) -> Scope:
+    return {'type': 'http', 'method': 'GET', 'path': path, 'root_path': ''}
+
+
+def linear(routes: List[BaseRoute]) -> Callable[[Scope], Optional[BaseRoute]]:
+    def match(scope: Scope) -> Optional[BaseRoute]:
+        for route in routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return route
+        return None
+
+    return match
+
+
+def indexed(routes: List[BaseRoute]) -> Callable[[Scope], Optional[BaseRoute]]:
+    index = RouteIndex()
+    index.compile(routes)
+    return lambda scope: index.match(scope)[0]
+
+
+def measure(match: Callable[[Scope], Optional[BaseRoute]], path: str, iterations: int) -> float:
+    request = scope(path)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        match(request)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    print(f'{"routes": <8}{"path": <28}{"linear (µs)": >14}{"index (µs)": >14}')
+
+    for size in SIZES:
+        routes = route_table(size)
+        last = size // 2 - 1
+        paths = [f'/resource{last}/items', f'/resource{last}/items/42/', '/missing']
+
+        start = time.perf_counter()
+        matchers = [linear(routes), indexed(routes)]
+        compile_ms = (time.perf_counter() - start) * 1e3
+
+        for path in paths:
+            results = [measure(match, path, iterations) for match in matchers]
+            print(f'{size: <8}{path: <28}{results[0]: >14.2f}{results[1]: >14.2f}')
+
+        print(f'{size: <8}{"(index compile, ms)": <28}{"": >14}{compile_ms: >14.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    main(args.iterations)
@@ -0,0 +1,136 @@
+"""
+### 🐀 ⇝ `schedule.py` - cron scheduler benchmark
+
+Registers 10, 1k and 10k cron jobs in the scheduler engine, and in one loop task per job (the
+way jobs used to be run, recomputing the cron expression on every iteration), and measures:
+- `register (ms)`: time until every job is waiting for its first run
+- `memory (KiB)`: memory allocated by the registered jobs (and their tasks)
+- `tasks`: number of tasks in the event loop while the jobs wait for their next run
+- `idle cpu (ms/s)`: cpu time per second while no job is due
+- `busy cpu (ms/s)`: cpu time per second while every job fires every second
+- `runs/s`: job runs per second while every job fires every second
+
+Usage: `python -m benchmarks.schedule [--jobs 10 1000 10000] [--window 2.0]`
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from pest.schedule.module.services.scheduler_engine import CronJob, SchedulerEngine
+from pest.schedule.module.services.scheduler_explorer import get_delta, schedule_of
+
+from ._asgi import run
+
+IDLE = '0 0 1 1 *'  # once a year
+BUSY = '* * * * * *'  # every second
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.runs = 0
+
+    async def job(self) -> None:
+        self.runs += 1
+
+
+def engine_jobs(count: int, cron: str, counter: Counter) -> Callable[[], Any]:
+    engine = SchedulerEngine()
+    for i in range(count):
+        engine.add(CronJob(f'job{i}', counter.job, schedule_of(cron)))
+    engine.start()
+
+    def stop() -> None:
+        if engine.dispatcher.task is not None:
+            engine.dispatcher.task.cancel()
+
+    return stop
+
+
+def loop_jobs(count: int, cron: str, counter: Counter) -> Callable[[], Any]:
+    async def loop() -> None:
+        while True:
+            await asyncio.sleep(get_delta(cron))
+            await counter.job()
+            await asyncio.sleep(0.5)
+
+    tasks = [asyncio.ensure_future(loop()) for _ in range(count)]
+
+    def stop() -> None:
+        for task in tasks:
+            task.cancel()
+
+    return stop
+
+
+MODES: Dict[str, Callable[[int, str, Counter], Callable[[], Any]]] = {
+    'engine': engine_jobs,
+    'loop per job': loop_jobs,
+}
+
+
+async def measure(mode: str, count: int, window: float) -> Dict[str, float]:
+    register = MODES[mode]
+    counter = Counter()
+
+    gc.collect()
+    tracemalloc.start()
+    stop = register(count, IDLE, counter)
+    await asyncio.sleep(0)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stop()
+
+    # jobs are registered once every one of them is waiting for its first run
+    start = time.perf_counter()
+    stop = register(count, IDLE, counter)
+    await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    tasks = len(asyncio.all_tasks()) - 1
+
+    cpu = time.process_time()
+    await asyncio.sleep(window)
+    idle = (time.process_time() - cpu) / window
+    stop()
+
+    stop = register(count, BUSY, counter)
+    cpu = time.process_time()
+    await asyncio.sleep(window)
+    busy = (time.process_time() - cpu) / window
+    stop()
+    await asyncio.sleep(0)
+
+    return {
+        'register_ms': elapsed * 1e3,
+        'memory_kib': memory / 1024,
+        'tasks': tasks,
+        'idle_cpu': idle * 1e3,
+        'busy_cpu': busy * 1e3,
+        'runs': counter.runs / window,
+    }
+
+
+async def main(jobs: List[int], window: float) -> None:
+    print(
+        f'{"mode": <14}{"jobs": >8}{"register (ms)": >15}{"memory (KiB)": >14}{"tasks": >8}'
+        f'{"idle cpu (ms/s)": >17}{"busy cpu (ms/s)": >17}{"runs/s": >10}'
+    )
+    for count in jobs:
+        for mode in MODES:
+            r = await measure(mode, count, window)
+            print(
+                f'{mode: <14}{count: >8}{r["register_ms"]: >15.2f}{r["memory_kib"]: >14.1f}'
+                f'{r["tasks"]: >8}{r["idle_cpu"]: >17.2f}{r["busy_cpu"]: >17.2f}{r["runs"]: >10.0f}'
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[10, 1_000, 10_000])
+    parser.add_argument('--window', type=float, default=2.0)
+    args = parser.parse_args()
+
+    run(lambda: main(args.jobs, args.window))
@@ -0,0 +1,223 @@
+"""
+### 🐀 ⇝ `suite.py` - benchmark suite
+
+Runs a set of scenarios over synthetic apps (see `_app.py`) and measures, for each one:
+- `create_ms`: time spent in `Pest.create`
+- `startup_ms`: time spent running the startup lifespan (module tree setup, routes, hooks)
+- `asgi_us`: per-request latency (p50/p90/p99/mean) calling the app as a raw ASGI app
+- `testclient_us`: per-request latency (p50) through starlette's `TestClient`
+- `memory_per_route`: bytes allocated per route while creating and starting the app
+
+Results are written as JSON (`--output`), and can be compared against the results of a
+previous run (`--compare`), e.g. to check a commit for regressions:
+
+```sh
+git checkout main && python -m benchmarks.suite --output main.json
+git checkout feature && python -m benchmarks.suite --compare main.json
+```
+
+Usage: `python -m benchmarks.suite [--scenario NAME ...] [--rounds 3] [--requests 2000]
+[--output results.json] [--compare previous.json]`
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from fastapi.testclient import TestClient
+
+from ._app import AppSpec, calls, synthetic_app
+from ._asgi import lifespan, request
+
+SCENARIOS: Dict[str, AppSpec] = {
+    'small': AppSpec(modules=1, controllers=2, handlers=4),
+    'wide': AppSpec(modules=50, controllers=4, handlers=4),
+    'large': AppSpec(modules=50, controllers=10, handlers=4),
+    'deep_di': AppSpec(modules=5, controllers=4, handlers=4, depth=10),
+    'scoped': AppSpec(modules=5, controllers=4, handlers=4, depth=5, scope='scoped'),
+    'transient': AppSpec(modules=5, controllers=4, handlers=4, depth=5, scope='transient'),
+    'guarded': AppSpec(modules=5, controllers=4, handlers=4, guards=3),
+    'asgi_middlewares': AppSpec(modules=5, controllers=4, handlers=4, middlewares=5),
+    'http_middlewares': AppSpec(
+        modules=5, controllers=4, handlers=4, middlewares=5, middleware_kind='http'
+    ),
+}
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    at = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]  # noqa: E731
+    return {
+        'p50': round(at(0.5), 2),
+        'p90': round(at(0.9), 2),
+        'p99': round(at(0.99), 2),
+        'mean': round(statistics.fmean(samples), 2),
+    }
+
+
+async def _startup(spec: AppSpec, rounds: int) -> Dict[str, float]:
+    create, startup = [], []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        app = synthetic_app(spec)
+        created = time.perf_counter()
+        async with lifespan(app):
+            startup.append((time.perf_counter() - created) * 1e3)
+        create.append((created - start) * 1e3)
+
+    return {
+        'create_ms': round(statistics.median(create), 2),
+        'startup_ms': round(statistics.median(startup), 2),
+    }
+
+
+async def _memory(spec: AppSpec) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        app = synthetic_app(spec)
+        async with lifespan(app):
+            allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return allocated // spec.routes
+
+
+async def _asgi_latency(spec: AppSpec, requests: int) -> Dict[str, float]:
+    app = synthetic_app(spec)
+    targets = calls(spec)
+    samples: List[float] = []
+
+    async with lifespan(app):
+        for i in range(requests + 100):
+            method, path = targets[i % len(targets)]
+            start = time.perf_counter()
+            status = await request(app, method, path)
+            elapsed = (time.perf_counter() - start) * 1e6
+            if status != 200:
+                raise RuntimeError(f'{method} {path} responded with {status}')
+            if i >= 100:  # warmup
+                samples.append(elapsed)
+
+    return _percentiles(samples)
+
+
+def _testclient_latency(spec: AppSpec, requests: int) -> Dict[str, float]:
+    targets = calls(spec)
+    samples: List[float] = []
+
+    with TestClient(synthetic_app(spec)) as client:
+        for i in range(requests):
+            method, path = targets[i % len(targets)]
+            start = time.perf_counter()
+            client.request(method, path)
+            samples.append((time.perf_counter() - start) * 1e6)
+
+    return {'p50': _percentiles(samples)['p50']}
+
+
+def run_scenario(spec: AppSpec, rounds: int, requests: int) -> Dict[str, Any]:
+    """runs every measurement of a scenario"""
+    result: Dict[str, Any] = {'spec': spec.as_dict()}
+    result.update(asyncio.run(_startup(spec, rounds)))
+    result['asgi_us'] = asyncio.run(_asgi_latency(spec, requests))
+    result['testclient_us'] = _testclient_latency(spec, max(1, requests // 10))
+    result['memory_per_route'] = asyncio.run(_memory(spec))
+    return result
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metrics(result: Dict[str, Any]) -> Dict[str, float]:
+    return {
+        'create_ms': result['create_ms'],
+        'startup_ms': result['startup_ms'],
+        'asgi_p50_us': result['asgi_us']['p50'],
+        'asgi_p99_us': result['asgi_us']['p99'],
+        'testclient_p50_us': result['testclient_us']['p50'],
+        'memory_per_route': result['memory_per_route'],
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> str:
+    """returns a table with the relative change of each metric between two runs"""
+    rows = [f'{"scenario": <18}{"metric": <20}{"before": >12}{"after": >12}{"change": >10}']
+    for name, result in current['scenarios'].items():
+        if name not in previous['scenarios']:
+            continue
+
+        before = _metrics(previous['scenarios'][name])
+        for metric, value in _metrics(result).items():
+            change = (value - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+            rows.append(
+                f'{name: <18}{metric: <20}{before[metric]: >12.2f}{value: >12.2f}{change: >+9.1f}%'
+            )
+    return '\n'.join(rows)
+
+
+def main(
+    scenarios: List[str],
+    rounds: int,
+    requests: int,
+    output: Optional[str],
+    previous: Optional[str],
+) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'timestamp': time.time(),
+        'scenarios': {},
+    }
+
+    print(
+        f'{"scenario": <18}{"routes": >8}{"create (ms)": >13}{"startup (ms)": >14}'
+        f'{"p50 (µs)": >10}{"p99 (µs)": >10}{"B/route": >10}'
+    )
+    for name in scenarios:
+        result = run_scenario(SCENARIOS[name], rounds, requests)
+        results['scenarios'][name] = result
+        print(
+            f'{name: <18}{result["spec"]["routes"]: >8}{result["create_ms"]: >13.2f}'
+            f'{result["startup_ms"]: >14.2f}{result["asgi_us"]["p50"]: >10.2f}'
+            f'{result["asgi_us"]["p99"]: >10.2f}{result["memory_per_route"]: >10,}'
+        )
+
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if previous is not None:
+        with open(previous) as f:
+            print(f'\n{compare(results, json.load(f))}')
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), default=None)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--compare', default=None)
+    args = parser.parse_args()
+
+    main(args.scenario or list(SCENARIOS), args.rounds, args.requests, args.output, args.compare)
@@ -1,6 +1,15 @@
-from .core.common import OnApplicationBootstrap, OnModuleInit
+from .core.common import OnApplicationBootstrap, OnApplicationShutdown, OnModuleInit
 from .decorators.controller import api, controller, ctrl, router, rtr
-from .decorators.guard import Guard, GuardCb, GuardCtx, GuardExtra, use_guard
+from .decorators.guard import (
+    Guard,
+    GuardCache,
+    GuardCb,
+    GuardCtx,
+    GuardExtra,
+    GuardOptions,
+    use_guard,
+    use_guards,
+)
 from .decorators.handler import delete, get, head, options, patch, post, put, trace
 from .decorators.module import dom, domain, mod, module
 from .factory import Pest
@@ -45,7 +54,10 @@ __all__ = [
     'GuardCb',
     'GuardExtra',
     'GuardCtx',
+    'GuardCache',
+    'GuardOptions',
     'use_guard',
+    'use_guards',
     'guard',
     # meta - providers
     'ProviderBase',
@@ -57,4 +69,5 @@ __all__ = [
     # lifecycle hook protocols
     'OnModuleInit',
     'OnApplicationBootstrap',
+    'OnApplicationShutdown',
 ]
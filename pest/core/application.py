@@ -41,11 +41,15 @@ from pest.middleware.types import CorsOptions
 from ..exceptions import handle
 from ..metadata.types.module_meta import InjectionToken
 from ..middleware.base import (
+    PestASGIMiddlewareAdapter,
     PestBaseHTTPMiddleware,
     PestMiddlwareCallback,
+    _is_pest_asgi_middleware,
 )
-from ..middleware.di import di_scope_middleware
+from ..middleware.di import DIScopeMiddleware
 from ..middleware.types import MiddlewareDef
+from ..tracing.trace import TraceHook, TracingMiddleware
+from ..utils.fastapi.dispatch import RouteIndex, dispatcher
 from .module import Module, T
 from .types.fastapi_params import FastAPIParams
 
@@ -58,30 +62,27 @@ class PestApplication(FastAPI):
     """🐀 ⇝ what a pest!"""
 
     __pest_module__: Module
+    openapi_file: Optional[str]
+    route_index: RouteIndex
+    trace_hooks: List[TraceHook]
 
     def __init__(
         self,
         # module: Module,
         middleware: MiddlewareDef,
         lifespan: Union[Lifespan['PestApplication'], None] = None,
+        openapi_file: Optional[str] = None,
+        tracing: Union[TraceHook, Sequence[TraceHook], None] = None,
         **kwargs: Unpack[FastAPIParams],
     ) -> None:
         super().__init__(lifespan=lifespan, **kwargs)
+        self.openapi_file = openapi_file
+        self.route_index = RouteIndex()
+        self.trace_hooks: List[TraceHook] = (
+            [] if tracing is None else [tracing] if callable(tracing) else list(tracing)
+        )
         self.user_middleware: List[Middleware] = (
-            []
-            if middleware is None
-            else [
-                (
-                    middleware
-                    if isinstance(middleware, Middleware)
-                    else Middleware(
-                        PestBaseHTTPMiddleware,
-                        dispatch=cast(PestMiddlwareCallback, middleware),
-                        get_parent_module=lambda: root_module(self),
-                    )
-                )
-                for middleware in middleware
-            ]
+            [] if middleware is None else [self.__as_middleware(mw) for mw in middleware]
         )
 
         self.add_exception_handlers(
@@ -95,6 +96,24 @@ class PestApplication(FastAPI):
             ]
         )
 
+    def __as_middleware(self, middleware: Any) -> Middleware:
+        """wraps a pest middleware definition into a starlette middleware"""
+        if isinstance(middleware, Middleware):
+            return middleware
+
+        if _is_pest_asgi_middleware(middleware):
+            return Middleware(
+                PestASGIMiddlewareAdapter,
+                middleware=middleware,
+                get_parent_module=lambda: root_module(self),
+            )
+
+        return Middleware(
+            PestBaseHTTPMiddleware,
+            dispatch=cast(PestMiddlwareCallback, middleware),
+            get_parent_module=lambda: root_module(self),
+        )
+
     def add_exception_handlers(
         self, handlers: List[Tuple[Union[int, Type[Exception]], Callable]]
     ) -> None:
@@ -104,6 +123,21 @@ class PestApplication(FastAPI):
     def __str__(self) -> str:
         return str(root_module(self))
 
+    def openapi(self) -> Dict[str, Any]:
+        """
+        returns the OpenAPI schema of the application. The schema is generated and patched (or
+        loaded from `openapi_file`, if given) the first time it's requested, and memoized
+        """
+        if not self.openapi_schema:
+            from ..factory import openapi
+
+            if self.openapi_file is not None:
+                self.openapi_schema = openapi.load(self.openapi_file)
+            else:
+                self.openapi_schema = openapi.patch_schema(super().openapi())
+
+        return self.openapi_schema
+
     def resolve(self, token: InjectionToken[T], scope: Union[ActivationScope, None] = None) -> T:
         return root_module(self).get(token, scope)
 
@@ -251,10 +285,21 @@ class PestApplication(FastAPI):
         self.add_middleware(CORSMiddleware, **opts)
 
     def add_middleware(self, middleware_class: type, *args: Any, **kwargs: Any) -> None:
+        if _is_pest_asgi_middleware(middleware_class):
+            # pest asgi middlewares get their dependencies injected, so we need to instantiate
+            # them ourselves once the module tree is ready
+            return super().add_middleware(
+                PestASGIMiddlewareAdapter,
+                *args,
+                middleware=middleware_class,
+                get_parent_module=lambda: root_module(self),
+                **kwargs,
+            )
+
         super().add_middleware(middleware_class, *args, **kwargs)
 
     def build_middleware_stack(self) -> ASGIApp:
-        # Duplicate/override from FastAPI to add the di_scope_middleware, which
+        # Duplicate/override from FastAPI to add the DIScopeMiddleware, which
         # is required for Pest's DI to work. We need it to run before any other
         # user-defined middleware, as it is responsible for injecting the
         # the per-request scope into the DI container, that might be needed
@@ -269,16 +314,17 @@ class PestApplication(FastAPI):
             else:
                 exception_handlers[key] = value
 
-        di_scope_mw = [
-            Middleware(
-                PestBaseHTTPMiddleware,
-                dispatch=di_scope_middleware,
-                get_parent_module=lambda: root_module(self),
-            )
-        ]
+        di_scope_mw = [Middleware(DIScopeMiddleware)]
+
+        # tracing wraps everything, so that the traces time the whole request (and get the
+        # status of the responses sent by the `ServerErrorMiddleware`)
+        tracing_mw = (
+            [Middleware(TracingMiddleware, hooks=self.trace_hooks)] if self.trace_hooks else []
+        )
 
         middleware = (
-            [Middleware(ServerErrorMiddleware, handler=error_handler, debug=debug)]
+            tracing_mw
+            + [Middleware(ServerErrorMiddleware, handler=error_handler, debug=debug)]
             + di_scope_mw  # <--- this is the only difference
             + self.user_middleware
             + [
@@ -287,7 +333,8 @@ class PestApplication(FastAPI):
             ]
         )
 
-        app = self.router
+        # requests are dispatched through the compiled route index instead of a linear scan
+        app = dispatcher(self.router, self.route_index)
         for cls, args, kwargs in reversed(middleware):
             app = cls(app=app, *args, **kwargs)
         return app
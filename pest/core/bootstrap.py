@@ -0,0 +1,203 @@
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from ..metadata.types.injectable_meta import ProviderBase
+from ..utils.colorize import c
+from ..utils.functions import token_name
+from ..utils.module import as_tree
+from .types.bootstrap import BootstrapOptions
+
+if TYPE_CHECKING:
+    from .module import Module
+
+T = TypeVar('T')
+
+
+@dataclass
+class ModuleTiming:
+    """🐀 ⇝ how long it took to bootstrap a module (in seconds)"""
+
+    name: str
+    setup: float = 0.0
+    '''total time it took to set up the module, including its imports and hooks'''
+    init: float = 0.0
+    '''time spent in the `on_module_init` hooks of the module, its providers and controllers'''
+    bootstrap: float = 0.0
+    '''time spent in the `on_application_bootstrap` hooks of the module, including its imports'''
+    members: Dict[Any, Dict[str, float]] = field(default_factory=dict)
+    '''time spent on each step (setup, hooks) of the providers and controllers of the module'''
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1e3, 3)
+
+
+class BootstrapContext:
+    """
+    state shared by all the modules of a module tree while it's being set up. It decides whether
+    siblings are set up concurrently or one after another and keeps track of how long each module
+    (and each of its providers and controllers) took to be ready.
+    """
+
+    def __init__(self, options: Union[BootstrapOptions, None] = None) -> None:
+        options = options or {}
+        self.concurrent = options.get('concurrent', False)
+        self.max_concurrency = options.get('max_concurrency', None)
+        self.timings: Dict['Module', ModuleTiming] = {}
+        self.phases: Dict[str, float] = {}
+        self.routes: Dict[str, float] = {}
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+
+    async def all(self, calls: Iterable[Callable[[], Awaitable[T]]]) -> List[T]:
+        """
+        awaits the given calls and returns their results in order. The calls are run
+        concurrently if the bootstrap is concurrent, or one after another otherwise. Either way,
+        the first call to fail stops the bootstrap (pending concurrent calls are cancelled)
+        """
+        if not self.concurrent:
+            return [await call() for call in calls]
+
+        tasks = [asyncio.ensure_future(call()) for call in calls]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def limited(self, call: Callable[[], Awaitable[T]]) -> T:
+        """awaits a call, making sure that no more than `max_concurrency` are running at once"""
+        if not self.concurrent or self.max_concurrency is None:
+            return await call()
+
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self.__semaphore:
+            return await call()
+
+    def timing_of(self, module: 'Module') -> ModuleTiming:
+        """returns the timing record of a module, creating it if needed"""
+        if module not in self.timings:
+            self.timings[module] = ModuleTiming(name=module.__class__.__name__)
+        return self.timings[module]
+
+    @contextmanager
+    def measure(self, module: 'Module', phase: str, member: Any = None) -> Iterator[None]:
+        """
+        measures the time spent on a bootstrap phase (`setup`, `init` or `bootstrap`) of a module,
+        or on any step of one of its members (providers or controllers) if `member` is given
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            timing = self.timing_of(module)
+            if member is None:
+                setattr(timing, phase, getattr(timing, phase) + elapsed)
+            else:
+                steps = timing.members.setdefault(member, {})
+                steps[phase] = steps.get(phase, 0.0) + elapsed
+
+    @contextmanager
+    def measure_phase(self, phase: str, route: Optional[str] = None) -> Iterator[None]:
+        """
+        measures the time spent on an application-wide startup phase (e.g. `routes`), or on
+        registering the routes of a router if `route` is given
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            if route is None:
+                self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+            else:
+                self.routes[route] = self.routes.get(route, 0.0) + elapsed
+
+    def steps_of(self, module: 'Module', member: Any = None) -> Dict[str, float]:
+        """
+        returns the time (in milliseconds) spent on each bootstrap phase of a module, or on each
+        step of one of its members (a provider or controller) if `member` is given
+        """
+        timing = self.timing_of(module)
+        if member is None:
+            steps = {'setup': timing.setup, 'init': timing.init, 'bootstrap': timing.bootstrap}
+        else:
+            token = member.provide if isinstance(member, ProviderBase) else member
+            steps = timing.members.get(token, {})
+        return {step: _ms(s) for step, s in steps.items()}
+
+    def profile(self, root: 'Module') -> Dict[str, Any]:
+        """returns a JSON serializable startup profile (all times are in milliseconds)"""
+
+        def members(module: 'Module', objs: Iterable[Any]) -> List[Dict[str, Any]]:
+            return [
+                {
+                    'name': token_name(m.provide if isinstance(m, ProviderBase) else m),
+                    **self.steps_of(module, m),
+                }
+                for m in objs
+            ]
+
+        def module_profile(module: 'Module') -> Dict[str, Any]:
+            return {
+                'name': self.timing_of(module).name,
+                **self.steps_of(module),
+                'providers': members(module, module.providers),
+                'controllers': members(module, module.controllers),
+                'imports': [module_profile(child) for child in module.imports],
+            }
+
+        return {
+            'phases': {phase: _ms(s) for phase, s in self.phases.items()},
+            'routes': {route: _ms(s) for route, s in self.routes.items()},
+            'modules': module_profile(root),
+        }
+
+    def report(self, root: 'Module') -> str:
+        """returns a table with the time each module of the tree took to bootstrap"""
+        rows: List[str] = [f'{"module": <40}{"setup (ms)": >12}{"init (ms)": >12}']
+
+        def add_rows(module: Dict[str, Any], depth: int) -> None:
+            name = f'{"  " * depth}{module["name"]}'
+            rows.append(f'{name: <40}{module["setup"]: >12.2f}{module["init"]: >12.2f}')
+            for child in module['imports']:
+                add_rows(child, depth + 1)
+
+        add_rows(self.profile(root)['modules'], 0)
+        return '\n'.join(rows)
+
+    def profile_tree(self, root: 'Module') -> str:
+        """returns the module tree annotated with the time each of its parts took to start"""
+
+        def annotate(obj: Any, module: 'Module') -> str:
+            steps = self.steps_of(module, None if obj is module else obj)
+            if not steps:
+                return ''
+            return c(
+                ' ⏱ ' + ', '.join(f'{s} {ms:.2f}ms' for s, ms in steps.items()), color='yellow'
+            )
+
+        profile = self.profile(root)
+        phases = '\n'.join(
+            [f'{phase: <40}{ms: >12.2f}ms' for phase, ms in profile['phases'].items()]
+            + [f'  {route: <38}{ms: >12.2f}ms' for route, ms in profile['routes'].items()]
+        )
+        return f'{as_tree(root, annotate=annotate)}\n{phases}'
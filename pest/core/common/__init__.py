@@ -28,9 +28,6 @@ class PestPrimitive(ABC):
         ...
 
 
-# TODO: OnApplicationShutdown hook
-
-
 @runtime_checkable
 class OnModuleInit(Protocol):
     """🐀 ⇝ on module init protocol
@@ -67,6 +64,24 @@ class OnApplicationBootstrap(Protocol):
         pass
 
 
+@runtime_checkable
+class OnApplicationShutdown(Protocol):
+    """🐀 ⇝ on application shutdown protocol
+
+    Protocol defining an `on_application_shutdown` method that is called once the application
+    stops listening for connections, to release the resources acquired while it was running.
+    """
+
+    def on_application_shutdown(
+        self, app: 'PestApplication'
+    ) -> Union[None, Coroutine[Any, Any, None]]:
+        """🐀 ⇝ on application shutdown
+
+        called once the application stops listening for connections, before it exits.
+        """
+        pass
+
+
 def is_primitive(clazz: Union[type, object]) -> TypeGuard[PestPrimitive]:
     """🐀 ⇝ checks if a class is a pest primitive"""
     if not isclass(clazz):
@@ -1,5 +1,5 @@
 from inspect import getmembers, isfunction
-from typing import TYPE_CHECKING, Any, ClassVar, List, Optional
+from typing import TYPE_CHECKING, Any, ClassVar, List, Optional, Tuple
 
 from fastapi.routing import APIRoute
 
@@ -10,15 +10,17 @@ from ..metadata.types.controller_meta import ControllerMeta
 from ..metadata.types.handler_meta import HandlerMeta
 from ..utils.fastapi.router import PestRouter
 from ..utils.functions import classproperty
-from .common import OnApplicationBootstrap, OnModuleInit, PestPrimitive
-from .handler import HandlerTuple, setup_handler
+from .common import OnApplicationBootstrap, OnApplicationShutdown, OnModuleInit, PestPrimitive
+from .handler import HandlerFn, HandlerTuple, PestFastAPIInjector, setup_handler
 from .types.status import Status
 
 if TYPE_CHECKING:  # pragma: no cover
+    from ..decorators.guard import _GuardRunner
     from .module import Module
 
 NOT_CONTROLLER = 'Class {cls} is not a subclass of Controller'
 NOT_ROUTER = 'Object is not a subclass of PestRouter'
+GUARDS = '__pest_guards__'
 
 
 def setup_controller(cls: type, module: Optional['Module'] = None) -> None:
@@ -44,6 +46,26 @@ def routes_of(cls: type) -> List[APIRoute]:
     return router_of(cls).routes
 
 
+def injectors_of(cls: type) -> List[PestFastAPIInjector]:
+    """🐀 ⇝ obtains the injectors used by the handlers of a `controller`"""
+    if not issubclass(cls, Controller):
+        raise PestException(NOT_CONTROLLER.format(cls=cls.__name__))
+
+    return cls.__injectors__
+
+
+def guards_of(cls: type) -> List[Tuple[HandlerFn, '_GuardRunner']]:
+    """🐀 ⇝ obtains the guards applied to the handlers of a `controller`"""
+    if not issubclass(cls, Controller):
+        raise PestException(NOT_CONTROLLER.format(cls=cls.__name__))
+
+    return [
+        (handler, guard)
+        for handler, _ in cls.__handlers__()
+        for guard in getattr(handler, GUARDS, [])
+    ]
+
+
 def module_of(cls: type) -> 'Module':
     """🐀 ⇝ obtains the parent module of a `controller`"""
     if not issubclass(cls, Controller):
@@ -56,9 +78,10 @@ def module_of(cls: type) -> 'Module':
     return mod
 
 
-class Controller(PestPrimitive, OnModuleInit, OnApplicationBootstrap):
+class Controller(PestPrimitive, OnModuleInit, OnApplicationBootstrap, OnApplicationShutdown):
     __router__: ClassVar[PestRouter]
     __parent_module__: ClassVar[Optional[Any]]
+    __injectors__: ClassVar[List[PestFastAPIInjector]] = []
 
     @classproperty
     def __pest_object_type__(cls) -> PestType:
@@ -75,6 +98,7 @@ class Controller(PestPrimitive, OnModuleInit, OnApplicationBootstrap):
         meta = get_meta(cls, dict, clean=True)
         cls.__router__ = PestRouter(**meta)
         cls.__parent_module__ = module
+        cls.__injectors__ = []
         inject_metadata(cls.__router__, name=f'{cls.__name__} {meta.get("prefix", "")}')
 
         router = cls.__make_router__()
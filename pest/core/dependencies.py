@@ -0,0 +1,309 @@
+import sys
+from inspect import Parameter, isclass, signature
+from types import UnionType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    get_origin,
+    get_type_hints,
+)
+
+from dij import ServiceLifeStyle
+
+from ..exceptions.base.pest import PestException
+from ..metadata.types.injectable_meta import (
+    ClassProvider,
+    ExistingProvider,
+    FactoryProvider,
+    ValueProvider,
+)
+from ..metadata.types.module_meta import InjectionToken, Provider
+from ..utils.functions import token_name
+
+if TYPE_CHECKING:
+    from .module import Module
+
+
+def _hints(obj: Any, owner: Optional[type] = None) -> Dict[str, Any]:
+    """type hints of an object, or its raw annotations if they can't be evaluated"""
+    module = sys.modules.get(getattr(owner or obj, '__module__', ''), None)
+    try:
+        return get_type_hints(obj, vars(module) if module is not None else None)
+    except Exception:
+        return dict(getattr(obj, '__annotations__', {}))
+
+
+def _has_default_init(cls: type) -> bool:
+    init = getattr(cls, '__init__', None)
+    return init is object.__init__ or getattr(init, '__name__', '') == '_no_init_or_replace_init'
+
+
+def _class_dependencies(cls: type) -> List[InjectionToken]:
+    """
+    tokens injected into a class: its class annotations if it has no `__init__` (like the
+    container does), or the annotations of the parameters of its `__init__` otherwise
+    """
+    if _has_default_init(cls):
+        return [
+            hint
+            for name, hint in _hints(cls).items()
+            if getattr(hint, '__origin__', None) is not ClassVar
+            and getattr(cls, name, None) is None
+        ]
+
+    hints = _hints(cls.__init__, cls)
+    return [
+        hints.get(param.name, param.annotation)
+        for param in list(signature(cls.__init__).parameters.values())[1:]
+        if param.kind not in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD)
+    ]
+
+
+def dependencies_of(provider: Provider) -> List[InjectionToken]:
+    """
+    🐀 ⇝ returns the tokens a provider needs to be instantiated, read from the constructor of its
+    class. Parameters without annotations are left out, and so are factories, which get the
+    activation scope (and the requesting type) instead of injected tokens
+    """
+    if isinstance(provider, (ValueProvider, FactoryProvider)):
+        return []
+    if isinstance(provider, ExistingProvider):
+        return [provider.use_existing]
+
+    cls = provider.use_class if isinstance(provider, ClassProvider) else provider
+    tokens = _class_dependencies(cls) if isclass(cls) else []
+    return [token for token in tokens if token is not Parameter.empty]
+
+
+def layers(
+    tokens: Iterable[InjectionToken], dependencies: Dict[InjectionToken, List[Any]]
+) -> List[List[InjectionToken]]:
+    """
+    🐀 ⇝ splits tokens in layers, so that every token comes after the tokens (of the given ones)
+    it depends on. Tokens in the same layer don't depend on each other. Tokens in a cycle (if
+    any) end up together in the last layer
+    """
+    pending = {
+        token: {dep for dep in dependencies.get(token, []) if dep != token} for token in tokens
+    }
+    for deps in pending.values():
+        deps.intersection_update(pending)
+
+    result: List[List[InjectionToken]] = []
+    while pending:
+        layer = [token for token, deps in pending.items() if not deps]
+        if not layer:
+            result.append(list(pending))
+            break
+
+        result.append(layer)
+        for token in layer:
+            del pending[token]
+        for deps in pending.values():
+            deps.difference_update(layer)
+
+    return result
+
+
+Node = Tuple['Module', InjectionToken]
+'''🐀 ⇝ a token, along with the module that owns its provider'''
+
+
+def _is_union(token: Any) -> bool:
+    return get_origin(token) in (Union, UnionType)
+
+
+def _factory_problem(token: InjectionToken, provider: Provider) -> Optional[str]:
+    if not isinstance(provider, FactoryProvider):
+        return None
+
+    try:
+        params = signature(provider.use_factory).parameters
+    except (TypeError, ValueError):
+        return None
+
+    if len(params) > 2:
+        return (
+            f'the factory of {token_name(token)} takes {len(params)} parameters, but factories '
+            'only get the activation scope and the requesting type'
+        )
+    return None
+
+
+def is_pooled(provider: Optional[Provider]) -> bool:
+    """whether a provider is a pooled one (a scoped `ClassProvider` with a `pool`)"""
+    return (
+        isinstance(provider, ClassProvider)
+        and provider.pool is not None
+        and provider.scope == ServiceLifeStyle.SCOPED
+    )
+
+
+def _pool_problem(token: InjectionToken, provider: Provider) -> Optional[str]:
+    if not isinstance(provider, ClassProvider) or provider.pool is None:
+        return None
+
+    if provider.scope != ServiceLifeStyle.SCOPED:
+        return f'{token_name(token)} is pooled, but only scoped providers can be pooled'
+    if provider.pool < 1:
+        return f'the pool of {token_name(token)} must keep at least one instance'
+    return None
+
+
+class DependencyGraph:
+    """
+    🐀 ⇝ dependencies of the providers (and controllers) of a module, each one linked to the
+    module that owns it, along with the order in which they can be activated (every token
+    comes after the tokens of the module it depends on)
+    """
+
+    __slots__ = ('module', 'edges', 'layers')
+
+    def __init__(self, module: 'Module', edges: Dict[InjectionToken, List[Node]]) -> None:
+        self.module = module
+        self.edges = edges
+        self.layers = layers(edges, {token: self.dependencies(token) for token in edges})
+
+    @property
+    def order(self) -> List[InjectionToken]:
+        """topologically sorted activation order of the tokens of the module"""
+        return [token for layer in self.layers for token in layer]
+
+    def dependencies(self, token: InjectionToken) -> List[InjectionToken]:
+        """tokens of the module a token depends on"""
+        return [dep for owner, dep in self.edges.get(token, []) if owner is self.module]
+
+
+def _edges(node: Node) -> List[Node]:
+    """dependencies of a node, as long as its module has already been validated"""
+    module, token = node
+    graph = getattr(module, 'dependency_graph', None)
+    return graph.edges.get(token, []) if graph is not None else []
+
+
+def _cycle(start: Node, edges: Callable[[Node], List[Node]]) -> Optional[List[Node]]:
+    """returns a cycle that goes through `start`, if there's one"""
+    path: List[Node] = [start]
+    visited = {start}
+    stack = [iter(edges(start))]
+
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            path.pop()
+        elif node == start:
+            return [*path, start]
+        elif node not in visited:
+            visited.add(node)
+            path.append(node)
+            stack.append(iter(edges(node)))
+    return None
+
+
+def _captured_scoped(start: Node, edges: Callable[[Node], List[Node]]) -> Optional[List[Node]]:
+    """
+    returns the path from a singleton (or a pooled token) to a scoped token it depends on
+    (directly or through transient ones, which it would keep forever as well), if there's one
+    """
+    visited = {start}
+    stack = [(start, [start])]
+
+    while stack:
+        node, path = stack.pop()
+        for dep in edges(node):
+            if dep in visited:
+                continue
+            visited.add(dep)
+
+            owner, token = dep
+            scope = owner.scope_of(token)
+            if scope == ServiceLifeStyle.SCOPED:
+                return [*path, dep]
+            if scope != ServiceLifeStyle.SINGLETON:
+                stack.append((dep, [*path, dep]))
+    return None
+
+
+def validate(module: 'Module') -> DependencyGraph:
+    """
+    🐀 ⇝ builds the dependency graph of the providers and controllers of a module and makes sure
+    they can be resolved: every token they depend on must be provided, there can't be cycles,
+    singletons can't depend on scoped tokens and only scoped providers can be pooled. Pooled
+    instances outlive the scope they were built in, along with whatever was injected into them,
+    so they can't depend on scoped (or pooled) tokens either. It must be called once every token
+    the module can see has been linked to it (and its imports have been validated).
+
+    Raises a `PestException` listing every problem found
+    """
+    problems: List[str] = []
+    edges: Dict[InjectionToken, List[Node]] = {}
+
+    for token, provider in module.__provided__.items():
+        for problem in (_factory_problem(token, provider), _pool_problem(token, provider)):
+            if problem is not None:
+                problems.append(problem)
+
+        deps: List[Node] = []
+        for dep in dependencies_of(provider):
+            if _is_union(dep):
+                problems.append(
+                    f'{token_name(token)} depends on {dep}, but union (and optional) types '
+                    "can't be injected"
+                )
+            elif not module.can_provide(dep):
+                problems.append(
+                    f'{token_name(token)} depends on {token_name(dep)}, which is not provided'
+                )
+            else:
+                deps.append((module.owner_of(dep), dep))
+        edges[token] = deps
+
+    graph = DependencyGraph(module, edges)
+
+    def edges_of(node: Node) -> List[Node]:
+        return graph.edges.get(node[1], []) if node[0] is module else _edges(node)
+
+    in_cycle = set()
+    for token in edges:
+        if token in in_cycle:
+            continue
+
+        cycle = _cycle((module, token), edges_of)
+        if cycle is not None:
+            in_cycle.update(t for owner, t in cycle if owner is module)
+            problems.append('circular dependency: ' + ' -> '.join(token_name(t) for _, t in cycle))
+            continue
+
+        if module.scope_of(token) == ServiceLifeStyle.SINGLETON:
+            kind = 'a singleton'
+        elif is_pooled(module.__provided__.get(token)):
+            kind = 'pooled'
+        else:
+            continue
+
+        path = _captured_scoped((module, token), edges_of)
+        if path is not None:
+            problems.append(
+                f'{token_name(token)} is {kind}, but depends on {token_name(path[-1][1])}, which '
+                'is scoped: ' + ' -> '.join(token_name(t) for _, t in path)
+            )
+
+    if problems:
+        listed = '\n'.join(f'  - {problem}' for problem in problems)
+        raise PestException(
+            f'Invalid dependencies in {type(module).__name__}:\n{listed}',
+            hint='provide the missing tokens in the module (or in a parent module, or export them '
+            'from an imported one), break the cycles, make sure singletons and pooled providers '
+            'only depend on singletons or transient providers and only pool scoped providers',
+        )
+
+    return graph
@@ -1,13 +1,13 @@
-from dataclasses import asdict
+from functools import cache
 from inspect import Parameter, isclass, isfunction, signature
-from typing import TYPE_CHECKING, Any, Callable, List, Tuple, Type, Union, get_args
+from typing import TYPE_CHECKING, Any, Callable, List, Tuple, Type, Union, cast, get_args
 
 try:
     from typing import TypeAlias
 except ImportError:
     from typing_extensions import TypeAlias
 
-from fastapi import Depends, Request
+from fastapi import Depends, Request, params
 from fastapi.routing import APIRoute
 
 from pest.di.injection import _Inject, inject
@@ -15,11 +15,11 @@ from pest.di.injection import _Inject, inject
 from ..exceptions.base.pest import PestException
 from ..metadata.types.handler_meta import HandlerMeta
 from ..middleware.di import scope_from
-from ..utils.functions import clean_dict
 
 if TYPE_CHECKING:  # pragma: no cover
     from ..metadata.types.module_meta import InjectionToken
     from .controller import Controller
+    from .module import ResolutionPlan
 
 HandlerFn: TypeAlias = Callable[..., Any]
 HandlerTuple: TypeAlias = Tuple[HandlerFn, HandlerMeta]
@@ -31,10 +31,12 @@ def setup_handler(cls: Type['Controller'], handler: HandlerTuple) -> APIRoute:
 
     @internal
     """
-    from ..decorators.dicts.handler_dict import HandlerMetaDict
-
     handler_fn, handler_meta = handler
-    meta_dict = clean_dict(asdict(handler_meta), HandlerMetaDict)
+    meta_dict = {
+        key: value
+        for key in _route_options()
+        if (value := getattr(handler_meta, key, None)) is not None
+    }
     _patch_handler_fn(cls, handler_fn)
 
     # by default, exclude None values from the response
@@ -51,6 +53,14 @@ def setup_handler(cls: Type['Controller'], handler: HandlerTuple) -> APIRoute:
     return route
 
 
+@cache
+def _route_options() -> Tuple[str, ...]:
+    """names of the `HandlerMeta` fields that are passed as is to the route"""
+    from ..decorators.dicts.handler_dict import HandlerMetaDict
+
+    return tuple(HandlerMetaDict.__annotations__)
+
+
 def _patch_handler_fn(cls: Type['Controller'], handler: HandlerFn) -> None:
     """
     Changes the signature of a route's endpoint to ensure that FastAPI
@@ -67,7 +77,7 @@ def _patch_handler_fn(cls: Type['Controller'], handler: HandlerFn) -> None:
     @internal
     """
 
-    controller = PestFastAPIInjector(token=cls, controller=cls)
+    controller = _make_injector(cls, cls)
 
     old_endpoint = handler
     old_signature = signature(old_endpoint)
@@ -89,7 +99,13 @@ def _get_new_param(ctrl: type, parameter: Parameter) -> Parameter:
 
     @internal
     """
-    if parameter.annotation is not Parameter.empty or isinstance(parameter.default, _Inject):
+    if isinstance(parameter.default, params.Depends) and isinstance(
+        parameter.default.dependency, PestFastAPIInjector
+    ):
+        # the handler was already patched by a previous setup of the controller, we just keep
+        # track of its injector so that its resolution plan gets compiled again
+        _track_injector(ctrl, parameter.default.dependency)
+    elif parameter.annotation is not Parameter.empty or isinstance(parameter.default, _Inject):
         pest_anns = _get_pest_injection(parameter)
         if pest_anns is not None:
             # it has a pest injection annotation
@@ -109,9 +125,7 @@ def _get_new_param(ctrl: type, parameter: Parameter) -> Parameter:
                     # otherwise we replace the parameter with a `Depends` on `PestFastAPIInjector`
                     # which will try to resolve the value from the `module`'s container
                     parameter = parameter.replace(
-                        default=Depends(
-                            PestFastAPIInjector(controller=ctrl, token=annotation.token)
-                        )
+                        default=Depends(_make_injector(ctrl, annotation.token))
                     )
                 else:
                     raise PestException(
@@ -121,6 +135,24 @@ def _get_new_param(ctrl: type, parameter: Parameter) -> Parameter:
     return parameter.replace(kind=Parameter.KEYWORD_ONLY)
 
 
+def _make_injector(ctrl: type, token: 'InjectionToken') -> 'PestFastAPIInjector':
+    """
+    Creates a `PestFastAPIInjector` and keeps track of it in the controller, so that its
+    resolution plan can be compiled once the controller's module is ready.
+
+    @internal
+    """
+    injector = PestFastAPIInjector(controller=cast(Type['Controller'], ctrl), token=token)
+    return _track_injector(ctrl, injector)
+
+
+def _track_injector(ctrl: type, injector: 'PestFastAPIInjector') -> 'PestFastAPIInjector':
+    """@internal"""
+    getattr(ctrl, '__injectors__').append(injector)
+    injector.plan = None
+    return injector
+
+
 def _get_pest_injection(parameter: Parameter) -> Union[List[_Inject], None]:
     """
     checks if the parameter is annotated with `inject` or has a default value of `_Inject`.
@@ -171,19 +203,28 @@ class PestFastAPIInjector:
     and inject stuff into the handler's signature ourselves using
     the `module`'s container.
 
+    The module lookup and the walk through the modules relaying the token are done once, when the
+    resolution plan is compiled (right after the controller's module is set up). After that, each
+    request resolves the token with a single call to the container that owns it.
+
     @internal
     """
 
+    __slots__ = ('controller', 'token', 'plan')
+
     def __init__(self, controller: Type['Controller'], token: 'InjectionToken'):
         self.controller = controller
         self.token = token
+        self.plan: Union['ResolutionPlan', None] = None
 
-    async def __call__(self, request: Request) -> Any:
-        """🐀 ⇝ returns the `controller` to be injected 💉"""
+    def compile(self) -> 'ResolutionPlan':
+        """🐀 ⇝ compiles the resolution plan of the token to be injected"""
         from .controller import module_of
 
-        scope = scope_from(request)
-        module = module_of(self.controller)
-        di_result = await module.aget(self.token, scope)
+        self.plan = module_of(self.controller).resolution_plan(self.token)
+        return self.plan
 
-        return di_result
+    async def __call__(self, request: Request) -> Any:
+        """🐀 ⇝ returns the `controller` to be injected 💉"""
+        plan = self.plan if self.plan is not None else self.compile()
+        return await plan(scope_from(request))
@@ -1,7 +1,11 @@
+from functools import partial
+from time import perf_counter
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
+    Generic,
     Iterator,
     List,
     Optional,
@@ -19,17 +23,23 @@ import pest.utils.module as module_utils
 from pest.metadata.types._meta import PestType
 
 from ..exceptions.base.pest import PestException
+from ..logging import log
 from ..metadata.meta import get_meta
 from ..metadata.types.injectable_meta import (
     ClassProvider,
     ExistingProvider,
     FactoryProvider,
+    ProviderBase,
     ValueProvider,
 )
 from ..metadata.types.module_meta import InjectionToken, ModuleMeta, Provider
-from ..utils.functions import classproperty, maybe_coro
-from .common import OnApplicationBootstrap, OnModuleInit, PestPrimitive
-from .controller import Controller, router_of, setup_controller
+from ..tracing.trace import RequestTrace, current_trace
+from ..utils.functions import classproperty, maybe_coro, token_name
+from .bootstrap import BootstrapContext
+from .common import OnApplicationBootstrap, OnApplicationShutdown, OnModuleInit, PestPrimitive
+from .controller import Controller, guards_of, injectors_of, router_of, setup_controller
+from .dependencies import DependencyGraph, dependencies_of, is_pooled, layers, validate
+from .pool import PooledResolver
 from .types.status import Status
 
 if TYPE_CHECKING:
@@ -84,6 +94,7 @@ def assure_module_instance(module: Any) -> None:
 async def setup_module(
     clazz: type,
     parent_clazz: Optional['Module'] = None,
+    ctx: Optional[BootstrapContext] = None,
 ) -> 'Module':
     """
     functions that sets up a module. Avoids accessing the
@@ -94,47 +105,99 @@ async def setup_module(
         assure_module_instance(parent_clazz)
 
     module = clazz()
-    await module.__setup_module__(parent_clazz)
+    await module.__setup_module__(parent_clazz, ctx)
     return module
 
 
 T = TypeVar('T')
 
 
-async def _on_module_init(module: 'Module') -> None:
+async def _init_token(module: 'Module', token: InjectionToken, ctx: BootstrapContext) -> None:
+    """resolves a token from a module and calls its `on_module_init` hook if it has one"""
+    with ctx.measure(module, 'on_module_init', member=token):
+        try:
+            resolved = await module.aget(token)
+        except PestException:
+            raise
+        except Exception as e:
+            name = token_name(token)
+            raise PestException(
+                f'Failed to instantiate {name} while bootstrapping {type(module).__name__}: {e!r}',
+                hint=f'check the constructor (or factory) of `{name}` and its dependencies, or '
+                'pass `eager=False` to its provider to instantiate it on first use',
+            ) from e
+
+        if isinstance(resolved, OnModuleInit):
+            await maybe_coro(resolved.on_module_init())
+
+
+def _is_singleton(provider: Provider) -> bool:
+    return isinstance(provider, ValueProvider) or (
+        hasattr(provider, 'scope') and provider.scope == ServiceLifeStyle.SINGLETON
+    )
+
+
+def _implements(provider: Provider, hook: type) -> bool:
+    """whether the class of the instances of a provider implements a lifecycle hook"""
+    if isinstance(provider, ValueProvider):
+        return isinstance(provider.use_value, hook)
+
+    cls = provider.use_class if isinstance(provider, ClassProvider) else provider.provide
+    return isinstance(cls, type) and issubclass(cls, hook)
+
+
+def _warm_up(module: 'Module', provider: Provider, hook: type) -> bool:
+    """
+    whether a singleton provider is instantiated while bootstrapping: if it's eager (or the
+    module is), or to call one of its lifecycle hooks
+    """
+    eager = getattr(provider, 'eager', None)
+    eager = module.eager if eager is None else eager
+    return eager or _implements(provider, hook)
+
+
+async def _on_module_init(module: 'Module', ctx: Optional[BootstrapContext] = None) -> None:
     """
     executes the `on_module_init` lifecycle hook for a module, which includes:
     - calling the lifecycle hooks of the module's providers
     - calling the lifecycle hooks of the module's controllers
     - calling the lifecycle hooks of the module itself
+
+    if the bootstrap is concurrent, the hooks of the providers are called concurrently, and so
+    are the ones of the controllers (once the providers are done)
     """
 
     assure_module_instance(module)
+    ctx = ctx if ctx is not None else BootstrapContext()
 
     if module.__class_status__ == Status.READY:
         return
 
-    for provider in module.providers:
-        # if the provider's scope is singleton/value, we check if the provider has lifecycle
-        # hooks and call them if that's the case
-        if isinstance(provider, ValueProvider) or (
-            hasattr(provider, 'scope') and provider.scope == ServiceLifeStyle.SINGLETON
-        ):
-            # resolve the provider and try to call the lifecycle hooks
-            resolved = await module.aget(provider.provide)
-            if isinstance(resolved, OnModuleInit):
-                await maybe_coro(resolved.on_module_init())
-
-    for controller in module.controllers:
-        resolved = await maybe_coro(module.aget(cast(Type[Controller], controller)))
-        if isinstance(resolved, OnModuleInit):
-            await maybe_coro(resolved.on_module_init())
+    # eager singletons are instantiated now (and so are the ones with an `on_module_init` hook,
+    # which gets called). A singleton is only instantiated once the singletons of this module it
+    # depends on are ready, so the ones that don't depend on each other can be instantiated
+    # concurrently if the bootstrap is concurrent
+    graph = module.dependency_graph
+    singletons = {
+        provider.provide: (
+            graph.dependencies(provider.provide) if graph is not None else dependencies_of(provider)
+        )
+        for provider in module.providers
+        if _is_singleton(provider) and _warm_up(module, provider, OnModuleInit)
+    }
+    for layer in layers(singletons, singletons):
+        await ctx.all(partial(ctx.limited, partial(_init_token, module, t, ctx)) for t in layer)
+
+    controllers = cast(List[Type[Controller]], module.controllers)
+    await ctx.all(partial(ctx.limited, partial(_init_token, module, c, ctx)) for c in controllers)
 
     # and finally, ourselves
-    await maybe_coro(module.on_module_init())
+    await ctx.limited(lambda: maybe_coro(module.on_module_init()))
 
 
-async def _on_application_bootstrap(module: 'Module', app: 'PestApplication') -> None:
+async def _on_application_bootstrap(
+    module: 'Module', app: 'PestApplication', ctx: Optional[BootstrapContext] = None
+) -> None:
     """
     executes the `on_application_bootstrap` lifecycle hook for a module, which includes:
     - calling the lifecycle hooks of the module's providers
@@ -144,49 +207,181 @@ async def _on_application_bootstrap(module: 'Module', app: 'PestApplication') ->
     """
 
     assure_module_instance(module)
+    ctx = ctx if ctx is not None else BootstrapContext()
 
     if module.__class_status__ != Status.READY:
         return
 
-    for child in module.imports:
-        await _on_application_bootstrap(child, app)
-
-    for provider in module.providers:
-        # if the provider's scope is singleton/value, we check if the provider has lifecycle
-        # hooks and call them if that's the case
-        if isinstance(provider, ValueProvider) or (
-            hasattr(provider, 'scope') and provider.scope == ServiceLifeStyle.SINGLETON
-        ):
-            # resolve the provider and try to call the lifecycle hooks
-            resolved = module.get(provider.provide)
-            if isinstance(resolved, OnApplicationBootstrap):
-                await maybe_coro(resolved.on_application_bootstrap(app))
-
-    for controller in module.controllers:
-        resolved = await maybe_coro(module.aget(cast(Type[Controller], controller)))
-        if isinstance(resolved, OnApplicationBootstrap):
-            await maybe_coro(resolved.on_application_bootstrap(app))
+    with ctx.measure(module, 'bootstrap'):
+        for child in module.imports:
+            await _on_application_bootstrap(child, app, ctx)
 
-    # and finally, ourselves
-    await maybe_coro(module.on_application_bootstrap(app))
+        for provider in module.providers:
+            # if the provider's scope is singleton/value, we check if the provider has lifecycle
+            # hooks and call them if that's the case
+            if _is_singleton(provider) and _warm_up(module, provider, OnApplicationBootstrap):
+                # resolve the provider and try to call the lifecycle hooks
+                with ctx.measure(module, 'on_application_bootstrap', member=provider.provide):
+                    resolved = module.get(provider.provide)
+                    if isinstance(resolved, OnApplicationBootstrap):
+                        await maybe_coro(resolved.on_application_bootstrap(app))
+
+        for controller in module.controllers:
+            with ctx.measure(module, 'on_application_bootstrap', member=controller):
+                resolved = await maybe_coro(module.aget(cast(Type[Controller], controller)))
+                if isinstance(resolved, OnApplicationBootstrap):
+                    await maybe_coro(resolved.on_application_bootstrap(app))
+
+        # and finally, ourselves
+        await maybe_coro(module.on_application_bootstrap(app))
+
+
+async def _on_application_shutdown(module: 'Module', app: 'PestApplication') -> None:
+    """
+    executes the `on_application_shutdown` lifecycle hook for a module, in the reverse order of
+    the bootstrap, so that nothing is torn down before whatever depends on it:
+    - calling the lifecycle hooks of the module itself
+    - calling the lifecycle hooks of the module's controllers
+    - calling the lifecycle hooks of the module's providers
+    - calling the lifecycle hooks of its child modules
+
+    a failing hook is logged, and the rest of them are called anyway
+    """
+
+    assure_module_instance(module)
+
+    if module.__class_status__ != Status.READY:
+        return
+
+    async def call(member: Any, resolve: Callable[[], Any]) -> None:
+        try:
+            resolved = await maybe_coro(resolve())
+            if isinstance(resolved, OnApplicationShutdown):
+                await maybe_coro(resolved.on_application_shutdown(app))
+        except Exception:
+            log.exception(f'Failed to shut down {token_name(member)}')
+
+    await call(type(module), lambda: module)
+
+    # controllers are only resolved if they have a hook of their own (they all inherit one)
+    for controller in reversed(module.controllers):
+        hook = getattr(controller, 'on_application_shutdown', None)
+        if hook is not OnApplicationShutdown.on_application_shutdown:
+            await call(controller, partial(module.aget, cast(Type[Controller], controller)))
+
+    for provider in reversed(module.providers):
+        if _is_singleton(provider) and _implements(provider, OnApplicationShutdown):
+            await call(provider.provide, partial(module.get, provider.provide))
 
+    for child in reversed(module.imports):
+        await _on_application_shutdown(child, app)
 
-def _create_factory_resolver(provider: InjectionToken, module: 'Module') -> Any:
-    async def resolve_from_related() -> Any:
-        resolved = await module.aget(cast(InjectionToken, provider))
+
+def _create_factory_resolver(provider: InjectionToken, owner: 'Module') -> Any:
+    """
+    creates a factory that resolves a token straight from the container of the module that owns
+    it, within the activation scope of the module that is asking for it. If the owner provides it
+    as a singleton, the instance is kept once resolved.
+    """
+    container = owner.container
+    singleton = owner.scope_of(provider) == ServiceLifeStyle.SINGLETON
+    instances: List[Any] = []
+
+    async def resolve_from_owner(scope: ActivationScope) -> Any:
+        if instances:
+            return instances[0]
+
+        resolved = await container.aresolve(cast(InjectionToken, provider), scope)
+        if singleton:
+            instances.append(resolved)
         return resolved
 
-    return resolve_from_related
+    return resolve_from_owner
 
 
-class Module(PestPrimitive, OnModuleInit, OnApplicationBootstrap):
+def prepare_containers(module: 'Module') -> None:
+    """
+    builds the resolvers of the containers of a module tree, which is when the container reads
+    the constructors and factories of the providers, so that no request has to do it
+    """
+    for child in module.imports:
+        prepare_containers(child)
+
+    try:
+        module.container.provider
+    except Exception as e:
+        raise PestException(
+            f'Failed to prepare the providers of {type(module).__name__}: {e}',
+            hint='make sure every parameter of the constructors of its providers is annotated '
+            'with a token the module can provide',
+        ) from e
+
+
+def _scope_of(provider: Provider) -> Optional[ServiceLifeStyle]:
+    """returns the scope (life style) with which a provider is registered in a container"""
+    if isinstance(provider, (ClassProvider, FactoryProvider)):
+        return provider.scope if provider.scope is not None else ServiceLifeStyle.TRANSIENT
+    if isinstance(provider, ValueProvider):
+        return ServiceLifeStyle.SINGLETON
+    if isinstance(provider, ExistingProvider):
+        return None
+    return ServiceLifeStyle.TRANSIENT
+
+
+def _record_resolution(
+    trace: RequestTrace, token: InjectionToken, owner: 'Module', start: float
+) -> None:
+    """records a `resolve` span for a token, with the scope of its provider and its owner module"""
+    scope = owner.scope_of(token)
+    trace.record(
+        'resolve',
+        token_name(token),
+        start,
+        scope=scope.name.lower() if scope is not None else None,
+        module=type(owner).__name__,
+    )
+
+
+class ResolutionPlan(Generic[T]):
+    """
+    flattened resolution path of a token, as seen from a given module.
+
+    Instead of walking the chain of modules that relay the token (parents and exporters), the plan
+    points straight to the container of the module that actually owns the provider, so resolving
+    the token is a single call.
+    """
+
+    __slots__ = ('token', 'owner', 'container')
+
+    def __init__(self, token: InjectionToken[T], owner: 'Module') -> None:
+        self.token = token
+        self.owner = owner
+        self.container = owner.container
+
+    async def __call__(self, scope: Union[ActivationScope, None] = None) -> T:
+        trace = current_trace()
+        if trace is None:
+            return await self.container.aresolve(self.token, scope)
+
+        start = perf_counter()
+        try:
+            return await self.container.aresolve(self.token, scope)
+        finally:
+            _record_resolution(trace, self.token, self.owner, start)
+
+
+class Module(PestPrimitive, OnModuleInit, OnApplicationBootstrap, OnApplicationShutdown):
     __imported__providers__: Dict[InjectionToken, 'Module']
+    __owners__: Dict[InjectionToken, 'Module']
+    __provided__: Dict[InjectionToken, Provider]
     __parent_module__: Optional['Module']
     imports: List['Module']
     container: Container
     providers: List[Any]
     exports: List[InjectionToken]
     controllers: List[Type[Controller]]
+    eager: bool
+    dependency_graph: Optional[DependencyGraph]
 
     @property
     def routers(self) -> List[APIRouter]:
@@ -199,16 +394,31 @@ class Module(PestPrimitive, OnModuleInit, OnApplicationBootstrap):
     def __init__(self) -> None:
         self.__class_status__ = Status.NOT_SETUP
         self.__imported__providers__ = {}
+        self.__owners__ = {}
+        self.__provided__ = {}
         self.imports = []
         self.providers = []
         self.exports = []
         self.container = Container(strict=False)
         self.controllers = []
+        self.eager = True
+        self.dependency_graph = None
 
-    async def __setup_module__(self, parent: Optional['Module']) -> None:
+    async def __setup_module__(
+        self, parent: Optional['Module'], ctx: Optional[BootstrapContext] = None
+    ) -> None:
         if self.__class_status__ != Status.NOT_SETUP:
             return
         self.__class_status__ = Status.SETTING_UP
+        ctx = ctx if ctx is not None else BootstrapContext()
+
+        with ctx.measure(self, 'setup'):
+            await self.__setup__(parent, ctx)
+
+        # we're done
+        self.__class_status__ = Status.READY
+
+    async def __setup__(self, parent: Optional['Module'], ctx: BootstrapContext) -> None:
 
         if parent is not None and isinstance(parent, Module):
             self.__parent_module__ = parent
@@ -217,9 +427,10 @@ class Module(PestPrimitive, OnModuleInit, OnApplicationBootstrap):
         meta: ModuleMeta = get_meta(self.__class__, ModuleMeta)
 
         # set internal properties
-        self.providers = meta.providers if meta.providers else []
-        self.exports = meta.exports if meta.exports else []
-        self.controllers = meta.controllers if meta.controllers else []
+        self.providers = list(meta.providers) if meta.providers else []
+        self.exports = list(meta.exports) if meta.exports else []
+        self.controllers = list(meta.controllers) if meta.controllers else []
+        self.eager = meta.eager if meta.eager is not None else True
 
         # register providers in the di container
         for provider in self.providers:
@@ -227,44 +438,70 @@ class Module(PestPrimitive, OnModuleInit, OnApplicationBootstrap):
 
         # register controllers in the di container
         for controller in self.controllers:
-            setup_controller(controller, self)
-            self.register(controller)
+            with ctx.measure(self, 'setup', member=controller):
+                setup_controller(controller, self)
+                self.register(controller)
 
-        # register parent providers as factory providers here, so that we
-        # can have access to services provided by the parent module
-        # or globally (in the root module)
+        # link parent providers here, so that we can have access to services provided by the
+        # parent module or globally (in the root module)
         if parent is not None:
             for provider, _ in contained_in(parent):
-                self.register(
-                    FactoryProvider(
-                        provide=provider, use_factory=_create_factory_resolver(provider, parent)
-                    )
-                )
+                self.__link__(provider, parent.owner_of(provider))
 
-        # setup child modules
-        for child in meta.imports if meta.imports else []:
-            child_instance = await setup_module(child, self)
-            self.imports += [child_instance]
+        # setup child modules; siblings don't depend on each other (they can only see what their
+        # parents provide), so they can be set up concurrently if the bootstrap allows it
+        children = meta.imports if meta.imports else []
+        self.imports += await ctx.all(partial(setup_module, child, self, ctx) for child in children)
 
         # register providers exported by child modules
         for imported_module in self.imports:
             for exported_provider in imported_module.exports:
                 self.__imported__providers__[exported_provider] = imported_module
+                self.__link__(exported_provider, imported_module.owner_of(exported_provider))
 
-                self.register(
-                    FactoryProvider(
-                        provide=exported_provider,
-                        use_factory=_create_factory_resolver(exported_provider, imported_module),
-                    )
-                )
-
-        await _on_module_init(self)
-
-        # we're done
-        self.__class_status__ = Status.READY
+        # every token is reachable from this module now, so we can flatten the resolution path
+        # of the tokens injected into our controllers' handlers and of their guards
+        for controller in self.controllers:
+            for injector in injectors_of(controller):
+                injector.compile()
+            for handler, guard in guards_of(controller):
+                guard.compile(handler, self)
+
+        # every token the module can see is linked by now, so we can make sure its providers and
+        # controllers can be resolved before instantiating anything
+        self.dependency_graph = validate(self)
+
+        with ctx.measure(self, 'init'):
+            await _on_module_init(self, ctx)
+
+    def __link__(self, token: InjectionToken, owner: 'Module') -> None:
+        """
+        makes a token provided by another module (the `owner`) available in this module.
+
+        The token is always linked to the module that actually provides it (never to a module
+        that is just relaying it), so resolving it costs the same no matter how deep in the
+        module tree we are.
+        """
+        self.__owners__[token] = owner
+        provider = owner.__provided__.get(token)
+
+        if isinstance(provider, ValueProvider):
+            self.container.add_instance(declared_class=token, instance=provider.use_value)
+        else:
+            self.container.register_factory(
+                factory=_create_factory_resolver(token, owner),
+                return_type=token,
+                life_style=ServiceLifeStyle.TRANSIENT,
+            )
 
     def register(self, provider: Provider) -> None:
-        if isinstance(provider, ClassProvider):
+        token = provider.provide if isinstance(provider, ProviderBase) else provider
+        self.__provided__[token] = provider
+
+        if is_pooled(provider):
+            # dij has no pooled life style, so the pooled resolver is bound straight away
+            self.container._bind(provider.provide, PooledResolver(provider, self.container))
+        elif isinstance(provider, ClassProvider):
             self.container.bind_types(
                 provider.provide,
                 provider.use_class,
@@ -295,6 +532,23 @@ class Module(PestPrimitive, OnModuleInit, OnApplicationBootstrap):
             return True
         return False
 
+    def owner_of(self, token: InjectionToken) -> 'Module':
+        """returns the module that actually owns the provider of a given token"""
+        return self.__owners__.get(token, self)
+
+    def scope_of(self, token: InjectionToken) -> Optional[ServiceLifeStyle]:
+        """
+        returns the scope (life style) of the provider of a given token, or `None` if the
+        token can't be provided or is an alias
+        """
+        owner = self.owner_of(token)
+        provider = owner.__provided__.get(token)
+        return _scope_of(provider) if provider is not None else None
+
+    def resolution_plan(self, token: InjectionToken[T]) -> ResolutionPlan[T]:
+        """returns a flattened resolution path for a given token"""
+        return ResolutionPlan(token, self.owner_of(token))
+
     def __iter__(self) -> Iterator[InjectionToken]:
         for provider, _ in self.container:
             yield provider
@@ -302,26 +556,28 @@ class Module(PestPrimitive, OnModuleInit, OnApplicationBootstrap):
     def get(
         self, token: InjectionToken[T], scope: Union[ActivationScope, None] = None, **kwargs: Any
     ) -> T:
-        if token in self.__imported__providers__:
-            return self.__get_from_imported(token, scope=scope)
+        owner = self.__owners__.get(token, self)
+        trace = current_trace()
+        if trace is None:
+            return owner.container.resolve(token, scope=scope, **kwargs)
 
-        return self.container.resolve(token, scope=scope, **kwargs)
+        start = perf_counter()
+        try:
+            return owner.container.resolve(token, scope=scope, **kwargs)
+        finally:
+            _record_resolution(trace, token, owner, start)
 
     async def aget(self, token: InjectionToken[T], scope: Union[ActivationScope, None] = None) -> T:
-        if token in self.__imported__providers__:
-            return await self.__aget_from_imported(token, scope=scope)
-
-        return await self.container.aresolve(token, scope=scope)
-
-    def __get_from_imported(
-        self, token: InjectionToken[T], scope: Union[ActivationScope, None] = None
-    ) -> T:
-        return self.__imported__providers__[token].get(token, scope=scope)
-
-    async def __aget_from_imported(
-        self, token: InjectionToken[T], scope: Union[ActivationScope, None] = None
-    ) -> T:
-        return await self.__imported__providers__[token].aget(token, scope=scope)
+        owner = self.__owners__.get(token, self)
+        trace = current_trace()
+        if trace is None:
+            return await owner.container.aresolve(token, scope=scope)
+
+        start = perf_counter()
+        try:
+            return await owner.container.aresolve(token, scope=scope)
+        finally:
+            _record_resolution(trace, token, owner, start)
 
     def __get_routers(self) -> List[APIRouter]:
         routers = []
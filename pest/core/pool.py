@@ -0,0 +1,100 @@
+from typing import Any, Callable, List, Tuple
+
+from dij import ActivationScope, Container, ServiceLifeStyle
+from dij.resolver.context import ResolutionContext
+from dij.resolver.dynamic import DynamicResolver
+
+from ..logging import log
+from ..metadata.types.injectable_meta import ClassProvider, InjectionToken
+from ..utils.functions import maybe_coro
+
+POOLED_KEY = '__pest_pooled__'
+'''🐀 ⇝ the key of the scoped services of a di scope where its pooled instances are tracked'''
+
+
+class ProviderPool:
+    """
+    🐀 ⇝ bounded pool of idle instances of a pooled provider. Instances are only taken and
+    given back from the event loop's thread, so no locks are needed
+    """
+
+    __slots__ = ('size', 'idle', 'created')
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.idle: List[Any] = []
+        self.created = 0
+
+    def acquire(self, create: Callable[[], Any]) -> Any:
+        """takes an idle instance, or creates a new one if there's none"""
+        if self.idle:
+            return self.idle.pop()
+        self.created += 1
+        return create()
+
+    async def release(self, instance: Any) -> None:
+        """
+        resets an instance (calling its `reset()` method, if it has one) and keeps it for the
+        next scope, unless the pool is full or the reset failed
+        """
+        reset = getattr(instance, 'reset', None)
+        if reset is not None:
+            try:
+                await maybe_coro(reset())
+            except Exception:
+                log.exception(f'Failed to reset pooled {type(instance).__name__}, discarding it')
+                return
+
+        if len(self.idle) < self.size:
+            self.idle.append(instance)
+
+
+class PooledProvider:
+    """🐀 ⇝ activates a pooled token: one instance per scope, checked out of its pool"""
+
+    __slots__ = ('token', 'pool', 'activator')
+
+    def __init__(self, token: InjectionToken, pool: ProviderPool, activator: Callable) -> None:
+        self.token = token
+        self.pool = pool
+        self.activator = activator
+
+    def __call__(self, context: ActivationScope, parent_type: Any, *_args: Any) -> Any:
+        services = context.scoped_services
+        if services is None:
+            raise ValueError('Scoped services are not available')
+
+        if self.token in services:
+            return services[self.token]
+
+        instance = self.pool.acquire(lambda: self.activator(context, parent_type))
+        services[self.token] = instance
+        services.setdefault(POOLED_KEY, []).append((self.pool, instance))
+        return instance
+
+
+class PooledResolver:
+    """
+    🐀 ⇝ container resolver of a pooled class provider. Its dependencies are resolved like
+    those of any other class; only the activation of the class itself goes through the pool
+    """
+
+    __slots__ = ('token', 'pool', 'resolver')
+
+    def __init__(self, provider: ClassProvider, container: Container) -> None:
+        self.token = provider.provide
+        self.pool = ProviderPool(provider.pool or 0)
+        self.resolver = DynamicResolver(provider.use_class, container, ServiceLifeStyle.TRANSIENT)
+
+    def __call__(self, context: ResolutionContext, *_args: Any) -> PooledProvider:
+        return PooledProvider(self.token, self.pool, self.resolver(context))
+
+
+async def release_pooled(scope: ActivationScope) -> None:
+    """🐀 ⇝ gives the pooled instances checked out by a di scope back to their pools"""
+    services = scope.scoped_services
+    checked_out: List[Tuple[ProviderPool, Any]] = (
+        services.pop(POOLED_KEY, []) if services is not None else []
+    )
+    for pool, instance in checked_out:
+        await pool.release(instance)
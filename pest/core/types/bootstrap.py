@@ -0,0 +1,26 @@
+from typing import TypedDict
+
+
+class BootstrapOptions(TypedDict, total=False):
+    """🐀 ⇝ options to control how the module tree is set up when the application starts"""
+
+    concurrent: bool
+    '''
+    sets up sibling modules concurrently and calls the `on_module_init` hooks of the providers
+    and controllers of a module concurrently. A module is still initialized only after all of
+    its imports are. Defaults to `False`
+    '''
+    max_concurrency: int
+    '''
+    maximum amount of `on_module_init` hooks that can be running at the same time when
+    `concurrent` is enabled. Unlimited by default
+    '''
+    report: bool
+    '''logs how long it took to set up and initialize each module'''
+    profile: bool
+    '''
+    records how long each step of the startup (module setup, controller setup, lifecycle hooks
+    and route registration) takes and logs it as an annotated module tree
+    '''
+    profile_output: str
+    '''path of a JSON file where the startup profile is written (implies `profile`)'''
@@ -25,3 +25,9 @@ class ModuleMetaDict(TypedDict, total=False):
 
     controllers: Union[List[Type[Controller]], None]
     '''🐀 ⇝ list of controllers to be registered'''
+
+    eager: Union[bool, None]
+    '''
+    🐀 ⇝ whether the singleton providers of the module are instantiated while the application
+    bootstraps (unless a provider says otherwise). Defaults to `True`
+    '''
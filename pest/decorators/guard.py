@@ -1,28 +1,50 @@
+import asyncio
 import inspect
+from collections import OrderedDict
 from functools import wraps
 from inspect import Parameter, getmembers, iscoroutinefunction, isfunction, signature
+from time import monotonic, perf_counter
+from types import MappingProxyType
 from typing import (
+    TYPE_CHECKING,
     Any,
     Awaitable,
     Callable,
     Dict,
+    Hashable,
+    Iterable,
+    Iterator,
     List,
+    Literal,
+    Mapping,
     Optional,
     Protocol,
+    Sequence,
     Tuple,
     Type,
+    TypedDict,
     Union,
     get_args,
 )
 
+from dij import ActivationScope, ServiceLifeStyle
 from fastapi import Depends, Request
 
+from ..core.controller import GUARDS
 from ..core.handler import HandlerFn
+from ..exceptions.base.pest import PestException
 from ..exceptions.http.http import ForbiddenException
 from ..metadata.meta import get_meta, get_meta_value
 from ..metadata.types._meta import PestType
+from ..metadata.types.injectable_meta import ClassProvider
+from ..middleware.di import scope_from
+from ..tracing.trace import current_trace
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..core.module import Module, ResolutionPlan
 
 GuardCb = Callable[[Dict[str, Any]], None]
+GuardMode = Literal['all', 'any']
 
 
 # TODO: Guard config
@@ -34,13 +56,41 @@ GuardCb = Callable[[Dict[str, Any]], None]
 #       a `Protocol` and add a `config` attribute to it.
 
 
-class GuardCtx(Dict[str, Any]):
+DEPS_KEY = '__pest_guard_deps__'
+
+
+class GuardCtx(Mapping[str, Any]):
+    """
+    🐀 ⇝ read-only context of a guard: the metadata of the guarded handler plus the resolved
+    values of the guard's dependencies (see `use_guard`) for the current request
+    """
+
+    __slots__ = ('__meta', '__deps')
+
+    def __init__(
+        self, meta: Mapping[str, Any] = {}, deps: Union[Mapping[str, Any], None] = None
+    ) -> None:
+        self.__meta = meta
+        self.__deps = deps if deps is not None else meta.get(DEPS_KEY, {})
+
+    def __getitem__(self, key: str) -> Any:
+        if key == DEPS_KEY:
+            return self.__deps
+        return self.__meta[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.__meta
+        if DEPS_KEY not in self.__meta:
+            yield DEPS_KEY
+
+    def __len__(self) -> int:
+        return len(self.__meta) + (0 if DEPS_KEY in self.__meta else 1)
+
     def dep(self, key: str) -> Any:
-        deps = self.deps()
-        return deps.get(key, None)
+        return self.__deps.get(key, None)
 
-    def deps(self) -> Dict[str, Any]:
-        return self.get('__pest_guard_deps__', {})
+    def deps(self) -> Mapping[str, Any]:
+        return self.__deps
 
 
 class Guard(Protocol):
@@ -53,14 +103,154 @@ class Guard(Protocol):
         ...
 
 
-def use_guard(guard: Type[Guard], **depends: Any) -> Callable:
-    """🐀 ⇝ decorator to apply a guard either to a single method or all methods in a class"""
+GuardCacheKey = Callable[[Request, GuardCtx], Optional[Hashable]]
+
+
+class GuardCache:
+    """
+    🐀 ⇝ memoizes the verdicts of a guard (and the extras it sets with `set_result`), so that
+    repeated requests skip the guard entirely
+
+    #### Params
+    - key: computes the cache key of a request (e.g. its bearer token) from the request and the
+      guard's context. If it returns `None`, the request is not cached
+    - ttl: seconds a verdict is kept for
+    - maxsize: maximum amount of verdicts kept; the least recently used ones are dropped first
+
+    ```python
+    cache = GuardCache(key=lambda _, ctx: ctx.dep('token'))
+
+    @use_guard(AuthGuard, options={'cache': cache}, token=auth_scheme)
+    ```
+
+    Verdicts are cached per handler, so a verdict of a route is never reused for another one.
+    Exceptions raised by the guard are not cached.
+    """
+
+    def __init__(
+        self,
+        key: GuardCacheKey,
+        ttl: float = 60.0,
+        maxsize: int = 1024,
+        timer: Callable[[], float] = monotonic,
+    ) -> None:
+        self.key = key
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[Hashable, Tuple[float, bool, Dict[str, Any]]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Tuple[bool, Dict[str, Any]]]:
+        """returns the cached verdict and extras for a key, if there's a fresh one"""
+        entry = self.__entries.get(key)
+        if entry is None or entry[0] <= self.timer():
+            if entry is not None:
+                del self.__entries[key]
+            self.misses += 1
+            return None
+
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], dict(entry[2])
+
+    def set(self, key: Hashable, verdict: bool, extras: Dict[str, Any]) -> None:
+        """caches a verdict and its extras"""
+        self.__entries[key] = (self.timer() + self.ttl, verdict, dict(extras))
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """drops every cached verdict and resets the counters"""
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+class GuardOptions(TypedDict, total=False):
+    """🐀 ⇝ options of `use_guard` and `use_guards`"""
+
+    mode: GuardMode
+    '''
+    `'all'` to require every guard to allow the request (the default) or `'any'` to require at
+    least one of them to
+    '''
+    cache: GuardCache
+    '''caches the verdict of each guard (see `GuardCache`)'''
+
+
+def use_guard(
+    guard: Type[Guard], *, options: Optional[GuardOptions] = None, **depends: Any
+) -> Callable:
+    """
+    🐀 ⇝ decorator to apply a guard either to a single method or all methods in a class
+
+    #### Params
+    - guard: the guard to apply
+    - options: options of the guard, e.g. `{'cache': GuardCache(...)}` (see `GuardOptions`)
+    - **depends: dependencies (as in `fastapi.Depends`) exposed to the guard through its context
+    """
+    return use_guards(guard, options=options, **depends)
+
+
+def use_guards(
+    *guards: Type[Guard], options: Optional[GuardOptions] = None, **depends: Any
+) -> Callable:
+    """
+    🐀 ⇝ decorator to apply several guards at once, either to a single method or all methods in
+    a class. The guards are evaluated concurrently and the evaluation stops as soon as the
+    outcome is known
+
+    #### Params
+    - *guards: the guards to apply
+    - options: how the guards are evaluated, e.g. `{'mode': 'any'}` (see `GuardOptions`)
+    - **depends: dependencies (as in `fastapi.Depends`) exposed to the guards through their context
+
+    The extras set by the guards that allowed the request (`set_result`) are merged, in the order
+    the guards were given.
+    """
+    if not guards:
+        raise PestException(
+            'use_guards requires at least one guard',
+            hint='pass the guards to apply, e.g. `use_guards(AuthGuard, RolesGuard)`',
+        )
+
+    # `options` is the only keyword that's not a dependency, so a dependency with that name
+    # would be taken for the options
+    if options is not None and not isinstance(options, dict):
+        raise PestException(
+            f'Invalid guard options: {options!r}',
+            hint='`options` is reserved for the `GuardOptions` of the guards, give the '
+            'dependency another name',
+        )
+
+    options = options or {}
+    unknown = set(options) - set(GuardOptions.__annotations__)
+    if unknown:
+        raise PestException(
+            f'Unknown guard options: {", ".join(sorted(unknown))}',
+            hint='the options of the guards are `mode` and `cache`, pass the dependencies of '
+            'the guards as keyword arguments instead',
+        )
+
+    mode = options.get('mode', 'all')
+    cache = options.get('cache', None)
+    if mode not in ('all', 'any'):
+        raise PestException(
+            f'Invalid guard mode: {mode!r}',
+            hint="`mode` must be either `'all'` or `'any'`",
+        )
 
     def decorator(target: Callable) -> Callable:
         if isinstance(target, type):  # If it's a class, apply to all methods
-            return _apply_guard_to_class(target, guard, depends)
+            return _apply_guard_to_class(target, guards, depends, cache, mode)
         else:
-            return _apply_guard_to_method(target, guard, depends)
+            return _apply_guard_to_method(target, guards, depends, cache, mode)
 
     return decorator
 
@@ -69,6 +259,169 @@ class GuardExtra(Dict[str, Any]):
     pass
 
 
+class _GuardRunner:
+    """
+    resolves the guard of a handler from the module of the handler's controller.
+
+    Guards are provided as singletons by the controller's module unless the module (or one of its
+    parents/imports) already provides them, e.g. as a `Scope.SCOPED` provider, to get a new guard
+    for each request.
+    """
+
+    __slots__ = ('guard', 'meta', 'plan', 'singleton', 'instance')
+
+    def __init__(self, guard: Type[Guard]) -> None:
+        self.guard = guard
+        self.meta: Optional[Mapping[str, Any]] = None
+        self.plan: Optional['ResolutionPlan'] = None
+        self.singleton = False
+        self.instance: Optional[Guard] = None
+
+    def compile(self, handler: Callable, module: Optional['Module'] = None) -> None:
+        """takes a snapshot of the handler's metadata and prepares the guard's resolution"""
+        self.meta = MappingProxyType(dict(get_meta(handler, raise_error=False)))
+        self.plan = None
+        self.singleton = False
+        self.instance = None
+
+        if module is None:
+            return
+
+        if not module.can_provide(self.guard):
+            module.register(
+                ClassProvider(
+                    provide=self.guard, use_class=self.guard, scope=ServiceLifeStyle.SINGLETON
+                )
+            )
+
+        self.plan = module.resolution_plan(self.guard)
+        self.singleton = module.scope_of(self.guard) == ServiceLifeStyle.SINGLETON
+
+    async def resolve(self, scope: Union[ActivationScope, None]) -> Guard:
+        if self.instance is not None:
+            return self.instance
+
+        if self.plan is None:
+            # the controller was never set up in a module, so there's no container to resolve
+            # the guard from
+            return self.guard()
+
+        instance = await self.plan(scope)
+        if self.singleton:
+            self.instance = instance
+        return instance
+
+    async def check(
+        self, request: Request, context: GuardCtx, cache: Optional[GuardCache] = None
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """runs the guard (or reuses its cached verdict) and returns its verdict and extras"""
+        trace = current_trace()
+        if trace is None:
+            return await self._check(request, context, cache)
+
+        start = perf_counter()
+        allowed: Optional[bool] = None
+        try:
+            allowed, extras = await self._check(request, context, cache)
+            return allowed, extras
+        finally:
+            trace.record('guard', self.guard.__name__, start, allowed=allowed)
+
+    async def _check(
+        self, request: Request, context: GuardCtx, cache: Optional[GuardCache]
+    ) -> Tuple[bool, Dict[str, Any]]:
+        cache_key = None
+        if cache is not None:
+            key = cache.key(request, context)
+            if key is not None:
+                # verdicts are cached per handler
+                cache_key = (self, key)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+        extras: Dict[str, Any] = {}
+
+        def set_result(result: Dict[str, Any]) -> None:
+            nonlocal extras
+            extras = result
+
+        guard = await self.resolve(scope_from(request))
+        verdict = guard.can_activate(request, context=context, set_result=set_result)
+        if inspect.isawaitable(verdict):
+            verdict = await verdict
+
+        allowed = verdict is not False
+        if cache is not None and cache_key is not None:
+            cache.set(cache_key, allowed, extras)
+
+        return allowed, extras
+
+
+def _merge(extras: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {}
+    for extra in extras:
+        merged.update(extra)
+    return merged
+
+
+async def _evaluate(
+    runners: Sequence[_GuardRunner],
+    mode: GuardMode,
+    request: Request,
+    context: GuardCtx,
+    cache: Optional[GuardCache] = None,
+) -> Dict[str, Any]:
+    """
+    evaluates the guards of a handler and returns the merged extras of the guards that allowed
+    the request, or raises a `ForbiddenException` if the request is not allowed
+    """
+    if len(runners) == 1:
+        allowed, extras = await runners[0].check(request, context, cache)
+        if not allowed:
+            raise ForbiddenException('Not authorized')
+        return extras
+
+    tasks = [asyncio.ensure_future(runner.check(request, context, cache)) for runner in runners]
+    index = {task: i for i, task in enumerate(tasks)}
+    allowed_extras: Dict[int, Dict[str, Any]] = {}
+    errors: Dict[int, BaseException] = {}
+    pending = set(tasks)
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=index.__getitem__):
+                error = task.exception()
+                if error is not None:
+                    if mode == 'all':
+                        raise error
+                    # in `any` mode, a failing guard is just a guard that didn't allow the request
+                    errors[index[task]] = error
+                    continue
+
+                allowed, extras = task.result()
+                if allowed:
+                    allowed_extras[index[task]] = extras
+                elif mode == 'all':
+                    raise ForbiddenException('Not authorized')
+
+            if mode == 'any' and allowed_extras:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    if mode == 'any' and not allowed_extras:
+        if errors:
+            raise errors[min(errors)]
+        raise ForbiddenException('Not authorized')
+
+    return _merge(allowed_extras[i] for i in sorted(allowed_extras))
+
+
 def _extract_params(params: List[Parameter]) -> Tuple[Optional[Parameter], List[Parameter]]:
     """
     extracts the request and all parameters annotated with "guard_extra" from a list of parameters
@@ -95,7 +448,11 @@ def _extract_params(params: List[Parameter]) -> Tuple[Optional[Parameter], List[
 
 # applies the guard to a single method
 def _apply_guard_to_method(
-    func: Callable, guard: Type[Guard], depends: Dict[str, Any] = {}
+    func: Callable,
+    guards: Sequence[Type[Guard]],
+    depends: Dict[str, Any] = {},
+    cache: Optional[GuardCache] = None,
+    mode: GuardMode = 'all',
 ) -> Callable:
     sig = signature(func)
     params: List[Parameter] = list(sig.parameters.values())
@@ -129,9 +486,13 @@ def _apply_guard_to_method(
     # remove the extras the `params` list
     params = [param for param in params if param not in extras]
 
+    runners = [_GuardRunner(guard) for guard in guards]
+
     @wraps(func)
     async def wrapper(*args: Any, **kwargs: Any) -> Any:
-        meta = get_meta(func)
+        if runners[0].meta is None:
+            for runner in runners:
+                runner.compile(wrapper)
 
         # try to extract the request object from kwargs or args
         request = kwargs.get(request_param_name)
@@ -144,26 +505,12 @@ def _apply_guard_to_method(
         if not request:
             raise ValueError('Request object not found in args or kwargs')
 
-        extra_result: Dict[str, Any] = {}
-
-        def set_result(result: Dict[str, Any]) -> None:
-            nonlocal extra_result
-            extra_result = result
-
-        # get the deps from the kwargs and add them to the meta, into a __pest_guard_deps__ dict
+        # get the deps from the kwargs, they're exposed to the guards through their context
         deps = {key: kwargs.pop(f'__pest_guard_dep_{key}__', None) for key in depends.keys()}
-        meta['__pest_guard_deps__'] = deps
-
-        # apply the guard
-        guard_instance = guard()
-        verdict = guard_instance.can_activate(
-            request, context=GuardCtx(meta), set_result=set_result
-        )
-        if inspect.isawaitable(verdict):
-            verdict = await verdict
 
-        if verdict is False:
-            raise ForbiddenException('Not authorized')
+        # apply the guards
+        context = GuardCtx(runners[0].meta, deps)
+        extra_result = await _evaluate(runners, mode, request, context, cache)
 
         # if the request was not in the original signature, remove it from args/kwargs
         if not request_was_in_original_sig:
@@ -181,11 +528,18 @@ def _apply_guard_to_method(
 
     # update the signature to include the new 'request' parameter
     setattr(wrapper, '__signature__', sig.replace(parameters=params))
+    setattr(wrapper, GUARDS, [*getattr(func, GUARDS, []), *runners])
     return wrapper
 
 
 # applies the guard to all methods in a class
-def _apply_guard_to_class(cls: type, guard: Type[Guard], depends: Dict[str, Any] = {}) -> type:
+def _apply_guard_to_class(
+    cls: type,
+    guards: Sequence[Type[Guard]],
+    depends: Dict[str, Any] = {},
+    cache: Optional[GuardCache] = None,
+    mode: GuardMode = 'all',
+) -> type:
     members = getmembers(cls, lambda m: isfunction(m))
     handlers: List[HandlerFn] = []
 
@@ -195,7 +549,7 @@ def _apply_guard_to_class(cls: type, guard: Type[Guard], depends: Dict[str, Any]
             handlers.append(method)
 
     for handler in handlers:
-        replacement = _apply_guard_to_method(handler, guard, depends)
+        replacement = _apply_guard_to_method(handler, guards, depends, cache, mode)
         setattr(cls, handler.__name__, replacement)
 
     return cls
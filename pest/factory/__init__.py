@@ -3,14 +3,16 @@ try:
 except ImportError:
     from typing_extensions import Unpack, cast
 
-from typing import Union
+from typing import Sequence, Union
 
 from starlette.types import Lifespan
 
 from ..core.application import PestApplication
+from ..core.types.bootstrap import BootstrapOptions
 from ..core.types.fastapi_params import FastAPIParams
 from ..logging import LoggingOptions, log
 from ..middleware.types import CorsOptions, MiddlewareDef
+from ..tracing.trace import TraceHook
 from ..utils.functions import getset
 from . import post_app, pre_app
 from .app_creator import make_app as make_app
@@ -29,6 +31,9 @@ class Pest:
         prefix: str = '',
         cors: Union[CorsOptions, None] = None,
         lifespan: Union[Lifespan[PestApplication], None] = None,
+        bootstrap: Union[BootstrapOptions, None] = None,
+        openapi_file: Union[str, None] = None,
+        tracing: Union[TraceHook, Sequence[TraceHook], None] = None,
         **fastapi_params: Unpack[FastAPIParams],
     ) -> PestApplication:
         """
@@ -38,6 +43,12 @@ class Pest:
         - logging: logging options (needs `loguru` to be installed)
         - middleware: a list of middlewares to be applied to the application
         - prefix: the prefix for the application's routes
+        - bootstrap: options to control how the module tree is set up (e.g. concurrently)
+        - openapi_file: path to a precomputed OpenAPI schema (see `openapi.dump`) to be served
+          instead of generating it
+        - tracing: one or more hooks to receive a trace of each request, with the time spent
+          resolving dependencies, in guards, middlewares and handlers (e.g. a `HistogramExporter`).
+          Tracing is disabled (and costs nothing) unless a hook is given
         """
         name = getset(cast(dict, fastapi_params), 'title', 'pest 🐀')
 
@@ -45,7 +56,14 @@ class Pest:
         log.info(f'Initializing {name}')
 
         app = make_app(
-            fastapi_params, root_module, lifespan=lifespan, prefix=prefix, middleware=middleware
+            fastapi_params,
+            root_module,
+            lifespan=lifespan,
+            prefix=prefix,
+            middleware=middleware,
+            bootstrap=bootstrap,
+            openapi_file=openapi_file,
+            tracing=tracing,
         )
         app = post_app.setup(app, cors=cors)
         return app
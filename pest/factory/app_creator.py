@@ -1,5 +1,7 @@
+import asyncio
+import json
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, List, Optional, Union, cast
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union, cast
 
 from fastapi.routing import APIRoute
 from starlette.types import Lifespan
@@ -7,54 +9,99 @@ from starlette.types import Lifespan
 from pest.logging import log
 
 from ..core.application import PestApplication
-from ..core.module import _on_application_bootstrap, setup_module
+from ..core.bootstrap import BootstrapContext
+from ..core.module import (
+    _on_application_bootstrap,
+    _on_application_shutdown,
+    prepare_containers,
+    setup_module,
+)
+from ..core.types.bootstrap import BootstrapOptions
 from ..core.types.fastapi_params import FastAPIParams
 from ..metadata.meta import get_meta_value
+from ..middleware.base import register_middlewares
 from ..middleware.types import CorsOptions, MiddlewareDef
+from ..tracing.trace import TraceHook
 from ..utils.functions import chain_lifespan
-from . import openapi
+
+
+def _dump_profile(path: str, profile: Dict[str, Any]) -> None:
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
 
 
 def app_lifespan(
     root_module: type,
     prefix: str,
     cors: Union[CorsOptions, None] = None,
+    bootstrap: Union[BootstrapOptions, None] = None,
 ) -> Lifespan['PestApplication']:
     @asynccontextmanager
     async def main_lifespan(app: PestApplication) -> AsyncIterator[None]:
         """main lifespan function
 
         creates the module tree, appends routes to app and triggers the `on_application_bootstrap`
-        lifecycle hooks
+        lifecycle hooks (and the `on_application_shutdown` ones, once the application stops)
         """
 
-        module_tree = await setup_module(root_module)
+        options = bootstrap or {}
+        ctx = BootstrapContext(options)
+
+        with ctx.measure_phase('modules'):
+            module_tree = await setup_module(root_module, ctx=ctx)
         app.__pest_module__ = module_tree
+
+        # class based middlewares are resolved from the root module on each request
+        register_middlewares(module_tree, app.user_middleware)
+
+        # no more providers are registered from now on, so the containers can prepare their
+        # resolvers once and for all
+        prepare_containers(module_tree)
+
+        if options.get('report', False):
+            log.info(f'Module tree bootstrapped: \n{ctx.report(module_tree)}')
+
         routers = module_tree.routers
 
-        for router in routers:
-            # log routes while we add em
-            log.info(f'Setting up {get_meta_value(router, "name")}')
-            for route in cast(List[APIRoute], router.routes):
-                for method in route.methods:
-                    full_route = f'{prefix}{route.path}'
+        with ctx.measure_phase('routes'):
+            for router in routers:
+                name = get_meta_value(router, 'name')
+                with ctx.measure_phase('routes', route=name):
+                    # log routes while we add em
+                    log.info(f'Setting up {name}')
+                    for route in cast(List[APIRoute], router.routes):
+                        for method in route.methods:
+                            log.debug(f'{method: <7} {prefix}{route.path}')
 
-                    if full_route == '/' or not full_route.endswith('/'):
-                        log.debug(f'{method: <7} {full_route}')
+                    # add the router
+                    app.include_router(router, prefix=prefix)
 
-            # add the router
-            app.include_router(router, prefix=prefix)
+            # compile the dispatch index now, so that the first request doesn't pay for it
+            app.route_index.refresh(app.router)
 
-        # recreate the openapi schema to include the new routes and customizations
-        openapi.patch(app)
+        # the openapi schema is generated (and patched) the first time it's requested, but it
+        # might have been generated before the routes were added, so we make sure it's not stale
+        app.openapi_schema = None
 
         log.debug(f'{app.title} initialized: \n{app}')
 
         # trigger the on_application_bootstrap lifecycle hooks on the module tree
-        await _on_application_bootstrap(module_tree, app)
+        with ctx.measure_phase('application_bootstrap'):
+            await _on_application_bootstrap(module_tree, app, ctx)
+
+        if options.get('profile', False) or 'profile_output' in options:
+            log.info(f'Startup profile: \n{ctx.profile_tree(module_tree)}')
+
+        if 'profile_output' in options:
+            # written in a thread, so that a slow disk doesn't block the event loop
+            await asyncio.to_thread(
+                _dump_profile, options['profile_output'], ctx.profile(module_tree)
+            )
 
         yield
 
+        await _on_application_shutdown(module_tree, app)
+
     return main_lifespan
 
 
@@ -65,11 +112,16 @@ def make_app(
     middleware: MiddlewareDef = [],
     cors: Union[CorsOptions, None] = None,
     prefix: str = '',
+    bootstrap: Union[BootstrapOptions, None] = None,
+    openapi_file: Union[str, None] = None,
+    tracing: Union[TraceHook, Sequence[TraceHook], None] = None,
 ) -> PestApplication:
     """Creates the pest application instance"""
-    main_lifespan = app_lifespan(root_module, prefix, cors)
+    main_lifespan = app_lifespan(root_module, prefix, cors, bootstrap)
     return PestApplication(
         middleware=middleware,
         lifespan=chain_lifespan(main_lifespan, lifespan) if lifespan else main_lifespan,
+        openapi_file=openapi_file,
+        tracing=tracing,
         **fastapi_params,
     )
@@ -1,15 +1,19 @@
-from ..core.application import PestApplication
+import json
+from typing import TYPE_CHECKING, Any, Dict
+
 from ..exceptions.http.http import ExceptionResponse
 from ..utils.functions import model_schema
 
+if TYPE_CHECKING:
+    from ..core.application import PestApplication
 
-def patch(app: PestApplication) -> None:
-    """Patches the OpenAPI schema"""
-    openapi_schema = app.openapi()
-    if not openapi_schema:
-        return
 
-    for path in openapi_schema['paths']:
+def patch_schema(openapi_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Patches an OpenAPI schema in place, replacing FastAPI's 422 validation error responses
+    with pest's 400 `ExceptionResponse`
+    """
+    for path in openapi_schema.get('paths', {}):
         for method in openapi_schema['paths'][path]:
             if openapi_schema['paths'][path][method]['responses'].get('422'):
                 openapi_schema['paths'][path][method]['responses']['400'] = openapi_schema['paths'][
@@ -35,16 +39,41 @@ def patch(app: PestApplication) -> None:
                 # remove 422
                 openapi_schema['paths'][path][method]['responses'].pop('422')
 
-        components = openapi_schema.get('components')
-        if components:
-            # remove ValidationError and HTTPValidationError
-            schemas = components.get('schemas')
-            if schemas:
-                if schemas.get('ValidationError'):
-                    schemas.pop('ValidationError')
-                if schemas.get('HTTPValidationError'):
-                    schemas.pop('HTTPValidationError')
-                if not schemas.get('ExceptionResponse'):
-                    schemas['ExceptionResponse'] = model_schema(ExceptionResponse)
-
-        app.openapi_schema = openapi_schema
+    components = openapi_schema.get('components')
+    if components:
+        # remove ValidationError and HTTPValidationError
+        schemas = components.get('schemas')
+        if schemas:
+            if schemas.get('ValidationError'):
+                schemas.pop('ValidationError')
+            if schemas.get('HTTPValidationError'):
+                schemas.pop('HTTPValidationError')
+            if not schemas.get('ExceptionResponse'):
+                schemas['ExceptionResponse'] = model_schema(ExceptionResponse)
+
+    return openapi_schema
+
+
+def patch(app: 'PestApplication') -> None:
+    """
+    Eagerly generates and patches the OpenAPI schema. Pest apps do this lazily (the first time
+    the schema is requested), so this is only useful to pay the price upfront
+    """
+    app.openapi_schema = None
+    app.openapi()
+
+
+def load(path: str) -> Dict[str, Any]:
+    """Loads a precomputed (already patched) OpenAPI schema from a JSON file"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def dump(app: 'PestApplication', path: str) -> None:
+    """
+    Writes the (patched) OpenAPI schema of an app to a JSON file, so that it can be loaded
+    with the `openapi_file` option instead of being generated by every worker. The app needs to
+    be started (its lifespan must have run) for its routes to be in the schema
+    """
+    with open(path, 'w') as f:
+        json.dump(app.openapi(), f)
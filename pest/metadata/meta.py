@@ -1,5 +1,19 @@
+from copy import copy
 from dataclasses import asdict, fields, is_dataclass
-from typing import Any, Callable, Dict, List, Mapping, Type, TypeVar, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from dacite import Config, from_dict
 
@@ -13,6 +27,90 @@ META_KEY = '__pest__'
 
 DataType = TypeVar('DataType', bound=Union[Dict[str, Any], dict, Meta, DataclassInstance])
 GenericValue = TypeVar('GenericValue')
+SnapshotKey = Tuple[type, bool, Tuple[str, ...], Tuple[str, ...]]
+
+
+class MetaDict(Dict[str, Any]):
+    """
+    🐀 ⇝ raw metadata of a target (what's stored under `__pest__`).
+
+    Pest's typed metadata (e.g. `HandlerMeta`) is stored in `record` (with its lists turned into
+    tuples), and `get_meta` returns it without any conversion. Its fields are also exposed as
+    keys of the dict, which is a view for the callers that need the metadata as a dict (and the
+    place where any other metadata, e.g. the one set with `@meta`, is stored). The dict keeps the
+    fields as they were given (lists included). Modifying one of them through the dict discards
+    the record.
+
+    The dataclass snapshots `get_meta` makes from the dict are kept until the dict is modified.
+    """
+
+    __slots__ = ('snapshots', 'record')
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.snapshots: Dict[Hashable, Any] = {}
+        self.record: Union[Meta, DataclassInstance, None] = None
+
+    def store(self, record: Union[Meta, DataclassInstance]) -> None:
+        """
+        stores a typed metadata record, exposing its fields as keys of the dict. The view keeps
+        the values as given, while the record keeps its list fields as tuples, so that it can't
+        be modified in place
+        """
+        values = {field.name: getattr(record, field.name) for field in fields(record)}
+        self.update(values)
+
+        lists = {name: tuple(value) for name, value in values.items() if isinstance(value, list)}
+        if lists:
+            record = copy(record)
+            for name, value in lists.items():
+                object.__setattr__(record, name, value)
+        self.record = record
+
+    def __changed(self, values: Mapping[str, Any]) -> List[str]:
+        return [key for key, value in values.items() if key not in self or self[key] is not value]
+
+    def __touch(self, keys: Iterable[str]) -> None:
+        self.snapshots.clear()
+        if self.record is not None:
+            record_fields = self.record.__dataclass_fields__
+            if any(key in record_fields for key in keys):
+                self.record = None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.__touch(self.__changed({key: value}))
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.__touch((key,))
+        super().__delitem__(key)
+
+    def __ior__(self, other: Any) -> 'MetaDict':  # type: ignore[override]
+        self.update(other)
+        return self
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        values = dict(*args, **kwargs)
+        self.__touch(self.__changed(values))
+        super().update(values)
+
+    def pop(self, key: str, *args: Any) -> Any:
+        self.__touch((key,))
+        return super().pop(key, *args)
+
+    def popitem(self) -> Tuple[str, Any]:
+        item = super().popitem()
+        self.__touch((item[0],))
+        return item
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self.__touch((key,))
+        return super().setdefault(key, default)
+
+    def clear(self) -> None:
+        self.__touch(self)
+        super().clear()
 
 
 def get_meta(
@@ -32,6 +130,9 @@ def get_meta(
     - clean: wether to clean up the resulting object (will remove `meta_type` by default)
     - keep: if `clean == True`, will only keep the key the keys provided here
     - drop: if `clean == True`, will drop all keys provided here and keep the rest.
+
+    Dataclass outputs are either the typed metadata stored in the target or snapshots cached
+    until the metadata of the target changes; either way, they're shared between callers.
     """
 
     if not hasattr(target, META_KEY):
@@ -39,7 +140,19 @@ def get_meta(
             raise PestException(f'No metadata for {target}')
         return cast(DataType, {})
 
-    meta = getattr(target, META_KEY)
+    meta = raw = getattr(target, META_KEY)
+
+    snapshot_key: Union[SnapshotKey, None] = None
+    if isinstance(raw, MetaDict) and is_dataclass(output_type):
+        # cleaning without `keep`/`drop` only drops `meta_type`, which is not an init field of
+        # pest's metadata types, so the stored record is what the conversion would return
+        if type(raw.record) is output_type and not keep and not drop:
+            return cast(DataType, raw.record)
+
+        snapshot_key = (output_type, clean, tuple(keep or ()), tuple(drop or ()))
+        snapshot = raw.snapshots.get(snapshot_key)
+        if snapshot is not None:
+            return cast(DataType, snapshot)
 
     # clean up the metadata
     if clean:
@@ -53,7 +166,10 @@ def get_meta(
             meta = drop_keys(meta, ['meta_type'])
 
     if is_dataclass(output_type):
-        return cast(output_type, from_dict(output_type, meta, config=Config(check_types=False)))  # type: ignore
+        snapshot = from_dict(output_type, meta, config=Config(check_types=False))  # type: ignore
+        if snapshot_key is not None:
+            raw.snapshots[snapshot_key] = snapshot
+        return cast(DataType, snapshot)
 
     return cast(output_type, meta)  # type: ignore
 
@@ -71,6 +187,14 @@ def get_meta_value(
     return cast(type, meta.get(key, default))  # type: ignore
 
 
+def _is_record(metadata: Any) -> bool:
+    return (
+        is_dataclass(metadata)
+        and not isinstance(metadata, type)
+        and metadata.__dataclass_params__.frozen  # type: ignore
+    )
+
+
 def inject_metadata(
     callable: Callable[..., Any],
     metadata: Union[Meta, Mapping[Any, Any], None] = None,
@@ -83,7 +207,16 @@ def inject_metadata(
     """
 
     if not hasattr(callable, META_KEY):
-        setattr(callable, META_KEY, {})
+        setattr(callable, META_KEY, MetaDict())
+
+    meta = get_meta(callable)
+
+    if _is_record(metadata) and isinstance(meta, MetaDict):
+        # immutable metadata (like pest's own) is stored as is, without converting it to a dict
+        meta.store(cast(Meta, metadata))
+        if kwargs:
+            meta.update(kwargs)
+        return
 
     dict_meta = {}
     if metadata is not None:
@@ -104,5 +237,4 @@ def inject_metadata(
             else:
                 raise e
 
-    meta = get_meta(callable)
     meta.update({**dict_meta, **kwargs})
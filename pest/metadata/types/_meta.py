@@ -10,7 +10,12 @@ class PestType(str, Enum):
     HANDLER = 'HANDLER'
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Meta(Protocol):
+    """
+    🐀 ⇝ base of pest's metadata records. Records are frozen, so subclasses must be frozen
+    dataclasses too
+    """
+
     meta_type: PestType
     '''🐀 ⇝ type of the metadata'''
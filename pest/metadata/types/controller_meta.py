@@ -7,7 +7,7 @@ from starlette.types import Lifespan
 from ._meta import Meta, PestType
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ControllerMeta(Meta):
     meta_type: PestType = field(default=PestType.CONTROLLER, init=False, metadata={'expose': False})
     prefix: str = field(metadata={'expose': False})
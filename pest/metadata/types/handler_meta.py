@@ -19,7 +19,7 @@ class HttpMethod(str, Enum):
     PATCH = 'PATCH'
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class HandlerMeta(Meta):
     meta_type: PestType = field(default=PestType.HANDLER, init=False, metadata={'expose': False})
     methods: List[str] = field(metadata={'expose': False})
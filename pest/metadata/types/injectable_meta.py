@@ -19,7 +19,7 @@ InjectionToken: TypeAlias = Union[type, Type[T]]
 Class: TypeAlias = type
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class InjectableMeta(Meta):
     meta_type: PestType = field(default=PestType.INJECTABLE, init=False)
 
@@ -40,6 +40,17 @@ class ClassProvider(ProviderBase):
     '''🐀 ⇝ type (class) of provider (type of the instance to be injected 💉)'''
     scope: Union[Scope, None] = None
     '''🐀 ⇝ scope of the provider''' ''
+    eager: Union[bool, None] = None
+    '''
+    🐀 ⇝ instantiate the provider while the application bootstraps instead of on first use (only
+    for singletons). Defaults to the `eager` option of the module, which defaults to `True`
+    '''
+    pool: Union[int, None] = None
+    '''
+    🐀 ⇝ keep up to `pool` idle instances of a `SCOPED` provider between scopes (e.g. requests):
+    each scope checks an instance out of the pool instead of building a new one, and gives it
+    back when it ends, after calling its `reset()` method (if it has one)
+    '''
 
 
 @dataclass
@@ -58,6 +69,11 @@ class FactoryProvider(ProviderBase, Generic[T]):
     '''🐀 ⇝ factory function that returns an instance of the provider'''
     scope: Union[Scope, None] = None
     '''🐀 ⇝ scope of the provider'''
+    eager: Union[bool, None] = None
+    '''
+    🐀 ⇝ instantiate the provider while the application bootstraps instead of on first use (only
+    for singletons). Defaults to the `eager` option of the module, which defaults to `True`
+    '''
 
 
 @dataclass
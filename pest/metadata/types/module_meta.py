@@ -23,7 +23,7 @@ Provider: TypeAlias = Union[
 ]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModuleMeta(Meta):
     meta_type: PestType = field(default=PestType.MODULE, init=False, metadata={'expose': False})
 
@@ -38,3 +38,9 @@ class ModuleMeta(Meta):
 
     controllers: Union[List[Type[Controller]], None]
     '''🐀 ⇝ list of controllers to be registered'''
+
+    eager: Union[bool, None]
+    '''
+    🐀 ⇝ whether the singleton providers of the module are instantiated while the application
+    bootstraps (unless a provider says otherwise). Defaults to `True`
+    '''
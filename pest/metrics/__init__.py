@@ -0,0 +1,5 @@
+from .module.metrics_module import MetricsModule
+from .module.services.metrics import Metrics
+from .store import mark_process_dead
+
+__all__ = ['MetricsModule', 'Metrics', 'mark_process_dead']
@@ -0,0 +1,15 @@
+from fastapi import Response
+
+from ....decorators.controller import controller
+from ....decorators.handler import get
+from ..services.metrics import CONTENT_TYPE, Metrics
+
+
+@controller('/metrics')
+class MetricsController:
+    metrics: Metrics
+
+    @get('/', response_class=Response)
+    def expose(self) -> Response:
+        """🐀 ⇝ metrics in prometheus' text exposition format"""
+        return Response(self.metrics.expose(), media_type=CONTENT_TYPE)
@@ -0,0 +1,18 @@
+from ...decorators.module import module
+from ...metadata.types.injectable_meta import ClassProvider, Scope
+from .controllers.metrics_controller import MetricsController
+from .services.metrics import Metrics
+
+
+@module(
+    imports=[],
+    controllers=[MetricsController],
+    providers=[ClassProvider(provide=Metrics, use_class=Metrics, scope=Scope.SINGLETON)],
+    exports=[Metrics],
+)
+class MetricsModule:
+    """
+    🐀 ⇝ records per-handler request metrics and exposes them at `GET /metrics`, in prometheus'
+    text exposition format. Set the `PEST_METRICS_DIR` env var to a directory shared by all the
+    workers to aggregate the metrics of a multi-process deployment
+    """
@@ -0,0 +1,215 @@
+import os
+from bisect import bisect_left
+from inspect import isfunction
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ....core.application import PestApplication, root_module
+from ....core.common import OnApplicationBootstrap
+from ....core.controller import Controller
+from ....core.module import Module
+from ....tracing.histogram import DEFAULT_BUCKETS
+from ...store import MULTIPROCESS_ENV, Labels, MemoryStore, MmapStore, Sample, Store, aggregate
+from ...store import store_path as _store_path
+
+REQUESTS = 'pest_http_requests_total'
+DURATION = 'pest_http_request_duration_seconds'
+IN_FLIGHT = 'pest_http_requests_in_flight'
+
+FAMILIES: Tuple[Tuple[str, str, str], ...] = (
+    (REQUESTS, 'counter', 'Number of handled requests'),
+    (DURATION, 'histogram', 'Time spent handling requests, in seconds'),
+    (IN_FLIGHT, 'gauge', 'Number of requests being handled'),
+)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _le(bound: float) -> str:
+    return repr(float(bound)) if bound != float('inf') else '+Inf'
+
+
+class InstrumentedRoute:
+    """
+    🐀 ⇝ wraps the asgi app of a route to record its requests. The samples (and their labels)
+    are built once per route, so recording a request is just a few store increments
+    """
+
+    __slots__ = (
+        'app',
+        'counters',
+        'gauges',
+        'labels',
+        'buckets',
+        'in_flight',
+        'sum',
+        'count',
+        'bucket',
+        'by_status',
+    )
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        counters: Store,
+        gauges: Store,
+        labels: Labels,
+        buckets: Sequence[float],
+    ) -> None:
+        self.app = app
+        self.counters = counters
+        self.gauges = gauges
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.in_flight: Sample = (IN_FLIGHT, labels)
+        self.sum: Sample = (f'{DURATION}_sum', labels)
+        self.count: Sample = (f'{DURATION}_count', labels)
+        self.bucket: List[Sample] = [
+            (f'{DURATION}_bucket', (*labels, ('le', _le(b)))) for b in (*self.buckets, float('inf'))
+        ]
+        self.by_status: Dict[int, Sample] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        counters = self.counters
+        self.gauges.inc(self.in_flight, 1.0)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            self.gauges.inc(self.in_flight, -1.0)
+            counters.inc(self.bucket[bisect_left(self.buckets, elapsed)], 1.0)
+            counters.inc(self.sum, elapsed)
+            counters.inc(self.count, 1.0)
+            counters.inc(self.__requests(status), 1.0)
+
+    def __requests(self, status: int) -> Sample:
+        sample = self.by_status.get(status)
+        if sample is None:
+            sample = self.by_status[status] = (REQUESTS, (*self.labels, ('status', str(status))))
+        return sample
+
+
+def _modules(module: Module) -> Iterator[Module]:
+    yield module
+    for child in module.imports:
+        yield from _modules(child)
+
+
+def _handlers(module: Module) -> Dict[Any, Labels]:
+    """maps the handlers of every controller in the module tree to their labels"""
+    from ..controllers.metrics_controller import MetricsController
+
+    handlers: Dict[Any, Labels] = {}
+    for mod in _modules(module):
+        for controller in mod.controllers:
+            if controller is MetricsController or not issubclass(controller, Controller):
+                continue
+            for handler, _ in controller.__handlers__():
+                handlers[handler] = (
+                    ('controller', controller.__name__),
+                    ('handler', handler.__name__),
+                )
+    return handlers
+
+
+class Metrics(OnApplicationBootstrap):
+    """
+    🐀 ⇝ records the number of requests, their latency and the requests in flight of each
+    handler, labeled with its controller class and handler name.
+
+    Values are kept per worker. If the `PEST_METRICS_DIR` env var points to a directory, each
+    worker keeps them in a memory-mapped file in that directory instead, and the exposition
+    aggregates the files of every worker (e.g. when running multiple uvicorn/gunicorn workers)
+    """
+
+    buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    '''🐀 ⇝ upper bounds (in seconds) of the buckets of the latency histograms'''
+
+    def __init__(self) -> None:
+        self.directory: Optional[str] = os.environ.get(MULTIPROCESS_ENV) or None
+        self.counters: Store = MemoryStore()
+        self.gauges: Store = self.counters
+
+    def on_application_bootstrap(self, app: PestApplication) -> None:
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            pid = os.getpid()
+            self.counters = MmapStore(_store_path(self.directory, 'counter', pid))
+            self.gauges = MmapStore(_store_path(self.directory, 'gauge', pid))
+
+        self.instrument(app)
+
+    def instrument(self, app: PestApplication) -> None:
+        """wraps the routes of the app's handlers to record their metrics"""
+        handlers = _handlers(root_module(app))
+        for route in app.routes:
+            if not isinstance(route, APIRoute) or isinstance(route.app, InstrumentedRoute):
+                continue
+
+            labels = handlers.get(route.endpoint) if isfunction(route.endpoint) else None
+            if labels is not None:
+                route.app = InstrumentedRoute(
+                    route.app, self.counters, self.gauges, labels, self.buckets
+                )
+
+    def collect(self) -> Dict[Sample, float]:
+        """returns the value of every sample"""
+        if self.directory is not None:
+            return aggregate(self.directory)
+        return self.counters.collect()
+
+    def expose(self) -> str:
+        """renders every metric in prometheus' text exposition format"""
+        return render(self.collect(), self.buckets)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _line(name: str, labels: Labels, value: float) -> str:
+    rendered = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+    number = int(value) if value.is_integer() else value
+    return f'{name}{{{rendered}}} {number}' if rendered else f'{name} {number}'
+
+
+def render(values: Dict[Sample, float], buckets: Sequence[float] = DEFAULT_BUCKETS) -> str:
+    """renders the values of the samples in prometheus' text exposition format"""
+    lines: List[str] = []
+    bounds = [_le(b) for b in (*buckets, float('inf'))]
+
+    for family, kind, help in FAMILIES:
+        lines += [f'# HELP {family} {help}', f'# TYPE {family} {kind}']
+        if kind != 'histogram':
+            for (name, labels), value in sorted(values.items()):
+                if name == family:
+                    lines.append(_line(name, labels, value))
+            continue
+
+        series: Dict[Labels, Dict[str, float]] = {}
+        for (name, labels), value in values.items():
+            if name == f'{family}_bucket':
+                le = dict(labels)['le']
+                series.setdefault(tuple(p for p in labels if p[0] != 'le'), {})[le] = value
+
+        for labels in sorted(series):
+            cumulative = 0.0
+            for le in bounds:
+                cumulative += series[labels].get(le, 0.0)
+                lines.append(_line(f'{family}_bucket', (*labels, ('le', le)), cumulative))
+            lines.append(_line(f'{family}_sum', labels, values.get((f'{family}_sum', labels), 0.0)))
+            lines.append(_line(f'{family}_count', labels, cumulative))
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,169 @@
+import json
+import mmap
+import os
+import struct
+from glob import glob
+from typing import Dict, Iterator, Optional, Protocol, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Labels]
+'''🐀 ⇝ (name, labels) of a sample, e.g. `('pest_http_requests_total', (('handler', 'x'),))`'''
+
+MULTIPROCESS_ENV = 'PEST_METRICS_DIR'
+'''🐀 ⇝ env var with the directory shared by the workers when running in multi-process mode'''
+
+
+class Store(Protocol):
+    """🐀 ⇝ where the values of the samples of a worker are kept"""
+
+    def inc(self, sample: Sample, amount: float) -> None: ...
+
+    def collect(self) -> Dict[Sample, float]: ...
+
+
+class MemoryStore:
+    """
+    🐀 ⇝ keeps the values in a dict. Values are only updated from the event loop's thread, so no
+    locks are needed
+    """
+
+    __slots__ = ('values',)
+
+    def __init__(self) -> None:
+        self.values: Dict[Sample, float] = {}
+
+    def inc(self, sample: Sample, amount: float) -> None:
+        values = self.values
+        values[sample] = values.get(sample, 0.0) + amount
+
+    def collect(self) -> Dict[Sample, float]:
+        return dict(self.values)
+
+
+_INITIAL_SIZE = 1 << 16
+_HEADER = struct.Struct('<I4x')  # used bytes + padding
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+
+
+def _encode(sample: Sample) -> bytes:
+    return json.dumps([sample[0], sample[1]], separators=(',', ':')).encode()
+
+
+def _decode(key: bytes) -> Sample:
+    name, labels = json.loads(key)
+    return name, tuple((k, v) for k, v in labels)
+
+
+def _entries(data: bytes) -> Iterator[Tuple[bytes, int]]:
+    """yields the (key, value offset) of every entry of a store file"""
+    used = _HEADER.unpack_from(data, 0)[0]
+    pos = _HEADER.size
+    while pos < used:
+        length = _LENGTH.unpack_from(data, pos)[0]
+        pos += _LENGTH.size
+        key = bytes(data[pos : pos + length])
+        pos += length + (-(_LENGTH.size + length) % 8)  # values are 8-byte aligned
+        yield key, pos
+        pos += _VALUE.size
+
+
+class MmapStore:
+    """
+    🐀 ⇝ keeps the values of a worker in a memory-mapped file, so that other workers can read
+    them. Each entry is the length of its key, the key (the json encoded sample, padded to 8
+    bytes) and a double. The header holds the number of bytes in use, which is only updated once
+    an entry is fully written, so readers never see half-written entries. Each file has a single
+    writer (its worker), so no locks are needed either
+    """
+
+    __slots__ = ('path', 'file', 'map', 'used', 'offsets')
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, 'a+b')  # noqa: SIM115 - kept open while the worker lives
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(_INITIAL_SIZE)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.used: int = _HEADER.unpack_from(self.map, 0)[0] or _HEADER.size
+        self.offsets: Dict[Sample, int] = {
+            _decode(key): offset for key, offset in _entries(self.map)
+        }
+
+    def inc(self, sample: Sample, amount: float) -> None:
+        offset = self.offsets.get(sample)
+        if offset is None:
+            offset = self.__append(sample)
+        _VALUE.pack_into(self.map, offset, _VALUE.unpack_from(self.map, offset)[0] + amount)
+
+    def __append(self, sample: Sample) -> int:
+        key = _encode(sample)
+        padding = -(_LENGTH.size + len(key)) % 8
+        size = _LENGTH.size + len(key) + padding + _VALUE.size
+
+        if self.used + size > len(self.map):
+            capacity = len(self.map)
+            while self.used + size > capacity:
+                capacity *= 2
+            self.map.close()
+            self.file.truncate(capacity)
+            self.map = mmap.mmap(self.file.fileno(), 0)
+
+        pos = self.used
+        _LENGTH.pack_into(self.map, pos, len(key))
+        self.map[pos + _LENGTH.size : pos + _LENGTH.size + len(key)] = key
+        offset = pos + _LENGTH.size + len(key) + padding
+        _VALUE.pack_into(self.map, offset, 0.0)
+
+        self.used += size
+        _HEADER.pack_into(self.map, 0, self.used)
+        self.offsets[sample] = offset
+        return offset
+
+    def collect(self) -> Dict[Sample, float]:
+        return {sample: _VALUE.unpack_from(self.map, o)[0] for sample, o in self.offsets.items()}
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+
+
+def read_file(path: str) -> Dict[Sample, float]:
+    """reads the values of a store file written by (another) worker"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        return {}
+    return {_decode(key): _VALUE.unpack_from(data, offset)[0] for key, offset in _entries(data)}
+
+
+def aggregate(directory: str) -> Dict[Sample, float]:
+    """sums the values of the store files of every worker in a directory"""
+    values: Dict[Sample, float] = {}
+    for path in sorted(glob(os.path.join(directory, '*.db'))):
+        for sample, value in read_file(path).items():
+            values[sample] = values.get(sample, 0.0) + value
+    return values
+
+
+def store_path(directory: str, kind: str, pid: int) -> str:
+    return os.path.join(directory, f'{kind}_{pid}.db')
+
+
+def mark_process_dead(pid: int, directory: Optional[str] = None) -> None:
+    """
+    🐀 ⇝ drops the gauges (e.g. requests in flight) of a dead worker, while keeping its counters
+    and histograms. Call it from your process manager's hook, e.g. gunicorn's `child_exit`:
+
+    ```python
+    def child_exit(server, worker):
+        mark_process_dead(worker.pid)
+    ```
+    """
+    directory = directory if directory is not None else os.environ.get(MULTIPROCESS_ENV)
+    if directory is None:
+        return
+
+    path = store_path(directory, 'gauge', pid)
+    if os.path.exists(path):
+        os.remove(path)
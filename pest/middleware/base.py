@@ -1,9 +1,14 @@
-from inspect import Signature, isclass, isfunction
+from asyncio import Lock
+from inspect import Parameter, Signature, isclass, isfunction
+from time import perf_counter
 from typing import (
     Any,
     Callable,
+    Dict,
+    List,
     Optional,
     Protocol,
+    Set,
     Tuple,
     Type,
     Union,
@@ -17,15 +22,17 @@ try:
 except ImportError:
     from typing_extensions import TypeAlias, TypeGuard
 
-from dij import ActivationScope
+from dij import ActivationScope, ServiceLifeStyle
+from starlette.middleware import Middleware as StarletteMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware, DispatchFunction, T
 from starlette.middleware.base import RequestResponseEndpoint as CallNext
 from starlette.requests import Request
 from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..core.module import Module
 from ..metadata.types.module_meta import InjectionToken
+from ..tracing.trace import current_trace
 from .di import scope_from
 
 ProvideFn: TypeAlias = Callable[[InjectionToken[T], Optional[ActivationScope]], T]
@@ -54,10 +61,116 @@ class PestMiddleware(Protocol):
         return await self.use(request, call_next)
 
 
+class PestASGIMiddleware(Protocol):
+    """🐀 ⇝ pure asgi middleware, with dependency injection
+
+    Unlike `PestMiddleware`, it doesn't go through `BaseHTTPMiddleware`, so it doesn't spawn a
+    task nor re-stream the response body on each request. It's instantiated once (when the first
+    request comes in, as the module tree doesn't exist before the application starts) with the
+    next asgi `app` as first argument, the rest of its constructor's arguments being resolved from
+    the root module by their type annotations.
+
+    Lifespan events are not forwarded to it.
+
+    ```python
+    class Timing(PestASGIMiddleware):
+        def __init__(self, app: ASGIApp, clock: Clock) -> None:
+            self.app = app
+            self.clock = clock
+
+        async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+            ...
+    ```
+    """
+
+    app: ASGIApp
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None: ...
+
+
+class PestASGIMiddlewareAdapter:
+    """🐀 ⇝ asgi middleware that instantiates a `PestASGIMiddleware` and hands requests to it
+
+    the middleware can't be instantiated when the middleware stack is built, since that happens
+    before the module tree (from where its dependencies are resolved) exists, so it's instantiated
+    by the first request instead. Concurrent first requests wait for that single instance
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *args: Any,
+        get_parent_module: Callable[[], Module],
+        middleware: Type[PestASGIMiddleware],
+        **kwargs: Any,
+    ) -> None:
+        self.app = app
+        self.get_parent_module = get_parent_module
+        self.middleware = middleware
+        self.args = args
+        self.kwargs = kwargs
+        self.instance: Optional[PestASGIMiddleware] = None
+        self.lock = Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self.app(scope, receive, send)
+            return
+
+        instance = self.instance
+        if instance is None:
+            instance = await self.__instance()
+
+        trace = current_trace()
+        if trace is None:
+            await instance(scope, receive, send)
+            return
+
+        start = perf_counter()
+        try:
+            await instance(scope, receive, send)
+        finally:
+            trace.record('middleware', self.middleware.__name__, start)
+
+    async def __instance(self) -> PestASGIMiddleware:
+        async with self.lock:
+            # another request might have instantiated it while this one was waiting
+            if self.instance is None:
+                self.instance = await self.__instantiate()
+            return self.instance
+
+    async def __instantiate(self) -> PestASGIMiddleware:
+        parent_module = self.get_parent_module()
+        kwargs = dict(self.kwargs)
+        parameters = list(Signature.from_callable(self.middleware).parameters.values())
+
+        # the first arguments are the next asgi app and the ones given by the user
+        for param in parameters[1 + len(self.args) :]:
+            if param.name in kwargs or param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            if param.annotation is Parameter.empty:
+                continue
+            # arguments with a default value are only injected if they can be provided
+            if param.default is not Parameter.empty and not parent_module.can_provide(
+                param.annotation
+            ):
+                continue
+            kwargs[param.name] = await parent_module.aget(param.annotation)
+
+        return self.middleware(self.app, *self.args, **kwargs)
+
+
+DispatcherParam: TypeAlias = Tuple[str, bool, InjectionToken]
+'''🐀 ⇝ (name, is keyword only, token) of an injected dispatcher parameter'''
+
+
 class PestBaseHTTPMiddleware(BaseHTTPMiddleware):
     """🐀 ⇝ asgi middleware that receivs an injetor function and a dispatch funtion
 
-    same as `starlette`'s `BaseHTTPMiddleware` but this one supports di injection
+    same as `starlette`'s `BaseHTTPMiddleware` but this one supports di injection.
+
+    The parameters to be injected into the dispatcher are read from its signature only once, and
+    the ones provided as singletons are resolved only once too.
     """
 
     def __init__(
@@ -67,6 +180,9 @@ class PestBaseHTTPMiddleware(BaseHTTPMiddleware):
         dispatch: PestMiddlwareCallback,
     ) -> None:
         self.get_parent_module = get_parent_module
+        self.__params = _dispatcher_params(dispatch) if dispatch is not None else []
+        self.__singletons: Dict[str, Any] = {}
+        self.__singleton_params: Optional[Set[str]] = None
         super().__init__(app, dispatch=self.__dispatch_fn(dispatch))
 
     def __dispatch_fn(
@@ -75,50 +191,108 @@ class PestBaseHTTPMiddleware(BaseHTTPMiddleware):
         if dispatch is None:
             return dispatch
 
+        name = getattr(dispatch, '__name__', type(dispatch).__name__)
+
         async def wrapper(request: Request, call_next: CallNext) -> Response:
-            parent_module = self.get_parent_module()
-            if isclass(dispatch) and _is_class_pest_mw_callback(dispatch):
-                if not self.get_parent_module().can_provide(dispatch):
-                    parent_module.register(dispatch)
+            trace = current_trace()
+            if trace is None:
+                return await dispatch_with_deps(request, call_next)
+
+            start = perf_counter()
+            try:
+                return await dispatch_with_deps(request, call_next)
+            finally:
+                trace.record('middleware', name, start)
 
+        async def dispatch_with_deps(request: Request, call_next: CallNext) -> Response:
             scope = scope_from(request)
             dispatch_fn = cast(
                 PestMiddlwareCallback,
                 (
                     dispatch
                     if not isclass(dispatch)
-                    else parent_module.get(dispatch, scope, fail_on_coroutine=False)
+                    else self.get_parent_module().get(dispatch, scope, fail_on_coroutine=False)
                 ),
             )
 
-            args, kwargs = await self.__resolve_dispatcher_args(dispatch_fn, scope)
+            if not self.__params:
+                return await dispatch_fn(request, call_next)
+
+            args, kwargs = await self.__resolve_dispatcher_args(scope)
             return await dispatch_fn(request, call_next, *args, **kwargs)
 
         return wrapper
 
     async def __resolve_dispatcher_args(
-        self, function: DispatchFunction, scope: Union[ActivationScope, None]
+        self, scope: Union[ActivationScope, None]
     ) -> Tuple[tuple, dict]:
-        signature = Signature.from_callable(function)
-        parameters = signature.parameters
+        parent_module = self.get_parent_module()
+        singleton_params = self.__singleton_params
+        if singleton_params is None:
+            singleton_params = self.__singleton_params = {
+                name
+                for name, _, token in self.__params
+                if parent_module.scope_of(token) == ServiceLifeStyle.SINGLETON
+            }
+
         args = []
         kwargs = {}
 
-        arg_count = 0
-        for name, param in parameters.items():
-            if arg_count < 2:
-                arg_count += 1
-                continue
-
-            if param.kind == param.POSITIONAL_ONLY or param.kind == param.POSITIONAL_OR_KEYWORD:
-                args.append(await self.get_parent_module().aget(param.annotation, scope))
+        for name, keyword, token in self.__params:
+            if name in self.__singletons:
+                value = self.__singletons[name]
+            else:
+                value = await parent_module.aget(token, scope)
+                if name in singleton_params:
+                    self.__singletons[name] = value
 
-            elif param.kind == param.KEYWORD_ONLY:
-                kwargs[name] = await self.get_parent_module().aget(param.annotation, scope)
+            if keyword:
+                kwargs[name] = value
+            else:
+                args.append(value)
 
         return tuple(args), kwargs
 
 
+def register_middlewares(module: Module, middlewares: List[StarletteMiddleware]) -> None:
+    """
+    registers the class based dispatchers of pest middlewares in a module, so that they can be
+    resolved (and get their dependencies injected) on each request
+    """
+    for middleware in middlewares:
+        if middleware.cls is not PestBaseHTTPMiddleware:
+            continue
+
+        dispatch = middleware.kwargs.get('dispatch')
+        if _is_class_pest_mw_callback(dispatch) and not module.can_provide(dispatch):
+            module.register(dispatch)
+
+
+def _dispatcher_params(
+    dispatch: Union[PestMiddlwareCallback, Type[PestMiddlwareCallback]],
+) -> List[DispatcherParam]:
+    """
+    returns the parameters of a dispatcher that need to be injected (the ones after `request`
+    and `call_next`)
+    """
+    if isclass(dispatch):
+        # the signature of the unbound `__call__` includes `self`
+        parameters = list(Signature.from_callable(dispatch.__call__).parameters.values())[3:]
+    else:
+        parameters = list(Signature.from_callable(dispatch).parameters.values())[2:]
+
+    return [
+        (param.name, param.kind == param.KEYWORD_ONLY, param.annotation)
+        for param in parameters
+        if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)
+    ]
+
+
+def _is_pest_asgi_middleware(obj: Any) -> TypeGuard[Type[PestASGIMiddleware]]:
+    """checks if an object is a **class** that explicitly implements `PestASGIMiddleware`"""
+    return isclass(obj) and PestASGIMiddleware in obj.__mro__
+
+
 def _is_class_pest_mw_callback(obj: Any) -> TypeGuard[Type[PestMiddlwareCallback]]:
     """checks if an object is a **class** that respects the pest middleware callback protocol"""
     return _is_pest_mw_callback(obj) and isclass(obj)
@@ -1,8 +1,10 @@
 from typing import Union
 
 from dij import ActivationScope
-from fastapi import Request, Response
-from starlette.middleware.base import RequestResponseEndpoint
+from fastapi import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..core.pool import release_pooled
 
 SCOPE_KEY = '__di_scope__'
 '''🐀 ⇝ the key used to store the di activation scope in a request'''
@@ -10,18 +12,30 @@ SCOPE_KEY = '__di_scope__'
 
 def scope_from(request: Request) -> Union[ActivationScope, None]:
     """obtains the di activation scope from a request"""
-    return getattr(request.state, SCOPE_KEY, None)
+    return request.scope.get('state', {}).get(SCOPE_KEY, None)
 
 
-async def di_scope_middleware(request: Request, call_next: RequestResponseEndpoint) -> Response:
+class DIScopeMiddleware:
     """
-    middleware that injects a di activation scope into the request. Allows the
-    injection of request-scoped dependencies into controllers, services and other
-    middlewares.
+    🐀 ⇝ pure asgi middleware that injects a di activation scope into each request (stored in
+    the asgi `scope['state']`). Allows the injection of request-scoped dependencies into
+    controllers, services and other middlewares. Pooled instances checked out by the request
+    are given back to their pools once it's done.
     """
 
-    with ActivationScope() as scope:
-        if scope.scoped_services is not None:
-            setattr(request.state, SCOPE_KEY, scope)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] not in ('http', 'websocket'):
+            await self.app(scope, receive, send)
+            return
+
+        with ActivationScope() as di_scope:
+            if di_scope.scoped_services is not None:
+                scope.setdefault('state', {})[SCOPE_KEY] = di_scope
 
-        return await call_next(request)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                await release_pooled(di_scope)
@@ -7,10 +7,15 @@ except ImportError:
 
 from starlette.middleware import Middleware as StarletteMiddleware
 
-from .base import PestMiddlwareCallback
+from .base import PestASGIMiddleware, PestMiddlwareCallback
 
 MiddlewareDef: TypeAlias = Sequence[
-    Union[StarletteMiddleware, Type[PestMiddlwareCallback], PestMiddlwareCallback]
+    Union[
+        StarletteMiddleware,
+        Type[PestASGIMiddleware],
+        Type[PestMiddlwareCallback],
+        PestMiddlwareCallback,
+    ]
 ]
 
 
@@ -1,4 +1,20 @@
 from .decorators.cron import cron, scheduler
 from .module.schedule_module import ScheduleModule
+from .module.services.scheduler_engine import JobState
+from .module.services.scheduler_lock import FileLock, RedisLock, SchedulerLock, SQLiteLock
+from .module.services.scheduler_options import SchedulerOptions
+from .module.services.scheduler_registry import JobInfo, SchedulerRegistry
 
-__all__ = ['ScheduleModule', 'cron', 'scheduler']
+__all__ = [
+    'FileLock',
+    'JobInfo',
+    'JobState',
+    'RedisLock',
+    'SQLiteLock',
+    'ScheduleModule',
+    'SchedulerLock',
+    'SchedulerOptions',
+    'SchedulerRegistry',
+    'cron',
+    'scheduler',
+]
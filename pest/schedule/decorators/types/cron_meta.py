@@ -1,22 +1,28 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Union
+from typing import Literal, Union
 
 from ....metadata.types._meta import Meta
 
+Overlap = Literal['skip', 'queue', 'run']
+'''🐀 ⇝ what to do when a job is due while it's already running as many times as it can'''
+
+Executor = Literal['thread', 'process']
+'''🐀 ⇝ where a sync job runs: in the scheduler's thread pool, or in its process pool'''
+
 
 class SchedulerType(str, Enum):
     CRON = 'CRON'
     SCHEDULER = 'SCHEDULER'
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ScheduleMeta(Meta):
     meta_type: SchedulerType
     '''🐀 ⇝ type of the metadata'''
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CronMeta(ScheduleMeta):
     meta_type: SchedulerType = field(
         default=SchedulerType.CRON, init=False, metadata={'expose': False}
@@ -27,9 +33,22 @@ class CronMeta(ScheduleMeta):
     '''🐀 ⇝ maximum number of repetitions'''
     name: Union[str, None] = field(default=None)
     '''🐀 ⇝ name of the cron job'''
-
-
-@dataclass
+    max_concurrent: Union[int, None] = field(default=None)
+    '''🐀 ⇝ maximum number of runs of the job at the same time (defaults to 1)'''
+    on_overlap: Union[Overlap, None] = field(default=None)
+    '''
+    🐀 ⇝ what to do when the job is due while it's running `max_concurrent` times: `'skip'` the
+    run (default), `'queue'` it until a run is over or `'run'` it anyway
+    '''
+    executor: Union[Executor, None] = field(default=None)
+    '''
+    🐀 ⇝ where the job runs: coroutines run in the event loop and sync jobs in a thread pool
+    (`'thread'`, default), or in a process pool (`'process'`), for cpu-bound jobs. Jobs that
+    run in a process must be static methods; their parameters are injected and pickled
+    '''
+
+
+@dataclass(frozen=True, slots=True)
 class SchedulerMeta(ScheduleMeta):
     meta_type: SchedulerType = field(
         default=SchedulerType.SCHEDULER, init=False, metadata={'expose': False}
@@ -7,7 +7,7 @@ This file was auto-generated by `task gen:types`.
 Do not edit manually.
 """
 
-from typing import TypedDict, Union
+from typing import Literal, TypedDict, Union
 
 
 class CronMetaDict(TypedDict, total=False):
@@ -16,3 +16,19 @@ class CronMetaDict(TypedDict, total=False):
 
     name: Union[str, None]
     '''🐀 ⇝ name of the cron job'''
+
+    max_concurrent: Union[int, None]
+    '''🐀 ⇝ maximum number of runs of the job at the same time (defaults to 1)'''
+
+    on_overlap: Union[Literal['skip', 'queue', 'run'], None]
+    '''
+    🐀 ⇝ what to do when the job is due while it's running `max_concurrent` times: `'skip'` the
+    run (default), `'queue'` it until a run is over or `'run'` it anyway
+    '''
+
+    executor: Union[Literal['thread', 'process'], None]
+    '''
+    🐀 ⇝ where the job runs: coroutines run in the event loop and sync jobs in a thread pool
+    (`'thread'`, default), or in a process pool (`'process'`), for cpu-bound jobs. Jobs that
+    run in a process must be static methods; their parameters are injected and pickled
+    '''
@@ -1,19 +1,23 @@
 from ...decorators.module import module
-from ...metadata.types.injectable_meta import ValueProvider
+from ...metadata.types.injectable_meta import ClassProvider, Scope
+from .services.scheduler_engine import SchedulerEngine
 from .services.scheduler_explorer import SchedulerExplorer
-
-# TODO: improve task scheduler module
-#       this implementation is just a first approach. It works, but it lacks a lot of features.
-#       Ideally, it should be able to "register" jobs, start and stop them, and provide a way to
-#       manage them. Similar to what NestJS does with its scheduler module.
-#       See: https://docs.nestjs.com/techniques/task-scheduling
+from .services.scheduler_registry import SchedulerRegistry
 
 
 @module(
     imports=[],
     controllers=[],
-    providers=[ValueProvider(provide=SchedulerExplorer, use_value=SchedulerExplorer())],
-    exports=[],
+    providers=[
+        ClassProvider(provide=SchedulerEngine, use_class=SchedulerEngine, scope=Scope.SINGLETON),
+        ClassProvider(
+            provide=SchedulerExplorer, use_class=SchedulerExplorer, scope=Scope.SINGLETON
+        ),
+        ClassProvider(
+            provide=SchedulerRegistry, use_class=SchedulerRegistry, scope=Scope.SINGLETON
+        ),
+    ],
+    exports=[SchedulerEngine, SchedulerRegistry],
 )
 class ScheduleModule:
     pass
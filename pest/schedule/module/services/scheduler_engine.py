@@ -0,0 +1,439 @@
+from asyncio import Future, Semaphore, ensure_future, gather, get_running_loop, sleep
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from functools import partial
+from heapq import heappop, heappush
+from inspect import iscoroutinefunction
+from itertools import count
+from multiprocessing import get_context
+from time import perf_counter, time
+from typing import Any, Callable, Dict, List, Optional, Protocol, Set, Tuple, get_args
+
+from ....core.common import OnApplicationShutdown
+from ....exceptions.base.pest import PestException
+from ....logging import log
+from ...decorators.types.cron_meta import Executor, Overlap
+from .scheduler_lock import Fire, SchedulerLock
+from .scheduler_options import SchedulerOptions
+
+
+class Schedule(Protocol):
+    """🐀 ⇝ iterator over the fire times of a job (e.g. a `croniter` instance)"""
+
+    def get_next(self, ret_type: Any = ..., start_time: Optional[datetime] = ...) -> Any: ...
+
+
+class JobState(str, Enum):
+    SCHEDULED = 'scheduled'
+    '''🐀 ⇝ the job runs at its fire times'''
+    PAUSED = 'paused'
+    '''🐀 ⇝ the job keeps its schedule, but its fire times are skipped'''
+    STOPPED = 'stopped'
+    '''🐀 ⇝ the job is out of the schedule'''
+    DONE = 'done'
+    '''🐀 ⇝ the job already ran `max_repetitions` times'''
+
+
+class CronJob:
+    """
+    🐀 ⇝ a job registered in the scheduler engine, along with the stats of its runs. Its fire
+    times are taken from a persistent schedule iterator, so the cron expression is only parsed
+    once
+    """
+
+    __slots__ = (
+        'name',
+        'func',
+        'schedule',
+        'max_repetitions',
+        'raise_exceptions',
+        'max_concurrent',
+        'on_overlap',
+        'executor',
+        'is_coroutine',
+        'state',
+        'entry',
+        'pending',
+        'queued',
+        'repetitions',
+        'runs',
+        'running',
+        'errors',
+        'skipped',
+        'next_run',
+        'last_run',
+        'last_duration',
+        'last_result',
+        'last_error',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        schedule: Schedule,
+        *,
+        max_repetitions: Optional[int] = None,
+        raise_exceptions: bool = False,
+        max_concurrent: int = 1,
+        on_overlap: Overlap = 'skip',
+        executor: Optional[Executor] = None,
+    ) -> None:
+        if max_concurrent < 1 or on_overlap not in get_args(Overlap):
+            raise PestException(
+                f'Invalid concurrency options for cron job {name}: '
+                f'max_concurrent={max_concurrent!r}, on_overlap={on_overlap!r}',
+                hint="`max_concurrent` must be at least 1 and `on_overlap` one of 'skip', "
+                "'queue' or 'run'",
+            )
+
+        is_coroutine = iscoroutinefunction(func)
+        if executor not in (None, *get_args(Executor)) or (is_coroutine and executor is not None):
+            raise PestException(
+                f'Invalid executor for cron job {name}: {executor!r}',
+                hint="coroutines run in the event loop; only sync jobs can run in a 'thread' or a "
+                "'process'",
+            )
+
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.max_repetitions = max_repetitions
+        self.raise_exceptions = raise_exceptions
+        self.max_concurrent = max_concurrent
+        self.on_overlap = on_overlap
+        self.executor = executor
+        self.is_coroutine = is_coroutine
+        self.state = JobState.SCHEDULED
+        self.entry: Optional[int] = None  # id of its (valid) entry in the engine's heap
+        self.pending = 0  # scheduled runs in progress (or waiting for the engine's limit)
+        self.queued = 0  # fires waiting for a run of the job to be over
+        self.repetitions = 0
+        self.runs = 0
+        self.running = 0
+        self.errors = 0
+        self.skipped = 0
+        self.next_run: Optional[float] = None
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[BaseException] = None
+
+    @property
+    def at_limit(self) -> bool:
+        """whether the job is running as many times (as scheduled) as it can"""
+        return self.pending >= self.max_concurrent
+
+    @property
+    def exhausted(self) -> bool:
+        """whether the job already ran as many times (as scheduled) as it's allowed to"""
+        return self.max_repetitions is not None and self.repetitions >= self.max_repetitions
+
+    def advance(self, now: float) -> float:
+        """
+        moves the job to its next fire time (as a timestamp). If the job is running late (e.g.
+        it took longer than its period), the fire times that were missed are skipped
+        """
+        # fire times are computed as naive (local) datetimes, so that daylight saving time
+        # changes are taken into account when converting them to timestamps
+        next_run: float = self.schedule.get_next(datetime).timestamp()
+        if next_run <= now:
+            start = datetime.fromtimestamp(now)
+            next_run = self.schedule.get_next(datetime, start_time=start).timestamp()
+
+        self.next_run = next_run
+        return next_run
+
+
+class Dispatcher:
+    """
+    🐀 ⇝ the dispatcher task of an engine and what it's waiting for. It's kept apart from the
+    engine because the container awaits the awaitable attributes of the instances it resolves
+    """
+
+    __slots__ = ('task', 'sleeping', 'wake_at')
+
+    def __init__(self) -> None:
+        self.task: Optional[Future] = None
+        self.sleeping = False
+        self.wake_at = 0.0
+
+
+class SchedulerEngine(OnApplicationShutdown):
+    """
+    🐀 ⇝ runs cron jobs from a single dispatcher task, no matter how many jobs there are.
+
+    Jobs are kept in a min-heap keyed by their next fire time; the dispatcher sleeps until the
+    earliest one is due, fires every job that's due and goes back to sleep. When a job is due
+    while it's running `max_concurrent` times, the run is skipped, queued or started anyway as
+    per its `on_overlap` policy. Entries of stopped jobs are left in the heap and dropped once
+    they're due.
+
+    If the engine has a lock, each fire time is claimed (along with the other ones that are due
+    at the same time) before the job runs, so that it only runs in the worker that claims it.
+
+    Sync jobs run in a thread pool of their own, so that they don't compete with request
+    handlers for the default one, or in a process pool (for cpu-bound jobs). Both pools are
+    created the first time they're needed, and shut down along with the application. The size
+    of the pools and the number of runs at the same time are set with `configure`
+    """
+
+    def __init__(self) -> None:
+        self.jobs: Dict[str, CronJob] = {}
+        self.queue: List[Tuple[float, int, CronJob]] = []
+        self.running: Set[Future] = set()
+        self.dispatcher = Dispatcher()
+        self.started = False
+        self.threads: Optional[ThreadPoolExecutor] = None
+        self.processes: Optional[ProcessPoolExecutor] = None
+        self.lock: Optional[SchedulerLock] = None
+        self.__sequence = count()
+        self.configure({})
+
+    def configure(self, options: SchedulerOptions) -> None:
+        """sets the limits of the engine (see `SchedulerOptions`) before it starts"""
+        max_concurrent = options.get('max_concurrent')
+        max_threads = options.get('max_threads', 4)
+        max_processes = options.get('max_processes')
+        if self.started or self.threads is not None or self.processes is not None:
+            raise PestException(
+                'Cannot configure a scheduler engine that already started',
+                hint='provide the `SchedulerOptions` in the root module of the application',
+            )
+        limits = (max_concurrent, max_threads, max_processes)
+        if any(limit is not None and limit < 1 for limit in limits):
+            raise PestException(
+                f'Invalid scheduler options: {options!r}',
+                hint='`max_concurrent`, `max_threads` and `max_processes` must be at least 1',
+            )
+
+        self.max_concurrent = max_concurrent
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self.limit = Semaphore(max_concurrent) if max_concurrent is not None else None
+
+    def add(self, job: CronJob) -> CronJob:
+        """registers a job and schedules its first run"""
+        if job.name in self.jobs:
+            raise PestException(
+                f'There is already a cron job named {job.name}',
+                hint='give each job a unique `name` in its `@cron` decorator',
+            )
+
+        self.jobs[job.name] = job
+        self.__schedule(job)
+        return job
+
+    def start(self) -> None:
+        """starts dispatching the jobs (it must be called from within the event loop)"""
+        self.started = True
+        if self.queue:
+            self.__wake(self.queue[0][0])
+
+    async def shutdown(self) -> None:
+        """
+        stops dispatching the jobs, cancels the runs in progress and shuts its pools down. Runs
+        that already started in a process can't be cancelled, so they're waited for
+        """
+        self.started = False
+        tasks = [self.dispatcher.task, *self.running] if self.dispatcher.task else [*self.running]
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+
+        if self.threads is not None:
+            self.threads.shutdown(wait=False, cancel_futures=True)
+            self.threads = None
+
+        if self.processes is not None:
+            shutdown = partial(self.processes.shutdown, wait=True, cancel_futures=True)
+            self.processes = None
+            await get_running_loop().run_in_executor(None, shutdown)
+
+    async def on_application_shutdown(self, app: Any) -> None:
+        await self.shutdown()
+
+    def resume(self, job: CronJob) -> None:
+        """puts a paused or stopped job back in the schedule"""
+        if job.state not in (JobState.PAUSED, JobState.STOPPED):
+            return
+
+        job.state = JobState.SCHEDULED
+        if job.entry is None:
+            self.__schedule(job)
+
+    def pause(self, job: CronJob) -> None:
+        """skips the fire times of a job until it's resumed"""
+        if job.state == JobState.SCHEDULED:
+            job.state = JobState.PAUSED
+
+    def stop(self, job: CronJob) -> None:
+        """takes a job out of the schedule until it's resumed (a run in progress isn't stopped)"""
+        if job.state in (JobState.SCHEDULED, JobState.PAUSED):
+            job.state = JobState.STOPPED
+            job.entry = None
+            job.next_run = None
+            job.repetitions -= job.queued  # queued fires were counted, but won't run
+            job.queued = 0
+
+    def trigger(self, job: CronJob) -> Future:
+        """
+        runs a job right away, out of its schedule. Returns the run, which can be awaited for the
+        result of the job
+        """
+        return self.__fire(job, scheduled=False)
+
+    def __schedule(self, job: CronJob) -> None:
+        next_run = job.advance(time())
+        job.entry = next(self.__sequence)
+        heappush(self.queue, (next_run, job.entry, job))
+        self.__wake(next_run)
+
+    def __wake(self, next_run: float) -> None:
+        """makes sure the dispatcher is running and will be awake in time for `next_run`"""
+        if not self.started:
+            return
+
+        dispatcher = self.dispatcher
+        if dispatcher.task is not None and not dispatcher.task.done():
+            # if the dispatcher isn't sleeping, it hasn't started yet (or it's claiming the fire
+            # times that are due) and will see the new job before going to sleep
+            if not dispatcher.sleeping or next_run >= dispatcher.wake_at:
+                return
+            dispatcher.task.cancel()
+
+        dispatcher.task = ensure_future(self.__dispatch())
+
+    async def __dispatch(self) -> None:
+        queue, dispatcher = self.queue, self.dispatcher
+        while queue:
+            dispatcher.wake_at = queue[0][0]
+            dispatcher.sleeping = True
+            await sleep(max(dispatcher.wake_at - time(), 0.0))
+            dispatcher.sleeping = False
+
+            # the earliest job is due (the dispatcher is woken up early if a job that's due
+            # before is added), and so are any other jobs whose time has come meanwhile
+            now = time()
+            due = [heappop(queue)]
+            while queue and queue[0][0] <= now:
+                due.append(heappop(queue))
+
+            if self.lock is None:
+                for _, entry, job in due:
+                    self.__due(entry, job, claimed=True)
+            else:
+                await self.__claim(self.lock, due)
+
+    async def __claim(self, lock: SchedulerLock, due: List[Tuple[float, int, CronJob]]) -> None:
+        """fires the jobs that are due whose fire times this worker claims"""
+        fires: List[Fire] = [
+            (job.name, next_run)
+            for next_run, entry, job in due
+            if entry == job.entry and job.state == JobState.SCHEDULED
+        ]
+        try:
+            claimed = dict(zip(fires, await lock.claim(fires))) if fires else {}
+        except Exception as e:
+            # the fire times are skipped rather than risking running them in every worker
+            log.exception(f'Failed to claim the fire times of {len(fires)} cron jobs: {e}')
+            claimed = {}
+
+        for next_run, entry, job in due:
+            self.__due(entry, job, claimed=claimed.get((job.name, next_run), False))
+
+    def __due(self, entry: int, job: CronJob, claimed: bool) -> None:
+        if entry != job.entry:
+            return  # the job was stopped (and maybe resumed) after this entry was pushed
+
+        job.entry = None
+        if job.state == JobState.PAUSED or not claimed:
+            self.__schedule(job)
+            return
+
+        if not job.at_limit or job.on_overlap == 'run':
+            self.__fire(job, scheduled=True)
+        elif job.on_overlap == 'queue' and job.queued < job.max_concurrent:
+            job.queued += 1
+            job.repetitions += 1
+        else:
+            job.skipped += 1
+
+        # the schedule goes on while the job runs, unless it's skipping its fire times: then
+        # it's rescheduled once a run is over (which skips them without waking the dispatcher)
+        if not (job.at_limit and job.on_overlap == 'skip'):
+            self.__reschedule(job)
+
+    def __fire(self, job: CronJob, scheduled: bool) -> Future:
+        if scheduled:
+            job.pending += 1
+            job.repetitions += 1
+
+        run = ensure_future(self.__run(job, scheduled))
+        self.running.add(run)
+        run.add_done_callback(self.running.discard)
+        return run
+
+    async def __run(self, job: CronJob, scheduled: bool) -> Any:
+        try:
+            if self.limit is None:
+                return await self.__execute(job)
+            async with self.limit:
+                return await self.__execute(job)
+        finally:
+            if scheduled:
+                job.pending -= 1
+                if job.queued and job.state != JobState.STOPPED:
+                    job.queued -= 1
+                    job.repetitions -= 1  # counted when it was queued
+                    self.__fire(job, scheduled=True)
+                self.__reschedule(job)
+
+    async def __execute(self, job: CronJob) -> Any:
+        job.runs += 1
+        job.running += 1
+        job.last_run = time()
+        start = perf_counter()
+        try:
+            if job.is_coroutine:
+                job.last_result = await job.func()
+            else:
+                pool = self.__processes() if job.executor == 'process' else self.__threads()
+                job.last_result = await get_running_loop().run_in_executor(pool, job.func)
+            return job.last_result
+        except Exception as e:
+            job.errors += 1
+            job.last_error = e
+            log.exception(e)
+            if job.raise_exceptions:
+                self.stop(job)
+                raise e
+        finally:
+            job.running -= 1
+            job.last_duration = perf_counter() - start
+
+    def __threads(self) -> ThreadPoolExecutor:
+        if self.threads is None:
+            self.threads = ThreadPoolExecutor(self.max_threads, thread_name_prefix='pest-cron')
+        return self.threads
+
+    def __processes(self) -> ProcessPoolExecutor:
+        # workers are spawned rather than forked, as forking a process that runs threads (the
+        # event loop's and the pools') isn't safe
+        if self.processes is None:
+            self.processes = ProcessPoolExecutor(
+                self.max_processes, mp_context=get_context('spawn')
+            )
+        return self.processes
+
+    def __reschedule(self, job: CronJob) -> None:
+        if job.entry is not None or job.state in (JobState.STOPPED, JobState.DONE):
+            return
+
+        if job.exhausted:
+            if not job.pending and not job.queued:
+                job.state = JobState.DONE
+            job.next_run = None
+        else:
+            self.__schedule(job)
@@ -1,19 +1,26 @@
-from asyncio import ensure_future, sleep
+import pickle
+from copy import copy
 from datetime import datetime
-from functools import wraps
-from inspect import getmembers, iscoroutinefunction, isfunction
-from typing import Any, Callable, Coroutine, List, Optional, Tuple
-
-from fastapi.concurrency import run_in_threadpool
+from functools import lru_cache, partial, wraps
+from inspect import Parameter, getattr_static, getmembers, isfunction, signature
+from typing import Any, Callable, Coroutine, List, Optional, Tuple, get_type_hints
 
 from pest.core.application import PestApplication
 
 from ....core.common import OnApplicationBootstrap
 from ....exceptions.base.pest import PestException
-from ....logging import log
 from ....metadata.meta import get_meta, get_meta_value
 from ....metadata.types._meta import PestType
-from ...decorators.types.cron_meta import CronMeta, SchedulerMeta, SchedulerType
+from ...decorators.types.cron_meta import (
+    CronMeta,
+    Executor,
+    Overlap,
+    SchedulerMeta,
+    SchedulerType,
+)
+from .scheduler_engine import CronJob, SchedulerEngine
+from .scheduler_lock import SchedulerLock, lock_from_env
+from .scheduler_options import SchedulerOptions
 
 try:
     from croniter import croniter
@@ -49,11 +56,73 @@ def get_delta(cron: str) -> float:
     return (crontime.get_next(datetime) - now).total_seconds()
 
 
+@lru_cache(maxsize=None)
+def _parsed(cron: str) -> Any:
+    if not croniter.is_valid(cron):
+        raise ValueError(f"Invalid cron expression: '{cron}'")
+    return croniter(cron, datetime.now())
+
+
+def schedule_of(cron: str) -> Any:
+    """
+    returns a persistent iterator over the fire times of a cron expression, from now on. Each
+    expression is parsed once; the iterators of the jobs that share it are (shallow) copies
+    """
+    schedule = copy(_parsed(cron))
+    schedule.set_current(datetime.now(), force=True)
+    return schedule
+
+
+def job_name(token: Any, job: Callable, meta: CronMeta) -> str:
+    """name of a job: the one given in its `@cron` decorator or `<Scheduler>.<method>`"""
+    return meta.name if meta.name is not None else f'{token.__name__}.{job.__name__}'
+
+
+async def in_process(app: PestApplication, token: Any, job: Callable, name: str) -> Callable:
+    """
+    returns the callable that runs a job in a process: the job (which must be a static method)
+    along with its injected arguments, which must be picklable, as they're sent to the process
+    on each run
+    """
+    if not isinstance(getattr_static(token, job.__name__), staticmethod):
+        raise PestException(
+            f'Cron job {name} runs in a process, but it is not a static method',
+            hint="jobs that run in a process can't use `self`, make it a `@staticmethod` and "
+            'inject whatever it needs as parameters',
+        )
+
+    hints = get_type_hints(job)
+    variadic = (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD)
+    args = []
+    for param in signature(job).parameters.values():
+        if param.name not in hints or param.kind in variadic:
+            raise PestException(
+                f'Cannot inject parameter `{param.name}` of cron job {name}',
+                hint='annotate every parameter of the job with the token to inject',
+            )
+        args.append(await app.aresolve(hints[param.name]))
+
+    func = partial(job, *args)
+    try:
+        pickle.dumps(func)
+    except Exception as e:
+        raise PestException(
+            f'Cron job {name} runs in a process, but it or its arguments cannot be pickled: {e}',
+            hint='define its scheduler at module level and only inject picklable values (e.g. '
+            'settings) into it',
+        ) from e
+    return func
+
+
 def repeat_at(
     *,
     cron: str,
     max_repetitions: Optional[int] = None,
     raise_exceptions: bool = False,
+    max_concurrent: int = 1,
+    on_overlap: Overlap = 'skip',
+    executor: Optional[Executor] = None,
+    engine: Optional[SchedulerEngine] = None,
 ) -> Any:
     """
     This function returns a decorator that makes a function execute periodically as per the cron
@@ -63,38 +132,36 @@ def repeat_at(
     - cron: cron-style string for periodic execution, eg. '0 0 * * *' every midnight
     - max_repetitions: Maximum number of times the function should be executed.
       If `None`, it will run indefinitely. Default is `None`.
-    - raise_exceptions: whether to raise exceptions or not. Default is `False`.
+    - raise_exceptions: whether to raise exceptions (and stop repeating) or not. Default is
+      `False`.
+    - max_concurrent: maximum number of runs of the function at the same time. Default is `1`.
+    - on_overlap: what to do when the function is due while it's running `max_concurrent`
+      times: `'skip'` the run, `'queue'` it until a run is over or `'run'` it anyway. Default
+      is `'skip'`.
+    - executor: where the function runs if it's sync: `'thread'` or `'process'` (it must be
+      picklable then). Default is `None` (the thread pool).
+    - engine: the scheduler engine that runs the job. If `None`, a new one is started.
     """
 
     def decorator(func: Callable) -> Any:
         """transform the function into a periodic scheduled job"""
-        is_coroutine = iscoroutinefunction(func)
 
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            repititions = 0
-            if not croniter.is_valid(cron):
-                raise ValueError(f"Invalid cron expression: '{cron}'")
-
-            async def loop(*args: Any, **kwargs: Any) -> None:
-                nonlocal repititions
-                while max_repetitions is None or repititions < max_repetitions:
-                    try:
-                        sleepTime = get_delta(cron)
-                        await sleep(sleepTime)
-                        if is_coroutine:
-                            await func(*args, **kwargs)
-                        else:
-                            await run_in_threadpool(func, *args, **kwargs)
-                        await sleep(0.5)  # sleep for 0.5 seconds to avoid multiple executions
-                    except Exception as e:
-                        if log is not None:
-                            log.exception(e)
-                        if raise_exceptions:
-                            raise e
-                    repititions += 1
-
-            ensure_future(loop(*args, **kwargs))
+            job = CronJob(
+                func.__qualname__,
+                partial(func, *args, **kwargs),
+                schedule_of(cron),
+                max_repetitions=max_repetitions,
+                raise_exceptions=raise_exceptions,
+                max_concurrent=max_concurrent,
+                on_overlap=on_overlap,
+                executor=executor,
+            )
+            target = engine if engine is not None else SchedulerEngine()
+            target.add(job)
+            target.start()
+            return job
 
         return wrapper
 
@@ -102,9 +169,26 @@ def repeat_at(
 
 
 class SchedulerExplorer(OnApplicationBootstrap):
+    """
+    🐀 ⇝ finds the `@cron` jobs of the `@scheduler` services of the application and registers
+    them in the scheduler engine, along with the lock shared by the workers of the application:
+    the `SchedulerLock` provided by the root module, or the one set with the `PEST_SCHEDULER_LOCK`
+    env var, if any. The engine is configured with the `SchedulerOptions` provided by the root
+    module, if any
+    """
+
+    def __init__(self, engine: SchedulerEngine) -> None:
+        self.engine = engine
+
     async def on_application_bootstrap(
         self, app: PestApplication
     ) -> Optional[Coroutine[Any, Any, None]]:
+        if app.can_provide(SchedulerOptions):
+            self.engine.configure(await app.aresolve(SchedulerOptions))
+        self.engine.lock = (
+            await app.aresolve(SchedulerLock) if app.can_provide(SchedulerLock) else lock_from_env()
+        )
+
         for token in app.provides():
             # check if it's a scheduler
             sched_meta = get_meta(token, raise_error=False, output_type=SchedulerMeta)
@@ -117,10 +201,23 @@ class SchedulerExplorer(OnApplicationBootstrap):
                 scheduler = app.resolve(token)
 
                 for job, cron_meta in jobs_in(token):
-                    repeateable = repeat_at(
-                        cron=cron_meta.cron_time, max_repetitions=cron_meta.max_repetitions
-                    )(job)
-                    # calls the decorator to repeat the function at the specified time
-                    repeateable(scheduler)
-
+                    name = job_name(token, job, cron_meta)
+                    func = (
+                        await in_process(app, token, job, name)
+                        if cron_meta.executor == 'process'
+                        else getattr(scheduler, job.__name__)
+                    )
+                    self.engine.add(
+                        CronJob(
+                            name,
+                            func,
+                            schedule_of(cron_meta.cron_time),
+                            max_repetitions=cron_meta.max_repetitions,
+                            max_concurrent=cron_meta.max_concurrent or 1,
+                            on_overlap=cron_meta.on_overlap or 'skip',
+                            executor=cron_meta.executor,
+                        )
+                    )
+
+        self.engine.start()
         return super().on_application_bootstrap(app)
@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+from asyncio import gather, to_thread
+from contextlib import closing
+from typing import Any, List, Optional, Protocol, Sequence, Tuple, runtime_checkable
+
+from ....exceptions.base.pest import PestException
+from ....utils.functions import maybe_coro
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - windows
+    fcntl = None  # type: ignore
+
+LOCK_ENV = 'PEST_SCHEDULER_LOCK'
+'''
+🐀 ⇝ env var that makes the workers of a host share a lock: the path of a lock file, or
+`sqlite:<path>` for a sqlite database
+'''
+
+Fire = Tuple[str, float]
+'''🐀 ⇝ a fire time (as a timestamp) of a job, along with the name of the job'''
+
+
+@runtime_checkable
+class SchedulerLock(Protocol):
+    """
+    🐀 ⇝ lock shared by the workers of an application, so that each fire time of a job runs in
+    only one of them. Provide one (in the root module) to use a backend of your own
+    """
+
+    async def claim(self, fires: Sequence[Fire]) -> List[bool]:
+        """
+        claims some fire times for this worker. Returns, for each one of them, whether it was
+        claimed (i.e. no other worker claimed it before)
+        """
+        ...
+
+
+class KeyValueStore(Protocol):
+    """🐀 ⇝ redis-like client, with an atomic `SET key value NX PX ttl` (sync or async)"""
+
+    def set(self, name: str, value: Any, *, nx: bool, px: int) -> Any: ...
+
+
+class RedisLock:
+    """
+    🐀 ⇝ scheduler lock backed by a redis-like store. Each fire time is claimed by setting a key
+    of its own, if it doesn't exist yet; keys expire after `ttl` seconds
+    """
+
+    def __init__(
+        self, client: KeyValueStore, prefix: str = 'pest:cron:', ttl: float = 3600
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    async def claim(self, fires: Sequence[Fire]) -> List[bool]:
+        px = int(self.ttl * 1000)
+        keys = [f'{self.prefix}{name}:{fire_time!r}' for name, fire_time in fires]
+        claimed = await gather(*(maybe_coro(self.client.set(k, 1, nx=True, px=px)) for k in keys))
+        return [bool(won) for won in claimed]
+
+
+class FileLock:
+    """
+    🐀 ⇝ scheduler lock for the workers of a single host, backed by a file (locked with `fcntl`)
+    that keeps the last fire time claimed for each job
+    """
+
+    def __init__(self, path: str) -> None:
+        if fcntl is None:
+            raise PestException(
+                'File locks are not available in this platform',
+                hint='use a `SQLiteLock` instead',
+            )
+        self.path = path
+
+    async def claim(self, fires: Sequence[Fire]) -> List[bool]:
+        return await to_thread(self.__claim, fires)
+
+    def __claim(self, fires: Sequence[Fire]) -> List[bool]:
+        with open(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), 'r+') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                try:
+                    claims = json.loads(file.read() or '{}')
+                except ValueError:
+                    claims = {}  # a worker died while writing it
+
+                claimed = [claims.get(name, float('-inf')) < fire_time for name, fire_time in fires]
+                if not any(claimed):
+                    return claimed
+
+                claims.update(fire for fire, won in zip(fires, claimed) if won)
+                file.seek(0)
+                file.truncate()
+                json.dump(claims, file)
+                file.flush()
+                return claimed
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+CLAIM = (
+    'INSERT INTO pest_cron_claims (job, fire_time) VALUES (?, ?) '
+    'ON CONFLICT (job) DO UPDATE SET fire_time = excluded.fire_time '
+    'WHERE excluded.fire_time > pest_cron_claims.fire_time'
+)
+
+
+class SQLiteLock:
+    """
+    🐀 ⇝ scheduler lock for the workers of a single host, backed by a sqlite database that keeps
+    the last fire time claimed for each job
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        with closing(self.__connect()) as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS pest_cron_claims '
+                '(job TEXT PRIMARY KEY, fire_time REAL NOT NULL)'
+            )
+
+    async def claim(self, fires: Sequence[Fire]) -> List[bool]:
+        return await to_thread(self.__claim, fires)
+
+    def __connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def __claim(self, fires: Sequence[Fire]) -> List[bool]:
+        with closing(self.__connect()) as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                # the row of a job is only written if the fire time is later than the last one
+                # claimed, so `rowcount` tells whether this worker claimed it
+                claimed = [db.execute(CLAIM, fire).rowcount == 1 for fire in fires]
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+            return claimed
+
+
+def lock_from_env() -> Optional[SchedulerLock]:
+    """🐀 ⇝ the lock set with the `PEST_SCHEDULER_LOCK` env var, if any"""
+    value = os.environ.get(LOCK_ENV)
+    if not value:
+        return None
+    if value.startswith('sqlite:'):
+        return SQLiteLock(value[len('sqlite:') :])
+    return FileLock(value)
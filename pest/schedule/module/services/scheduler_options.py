@@ -0,0 +1,15 @@
+from typing import Optional, TypedDict
+
+
+class SchedulerOptions(TypedDict, total=False):
+    """
+    🐀 ⇝ options of the scheduler engine. Provide them (in the root module) to change its limits,
+    e.g. `ValueProvider(provide=SchedulerOptions, use_value={'max_concurrent': 8})`
+    """
+
+    max_concurrent: Optional[int]
+    '''maximum number of runs (of any job) at the same time. Unlimited by default'''
+    max_threads: int
+    '''number of threads that run sync jobs. Defaults to `4`'''
+    max_processes: Optional[int]
+    '''number of processes that run `'process'` jobs. As many as cpus by default'''
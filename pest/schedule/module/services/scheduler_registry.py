@@ -0,0 +1,109 @@
+from asyncio import Future
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional
+
+from ....exceptions.base.pest import PestException
+from .scheduler_engine import CronJob, JobState, SchedulerEngine
+
+
+def _datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(timestamp) if timestamp is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class JobInfo:
+    """🐀 ⇝ snapshot of the state and stats of a cron job"""
+
+    name: str
+    '''🐀 ⇝ name of the job (its `@cron` name, or `<Scheduler>.<method>`)'''
+    state: JobState
+    '''🐀 ⇝ whether the job is scheduled, paused, stopped or done'''
+    next_run: Optional[datetime]
+    '''🐀 ⇝ next fire time of the job, if it's in the schedule'''
+    last_run: Optional[datetime]
+    '''🐀 ⇝ when the last run of the job started'''
+    last_duration: Optional[float]
+    '''🐀 ⇝ how long the last (finished) run of the job took, in seconds'''
+    runs: int
+    '''🐀 ⇝ number of runs of the job (including the ones in progress)'''
+    errors: int
+    '''🐀 ⇝ number of runs of the job that raised an exception'''
+    running: int
+    '''🐀 ⇝ number of runs of the job in progress'''
+    queued: int
+    '''🐀 ⇝ number of fire times of the job waiting for a run to be over'''
+    skipped: int
+    '''🐀 ⇝ number of fire times of the job dropped because its queue was full'''
+    last_result: Any
+    '''🐀 ⇝ value returned by the last successful run of the job'''
+    last_error: Optional[BaseException]
+    '''🐀 ⇝ exception raised by the last failed run of the job'''
+
+    @classmethod
+    def of(cls, job: CronJob) -> 'JobInfo':
+        return cls(
+            name=job.name,
+            state=job.state,
+            next_run=_datetime(job.next_run),
+            last_run=_datetime(job.last_run),
+            last_duration=job.last_duration,
+            runs=job.runs,
+            errors=job.errors,
+            running=job.running,
+            queued=job.queued,
+            skipped=job.skipped,
+            last_result=job.last_result,
+            last_error=job.last_error,
+        )
+
+
+class SchedulerRegistry:
+    """
+    🐀 ⇝ injectable registry of the cron jobs of the application. It allows inspecting the jobs
+    and starting, stopping, pausing or triggering them (by name) while the application runs,
+    e.g. to shed non-critical jobs under load
+    """
+
+    def __init__(self, engine: SchedulerEngine) -> None:
+        self.engine = engine
+
+    def names(self) -> List[str]:
+        """names of the registered jobs"""
+        return list(self.engine.jobs)
+
+    def jobs(self) -> List[JobInfo]:
+        """state and stats of every registered job"""
+        return [JobInfo.of(job) for job in self.engine.jobs.values()]
+
+    def get(self, name: str) -> JobInfo:
+        """state and stats of a job"""
+        return JobInfo.of(self.__job(name))
+
+    def start(self, name: str) -> None:
+        """puts a paused or stopped job back in the schedule"""
+        self.engine.resume(self.__job(name))
+
+    def stop(self, name: str) -> None:
+        """takes a job out of the schedule (a run in progress isn't stopped)"""
+        self.engine.stop(self.__job(name))
+
+    def pause(self, name: str) -> None:
+        """skips the fire times of a job until it's started again"""
+        self.engine.pause(self.__job(name))
+
+    def trigger(self, name: str) -> Future:
+        """
+        runs a job right away, out of its schedule. Returns the run, which can be awaited for the
+        result of the job
+        """
+        return self.engine.trigger(self.__job(name))
+
+    def __job(self, name: str) -> CronJob:
+        job = self.engine.jobs.get(name)
+        if job is None:
+            raise PestException(
+                f'There is no cron job named {name}',
+                hint=f'registered jobs: {", ".join(self.engine.jobs) or "none"}',
+            )
+        return job
@@ -0,0 +1,12 @@
+from .histogram import Histogram, HistogramExporter
+from .trace import RequestTrace, Span, TraceHook, TracingMiddleware, current_trace
+
+__all__ = [
+    'current_trace',
+    'Histogram',
+    'HistogramExporter',
+    'RequestTrace',
+    'Span',
+    'TraceHook',
+    'TracingMiddleware',
+]
@@ -0,0 +1,121 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .trace import RequestTrace
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+'''🐀 ⇝ default upper bounds (in seconds) of histogram buckets, from 100µs to 10s'''
+
+
+class Histogram:
+    """🐀 ⇝ fixed-bucket histogram of durations (in seconds)"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        upper bound of the bucket containing the `q` (0-1) percentile, or `inf` if it falls above
+        the last bucket
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': dict(zip([*map(str, self.buckets), '+Inf'], self.counts)),
+        }
+
+
+class HistogramExporter:
+    """
+    🐀 ⇝ trace hook that aggregates the durations of every request and span in memory, in one
+    histogram per `(kind, name)` pair (requests are aggregated under the `request` kind, named
+    after their route, e.g. `GET /todo/{id}`)
+
+    ```python
+    exporter = HistogramExporter()
+    app = Pest.create(AppModule, tracing=exporter)
+    ...
+    exporter.histogram('guard', 'AuthGuard').percentile(0.99)
+    ```
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = Lock()
+
+    def __call__(self, trace: RequestTrace) -> None:
+        with self._lock:
+            self._observe('request', trace.name, trace.duration)
+            for span in trace.spans:
+                self._observe(span.kind, span.name, span.duration)
+
+    def _observe(self, kind: str, name: str, value: float) -> None:
+        histogram = self.histograms.get((kind, name))
+        if histogram is None:
+            histogram = self.histograms[(kind, name)] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def histogram(self, kind: str, name: str) -> Optional[Histogram]:
+        """returns the histogram of the given kind and name, if anything was recorded for it"""
+        return self.histograms.get((kind, name))
+
+    def names(self, kind: str) -> List[str]:
+        """returns the names of everything recorded for the given kind"""
+        return [name for k, name in self.histograms if k == kind]
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, object]]]:
+        """returns every histogram as a `{kind: {name: histogram}}` dict"""
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, object]]] = {}
+            for (kind, name), histogram in self.histograms.items():
+                result.setdefault(kind, {})[name] = histogram.as_dict()
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
@@ -0,0 +1,104 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, List, Mapping, Optional, Protocol, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..logging import log
+
+
+@dataclass(frozen=True, slots=True)
+class Span:
+    """🐀 ⇝ a timed step of a request"""
+
+    kind: str
+    '''🐀 ⇝ what was timed: `resolve`, `guard`, `middleware` or `route`'''
+    name: str
+    '''🐀 ⇝ name of the token, guard, middleware or route'''
+    start: float
+    '''🐀 ⇝ seconds since the request started'''
+    duration: float
+    '''🐀 ⇝ duration in seconds (middleware spans include everything that runs after them)'''
+    attributes: Mapping[str, Any] = field(default_factory=dict)
+    '''🐀 ⇝ extra information, e.g. the scope and owner module of a resolved token'''
+
+
+class RequestTrace:
+    """🐀 ⇝ the spans recorded while handling a request"""
+
+    __slots__ = ('method', 'path', 'route', 'status', 'start', 'duration', 'spans')
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.start = perf_counter()
+        self.duration = 0.0
+        self.spans: List[Span] = []
+
+    @property
+    def name(self) -> str:
+        """`METHOD /route/{template}` of the request, or `METHOD <unmatched>` if no route matched"""
+        return f'{self.method} {self.route if self.route is not None else "<unmatched>"}'
+
+    def record(self, kind: str, name: str, start: float, **attributes: Any) -> None:
+        """records a span that started at `start` (a `perf_counter` value) and ends now"""
+        now = perf_counter()
+        self.spans.append(Span(kind, name, start - self.start, now - start, attributes))
+
+    def finish(self) -> None:
+        self.duration = perf_counter() - self.start
+
+
+class TraceHook(Protocol):
+    """🐀 ⇝ receives the trace of each request once the request is done"""
+
+    def __call__(self, trace: RequestTrace) -> None: ...
+
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar('pest_request_trace', default=None)
+
+current_trace: Callable[[], Optional[RequestTrace]] = _current.get
+'''🐀 ⇝ returns the trace of the current request, or `None` if tracing is disabled'''
+
+
+class TracingMiddleware:
+    """
+    🐀 ⇝ pure asgi middleware that starts a `RequestTrace` for each request, makes it available
+    to pest's internals (see `current_trace`) and hands it to the trace hooks when the request is
+    done. It's only added to the middleware stack if there's at least one hook, so tracing costs
+    nothing but a context variable lookup per instrumented step when it's disabled.
+    """
+
+    def __init__(self, app: ASGIApp, hooks: Sequence[TraceHook]) -> None:
+        self.app = app
+        self.hooks = hooks
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] not in ('http', 'websocket'):
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope.get('method', 'WS'), scope['path'])
+
+        async def send_with_status(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                trace.status = message['status']
+            await send(message)
+
+        token = _current.set(trace)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            trace.finish()
+            self.__emit(trace)
+
+    def __emit(self, trace: RequestTrace) -> None:
+        for hook in self.hooks:
+            try:
+                hook(trace)
+            except Exception:
+                log.exception(f'Trace hook {hook!r} failed')
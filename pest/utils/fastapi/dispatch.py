@@ -0,0 +1,234 @@
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette._utils import get_route_path
+from starlette.convertors import PathConvertor
+from starlette.routing import BaseRoute, Match, Route, Router, WebSocketRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ...tracing.trace import current_trace
+
+Candidate = Tuple[int, BaseRoute]
+
+
+class _Node:
+    __slots__ = ('static', 'dynamic', 'routes')
+
+    def __init__(self) -> None:
+        self.static: Dict[str, '_Node'] = {}
+        self.dynamic: Optional['_Node'] = None
+        self.routes: List[Candidate] = []
+
+
+def _segments(path: str) -> List[str]:
+    path = path.strip('/')
+    return path.split('/') if path else []
+
+
+def _toggle_slash(path: str) -> str:
+    return path[:-1] if path.endswith('/') else path + '/'
+
+
+def _mutator(name: str) -> Any:
+    method = getattr(list, name)
+
+    def mutate(self: 'RouteTable', *args: Any, **kwargs: Any) -> Any:
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    mutate.__name__ = name
+    return mutate
+
+
+class RouteTable(List[BaseRoute]):
+    """
+    🐀 ⇝ route list of a router that keeps track of its changes, so that its dispatch index can
+    tell when it's stale (routes added, removed, replaced or reordered)
+    """
+
+    def __init__(self, routes: Sequence[BaseRoute] = ()) -> None:
+        super().__init__(routes)
+        self.version = 0
+
+    append = _mutator('append')
+    extend = _mutator('extend')
+    insert = _mutator('insert')
+    pop = _mutator('pop')
+    remove = _mutator('remove')
+    clear = _mutator('clear')
+    sort = _mutator('sort')
+    reverse = _mutator('reverse')
+    __setitem__ = _mutator('__setitem__')
+    __delitem__ = _mutator('__delitem__')
+    __iadd__ = _mutator('__iadd__')
+    __imul__ = _mutator('__imul__')
+
+
+class RouteIndex:
+    """
+    🐀 ⇝ compiled dispatch index of a route table: a radix trie of the static segments of the
+    routes' paths, with a wildcard branch for the parameterized ones.
+
+    A lookup only returns the routes whose path could match the request (in registration
+    order), so that the router doesn't need to try the regex of every route. Routes that can't
+    be indexed (mounts, hosts and routes with `{param:path}` params) are always candidates.
+
+    Trailing slashes are normalized by the matcher: `/users` and `/users/` reach the same route.
+    """
+
+    def __init__(self) -> None:
+        self.root = _Node()
+        self.fallback: List[Candidate] = []
+        self.routes: Optional[Sequence[BaseRoute]] = None
+        self.version = -1
+
+    def compile(self, routes: Sequence[BaseRoute]) -> None:
+        """(re)builds the index from a route table"""
+        self.root = _Node()
+        self.fallback = []
+
+        for position, route in enumerate(routes):
+            if not isinstance(route, (Route, WebSocketRoute)) or any(
+                isinstance(convertor, PathConvertor)
+                for convertor in route.param_convertors.values()
+            ):
+                self.fallback.append((position, route))
+                continue
+
+            node = self.root
+            for segment in _segments(route.path_format):
+                if '{' in segment:
+                    if node.dynamic is None:
+                        node.dynamic = _Node()
+                    node = node.dynamic
+                else:
+                    node = node.static.setdefault(segment, _Node())
+            node.routes.append((position, route))
+
+        self.routes = routes
+        self.version = getattr(routes, 'version', -1)
+
+    def stale(self, routes: Sequence[BaseRoute]) -> bool:
+        """whether the index wasn't compiled from the current state of a route table"""
+        return (
+            routes is not self.routes
+            or not isinstance(routes, RouteTable)
+            or routes.version != self.version
+        )
+
+    def refresh(self, router: Router) -> None:
+        """
+        compiles the index from the routes of a router, unless it's up to date. The router's
+        route list is swapped for a `RouteTable` first, so that its changes can be told apart
+        """
+        routes = router.routes
+        if not self.stale(routes):
+            return
+
+        if not isinstance(routes, RouteTable):
+            routes = router.routes = RouteTable(routes)
+        self.compile(routes)
+
+    def candidates(self, path: str) -> List[BaseRoute]:
+        """returns the routes that might match a path, in registration order"""
+        segments = _segments(path)
+        found: List[Candidate] = list(self.fallback)
+        stack = [(self.root, 0)]
+
+        while stack:
+            node, depth = stack.pop()
+            if depth == len(segments):
+                found.extend(node.routes)
+                continue
+
+            segment = segments[depth]
+            child = node.static.get(segment)
+            if child is not None:
+                stack.append((child, depth + 1))
+            if node.dynamic is not None and segment:
+                stack.append((node.dynamic, depth + 1))
+
+        if len(found) > 1:
+            found.sort(key=lambda candidate: candidate[0])
+        return [route for _, route in found]
+
+    def match(self, scope: Scope) -> Tuple[Optional[BaseRoute], Scope]:
+        """
+        finds the route that should handle a request, the way starlette's router would (the first
+        full match wins, otherwise the first partial one), and returns it with its child scope
+        """
+        route_path = get_route_path(scope)
+        candidates = self.candidates(route_path)
+        route, child_scope = self.__first(candidates, scope)
+        if route is not None or route_path == '/':
+            return route, child_scope
+
+        # only if no route matches the path as it is, it's tried with(out) its trailing slash
+        alternate = {**scope, 'path': _toggle_slash(scope['path'])}
+        return self.__first(candidates, alternate)
+
+    @staticmethod
+    def __first(candidates: List[BaseRoute], scope: Scope) -> Tuple[Optional[BaseRoute], Scope]:
+        """the first route that fully matches a scope, otherwise the first partial match"""
+        partial: Optional[BaseRoute] = None
+        partial_scope: Scope = {}
+
+        for route in candidates:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, child_scope
+            if match == Match.PARTIAL and partial is None:
+                partial, partial_scope = route, child_scope
+
+        return partial, partial_scope
+
+
+class RouteDispatcher:
+    """
+    🐀 ⇝ ASGI app that dispatches requests to the routes of a router using a `RouteIndex`.
+    Lifespan events are handed over to the router itself, and requests that don't match any
+    route to its default (404) handler. The index is compiled at bootstrap and rebuilt whenever
+    the routes of the router change (see `RouteIndex.refresh`)
+    """
+
+    def __init__(self, app: Router, index: RouteIndex) -> None:
+        self.app = app
+        self.index = index
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self.app(scope, receive, send)
+            return
+
+        self.index.refresh(self.app)
+
+        if 'router' not in scope:
+            scope['router'] = self.app
+
+        route, child_scope = self.index.match(scope)
+        if route is None:
+            await self.app.default(scope, receive, send)
+            return
+
+        scope.update(child_scope)
+        trace = current_trace()
+        if trace is None:
+            await route.handle(scope, receive, send)
+            return
+
+        trace.route = getattr(route, 'path', None)
+        start = perf_counter()
+        try:
+            await route.handle(scope, receive, send)
+        finally:
+            trace.record('route', trace.name, start)
+
+
+def dispatcher(router: Router, index: RouteIndex) -> ASGIApp:
+    """
+    returns the app that dispatches the requests of a router: a `RouteDispatcher`, unless the
+    router has middlewares of its own (which the dispatcher would skip)
+    """
+    if getattr(router.middleware_stack, '__func__', None) is not type(router).app:
+        return router
+    return RouteDispatcher(router, index)
@@ -30,8 +30,8 @@ class PestRouter(APIRouter):
     """
     Extends the `APIRouter` class from FastAPI to handle / at the end of API routes.
     By default, FastAPI redirects routes that end in / to the route without /. This
-    class avoids that behavior and for each route that is added, it adds an alternative
-    route with or without /, as appropriate.
+    class registers each route without its trailing / instead, and pest's dispatcher (see
+    `RouteIndex`) matches requests with or without it to the same route.
     """
 
     routes: List[APIRoute]
@@ -71,74 +71,43 @@ class PestRouter(APIRouter):
         **kwargs: Any,
     ) -> None:
         """
-        Registra un endpoint de la API con la ruta proporcionada y con su ruta alternativa
-        dependiendo de si la ruta proporcionada termina en `/` o no.
+        Registra un endpoint de la API con la ruta proporcionada, sin la `/` final.
 
-        Por ejemplo, si se registra la ruta `/users`, se registrará también la ruta `/users/`
-        y viceversa.
+        Por ejemplo, si se registra la ruta `/users/`, se registrará como `/users`. El dispatcher
+        de pest acepta ambas rutas, por lo que no hace falta registrar una ruta alternativa.
         """
 
         if path.endswith('/'):
             path = path[:-1]
 
-        alternate_path = path + '/'
+        if (self.prefix + path) == '':
+            path = '/'
 
-        if (self.prefix + path) != '':
-            super().add_api_route(
-                path,
-                endpoint,
-                response_model=response_model,
-                status_code=status_code,
-                tags=tags,
-                dependencies=dependencies,
-                summary=summary,
-                description=description,
-                response_description=response_description,
-                responses=responses,
-                deprecated=deprecated,
-                methods=methods,
-                operation_id=operation_id,
-                response_model_include=response_model_include,
-                response_model_exclude=response_model_exclude,
-                response_model_by_alias=response_model_by_alias,
-                response_model_exclude_unset=response_model_exclude_unset,
-                response_model_exclude_defaults=response_model_exclude_defaults,
-                response_model_exclude_none=response_model_exclude_none,
-                include_in_schema=include_in_schema,
-                response_class=response_class,
-                name=name,
-                route_class_override=route_class_override,
-                callbacks=callbacks,
-                openapi_extra=openapi_extra,
-                generate_unique_id_function=generate_unique_id_function,
-            )
-
-        if (self.prefix + alternate_path) != '':
-            super().add_api_route(
-                alternate_path,
-                endpoint,
-                response_model=response_model,
-                status_code=status_code,
-                tags=tags,
-                dependencies=dependencies,
-                summary=summary,
-                description=description,
-                response_description=response_description,
-                responses=responses,
-                deprecated=deprecated,
-                methods=methods,
-                operation_id=operation_id,
-                response_model_include=response_model_include,
-                response_model_exclude=response_model_exclude,
-                response_model_by_alias=response_model_by_alias,
-                response_model_exclude_unset=response_model_exclude_unset,
-                response_model_exclude_defaults=response_model_exclude_defaults,
-                response_model_exclude_none=response_model_exclude_none,
-                include_in_schema=False,
-                response_class=response_class,
-                name=name,
-                route_class_override=route_class_override,
-                callbacks=callbacks,
-                openapi_extra=openapi_extra,
-                generate_unique_id_function=generate_unique_id_function,
-            )
+        super().add_api_route(
+            path,
+            endpoint,
+            response_model=response_model,
+            status_code=status_code,
+            tags=tags,
+            dependencies=dependencies,
+            summary=summary,
+            description=description,
+            response_description=response_description,
+            responses=responses,
+            deprecated=deprecated,
+            methods=methods,
+            operation_id=operation_id,
+            response_model_include=response_model_include,
+            response_model_exclude=response_model_exclude,
+            response_model_by_alias=response_model_by_alias,
+            response_model_exclude_unset=response_model_exclude_unset,
+            response_model_exclude_defaults=response_model_exclude_defaults,
+            response_model_exclude_none=response_model_exclude_none,
+            include_in_schema=include_in_schema,
+            response_class=response_class,
+            name=name,
+            route_class_override=route_class_override,
+            callbacks=callbacks,
+            openapi_extra=openapi_extra,
+            generate_unique_id_function=generate_unique_id_function,
+        )
@@ -114,6 +114,11 @@ async def maybe_coro(stuff: Union[Coroutine[K, U, V], V]) -> V:
         return stuff
 
 
+def token_name(token: Any) -> str:
+    """returns a readable name for a di token (a string, or a class or function's name)"""
+    return token if isinstance(token, str) else getattr(token, '__name__', repr(token))
+
+
 def chain_lifespan(
     *lifespans: Lifespan['PestApplication'],
 ) -> Lifespan['PestApplication']:
@@ -1,49 +1,63 @@
-from typing import Tuple, Union
+from typing import Any, Callable, Optional, Tuple, Union
 
 from .colorize import c
 
 
 def as_tree(
-    obj: Union[object, Tuple[str, str]],
+    obj: Union[object, Tuple[str, Any, object]],
     prefix: str = '',
     is_last: bool = True,
     with_providers: bool = True,
     with_controllers: bool = True,
+    annotate: Optional[Callable[[Any, Any], str]] = None,
 ) -> str:
-    """returns a tree representation of the module and its submodules"""
+    """
+    returns a tree representation of the module and its submodules. If `annotate` is given, it's
+    called with each module, provider and controller (along with the module that contains it) and
+    its result is appended to their names
+    """
     if isinstance(obj, tuple):
-        t, n = obj
+        t, item, module = obj
+        note = annotate(item, module) if annotate else ''
         if t == 'provider':
+            n = _get_provider_name(item)
             obj_name = '│' + c(f'{" ○ " if prefix else ""}{n}', color='magenta')
         else:
+            n = item.__name__
             obj_name = '│' + c(f'{" □ " if prefix else ""}{n}', color='blue')
     else:
+        note = annotate(obj, obj) if annotate else ''
         obj_name = f'{"├─ " if prefix else ""}{obj.__class__.__name__}'
 
     result = ''
 
     if prefix:
-        result += prefix + obj_name + '\n'
+        result += prefix + obj_name + note + '\n'
     else:
-        result += f'{c(obj_name, color="green", attrs=["underline"])} 🐀' + '\n' + '    │\n'
+        result += f'{c(obj_name, color="green", attrs=["underline"])} 🐀{note}' + '\n' + '    │\n'
 
     prefix += '│   ' if not is_last else '    '
 
     if with_providers:
         providers = getattr(obj, 'providers', [])
         for i, provider in enumerate(providers):
-            provider_name = _get_provider_name(provider)
-            result += as_tree(('provider', provider_name), prefix, i == len(providers) - 1)
+            result += as_tree(
+                ('provider', provider, obj), prefix, i == len(providers) - 1, annotate=annotate
+            )
 
     if with_controllers:
         controllers = getattr(obj, 'controllers', [])
         for i, controller in enumerate(controllers):
-            controller_name = controller.__name__
-            result += as_tree(('controller', controller_name), prefix, i == len(controllers) - 1)
+            result += as_tree(
+                ('controller', controller, obj),
+                prefix,
+                i == len(controllers) - 1,
+                annotate=annotate,
+            )
 
     imports = getattr(obj, 'imports', [])
     for i, sub_module in enumerate(imports):
-        result += as_tree(sub_module, prefix, i == len(imports) - 1)
+        result += as_tree(sub_module, prefix, i == len(imports) - 1, annotate=annotate)
 
     return result
 
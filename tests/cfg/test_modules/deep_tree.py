@@ -0,0 +1,33 @@
+from pest.core.module import Module
+from pest.decorators.module import module
+from pest.metadata.types.injectable_meta import ClassProvider, Scope
+
+
+class RootSingleton:
+    pass
+
+
+class LeafConsumer:
+    singleton: RootSingleton
+
+
+def deep_module_tree(depth: int) -> type:
+    """creates a chain of `depth` modules, the root one providing `RootSingleton`"""
+    leaf = module(providers=[LeafConsumer])(type('Depth0', (), {}))
+    for level in range(1, depth):
+        leaf = module(imports=[leaf])(type(f'Depth{level}', (), {}))
+
+    return module(
+        imports=[leaf],
+        providers=[
+            ClassProvider(provide=RootSingleton, use_class=RootSingleton, scope=Scope.SINGLETON)
+        ],
+    )(type('DepthRoot', (), {}))
+
+
+def deepest(root: Module) -> Module:
+    """the deepest module of a chain of modules (the one providing `LeafConsumer`)"""
+    leaf = root
+    while leaf.imports:
+        leaf = leaf.imports[0]
+    return leaf
@@ -1,14 +1,27 @@
+import asyncio
 from datetime import datetime
+from typing import Any, List
+from unittest.mock import patch
 
+import httpx
 import pytest
 from fastapi import Request, Response
 from fastapi.testclient import TestClient
 from pytest import raises
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from pest.core.application import root_module
+from pest.core.module import Module
 from pest.di import inject
-from pest.factory import Pest
-from pest.middleware.base import CallNext, PestMiddleware, PestMiddlwareCallback
+from pest.factory import Pest, openapi
+from pest.middleware.base import (
+    CallNext,
+    PestASGIMiddleware,
+    PestMiddleware,
+    PestMiddlwareCallback,
+)
+from pest.tracing import HistogramExporter, RequestTrace, TracingMiddleware
 
 from .cfg.test_apps.multi_singleton_app.app_module import Repo1, Repo2
 from .cfg.test_apps.todo_app.app_module import AppModule, IdGenerator
@@ -555,3 +568,227 @@ async def test_multiple_singletons_resolves_ok(multiple_singletons_app) -> None:
     r2 = client.get('/ctrl/').json()
     assert r1['repo1'] == r2['repo1']
     assert r1['repo2'] == r2['repo2']
+
+
+def test_app_openapi_lazy_patch(app_n_client) -> None:
+    """🐀 app :: openapi :: should generate and patch the schema on the first request only"""
+    app, client = app_n_client
+
+    assert app.openapi_schema is None
+
+    response = client.get('/openapi.json')
+    assert response.status_code == 200
+    schema = response.json()
+
+    post_todo = schema['paths']['/todo']['post']['responses']
+    assert '422' not in post_todo
+    assert post_todo['400']['content']['application/json']['schema']['$ref'] == (
+        '#/components/schemas/ExceptionResponse'
+    )
+    assert 'HTTPValidationError' not in schema['components']['schemas']
+
+    memoized = app.openapi_schema
+    assert client.get('/openapi.json').json() == schema
+    assert app.openapi() is memoized
+
+
+def test_app_openapi_file(app_n_client, tmp_path) -> None:
+    """🐀 app :: openapi :: should serve a precomputed schema without generating it"""
+    app, _ = app_n_client
+    schema_file = tmp_path / 'openapi.json'
+    openapi.dump(app, str(schema_file))
+
+    precomputed = Pest.create(root_module=AppModule, openapi_file=str(schema_file))
+    with patch('fastapi.applications.get_openapi') as get_openapi:
+        with TestClient(precomputed) as client:
+            response = client.get('/openapi.json')
+
+    get_openapi.assert_not_called()
+    assert response.status_code == 200
+    assert response.json() == app.openapi()
+
+
+class RequestIdMiddleware(PestASGIMiddleware):
+    instances: List['RequestIdMiddleware'] = []
+
+    def __init__(self, app: ASGIApp, id_gen: IdGenerator, header: str = 'X-Request-Id') -> None:
+        self.app = app
+        self.id_gen = id_gen  # 💉 automatically injected
+        self.header = header.lower().encode()
+        self.instances.append(self)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def send_with_id(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                message['headers'] = [*message['headers'], (self.header, self.id_gen().encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
+
+
+def test_pest_asgi_middleware_with_di() -> None:
+    """🐀 app :: middleware ::
+    should allow defining pure asgi middlewares with dependencies injected in their constructor
+    """
+    RequestIdMiddleware.instances.clear()
+
+    app = Pest.create(AppModule, middleware=[RequestIdMiddleware])
+    with TestClient(app) as client:
+        id_1 = client.get('/todo').headers['X-Request-Id']
+        id_2 = client.get('/todo').headers['X-Request-Id']
+
+        stack = app.middleware_stack
+        while stack is not None:
+            assert not isinstance(stack, BaseHTTPMiddleware)
+            stack = getattr(stack, 'app', None)
+
+    assert id_1 != id_2
+    assert len(RequestIdMiddleware.instances) == 1
+    assert isinstance(RequestIdMiddleware.instances[0].id_gen, IdGenerator)
+
+
+async def test_pest_asgi_middleware_concurrent_first_requests() -> None:
+    """🐀 app :: middleware ::
+    should instantiate asgi middlewares only once, even if the first requests are concurrent
+    """
+    RequestIdMiddleware.instances.clear()
+    app = Pest.create(AppModule, middleware=[RequestIdMiddleware])
+    aget = Module.aget
+
+    async def slow_aget(self: Module, *args: Any, **kwargs: Any) -> Any:
+        await asyncio.sleep(0.01)  # lets the other requests in while resolving dependencies
+        return await aget(self, *args, **kwargs)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://pest') as client:
+            with patch.object(Module, 'aget', slow_aget):
+                responses = await asyncio.gather(*(client.get('/todo') for _ in range(5)))
+
+    assert all('X-Request-Id' in response.headers for response in responses)
+    assert len(RequestIdMiddleware.instances) == 1
+
+
+def test_pest_asgi_middleware_add_middleware() -> None:
+    """🐀 app :: middleware ::
+    should inject dependencies into asgi middlewares added with `add_middleware`
+    """
+    app = Pest.create(AppModule)
+    app.add_middleware(RequestIdMiddleware, header='X-Trace-Id')
+
+    with TestClient(app) as client:
+        response = client.get('/todo')
+
+    assert response.status_code == 200
+    assert 'X-Trace-Id' in response.headers
+    assert 'X-Request-Id' not in response.headers
+
+
+def test_pest_middleware_dispatcher_plan() -> None:
+    """🐀 app :: middleware ::
+    should read dispatcher signatures once and resolve singleton dependencies only once
+    """
+    seen = []
+
+    async def pest_middleware(
+        request: Request, call_next: CallNext, repo: TodoRepo, *, id_gen: IdGenerator
+    ) -> Response:
+        seen.append((repo, id_gen))
+        return await call_next(request)
+
+    app = Pest.create(AppModule, middleware=[pest_middleware])
+    with TestClient(app) as client:
+        client.get('/todo')
+
+        with (
+            patch('pest.middleware.base.Signature') as signature,
+            patch.object(Module, 'aget', autospec=True, side_effect=Module.aget) as aget,
+        ):
+            client.get('/todo')
+            client.get('/todo')
+
+    signature.from_callable.assert_not_called()
+    tokens = [call.args[1] for call in aget.call_args_list]
+    assert TodoRepo not in tokens
+    assert tokens.count(IdGenerator) == 2
+
+    repos = {id(repo) for repo, _ in seen}
+    id_gens = {id(id_gen) for _, id_gen in seen}
+    assert len(seen) == 3
+    assert len(repos) == 1
+    assert len(id_gens) == 3
+
+
+def test_app_route_dispatch(app_n_client) -> None:
+    """🐀 app :: routing :: should register routes once and dispatch them with or without /"""
+    app, client = app_n_client
+
+    paths = [route.path for route in app.routes]
+    assert '/todo' in paths
+    assert '/todo/' not in paths
+
+    assert client.get('/todo/').json() == client.get('/todo').json()
+    assert client.get('/todo/2/').json() == client.get('/todo/2').json()
+    assert client.put('/todo/1').status_code == 405
+    assert client.get('/todo/1/nope').status_code == 404
+
+
+def test_app_tracing() -> None:
+    """🐀 app :: tracing :: should trace di resolutions, middlewares and routes of each request"""
+
+    class Middlware(PestMiddleware):
+        id_gen: IdGenerator  # 💉 automatically injected
+
+        async def use(self, request: Request, call_next: CallNext) -> Response:
+            return await call_next(request)
+
+    traces: List[RequestTrace] = []
+    exporter = HistogramExporter()
+
+    app = Pest.create(AppModule, middleware=[Middlware], tracing=[traces.append, exporter])
+    with TestClient(app) as client:
+        assert client.get('/todo').status_code == 200
+        assert client.get('/missing').status_code == 404
+
+    found, missing = traces
+    assert (found.method, found.route, found.status) == ('GET', '/todo', 200)
+    assert (missing.name, missing.status) == ('GET <unmatched>', 404)
+
+    spans = {(span.kind, span.name): span for span in found.spans}
+    assert ('middleware', 'Middlware') in spans
+    assert ('route', 'GET /todo') in spans
+    controller = next(span for span in found.spans if span.name == 'TodoController')
+    assert controller.kind == 'resolve'
+    assert controller.attributes['module'] == 'TodoModule'
+    assert controller.attributes['scope'] is not None
+
+    # middleware spans include everything that runs after them
+    route = spans[('route', 'GET /todo')]
+    middleware = spans[('middleware', 'Middlware')]
+    assert middleware.start <= route.start
+    assert middleware.duration >= route.duration
+    assert found.duration >= middleware.duration
+
+    snapshot = exporter.snapshot()
+    assert snapshot['request']['GET /todo']['count'] == 1
+    assert snapshot['request']['GET <unmatched>']['count'] == 1
+    assert exporter.histogram('resolve', 'TodoController') is not None
+
+
+def test_app_tracing_disabled() -> None:
+    """🐀 app :: tracing :: should not add the tracing middleware if there are no hooks"""
+
+    def middlewares(app: ASGIApp) -> List[type]:
+        classes = []
+        while app is not None:
+            classes.append(type(app))
+            app = getattr(app, 'app', None)
+        return classes
+
+    with TestClient(Pest.create(AppModule)) as client:
+        client.get('/todo')
+        assert TracingMiddleware not in middlewares(client.app.middleware_stack)
+
+    with TestClient(Pest.create(AppModule, tracing=lambda trace: None)) as client:
+        client.get('/todo')
+        assert TracingMiddleware in middlewares(client.app.middleware_stack)
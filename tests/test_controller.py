@@ -86,12 +86,10 @@ def test_controller_handlers_setup():
     assert status(FooController) == Status.READY
 
     router = router_of(FooController)
-    assert len(router.routes) == 2
+    # routes are registered once, trailing slashes are handled by the dispatcher
+    assert len(router.routes) == 1
 
     route = router.routes[0]
-    route_slash = router.routes[1]
 
     assert isinstance(route, APIRoute)
-    assert isinstance(route_slash, APIRoute)
     assert route.path == '/foo/bar'
-    assert route_slash.path == '/foo/bar/'
@@ -1,8 +1,19 @@
-from typing import Tuple
+from typing import List, Tuple
 
+from dij import ActivationScope
 from fastapi.testclient import TestClient
+from pytest import raises
+from starlette.middleware.base import BaseHTTPMiddleware
 
-from pest.core.application import PestApplication
+from pest import controller, get, module
+from pest.core.application import PestApplication, root_module
+from pest.core.pool import release_pooled
+from pest.exceptions.base.pest import PestException
+from pest.factory import Pest
+from pest.metadata.types.injectable_meta import ClassProvider, Scope
+from pest.middleware.di import DIScopeMiddleware
+
+from .cfg.test_modules.di_scopes_primitives import DIScopesModule
 
 
 def test_request_scoped_provider(di_app_n_client: Tuple[PestApplication, TestClient]) -> None:
@@ -77,3 +88,180 @@ def test_transient_always_new_instance(di_app_n_client: Tuple[PestApplication, T
 
     # assert that the ids in r1 and r2 are different (different requests)
     assert r1_head != r2_head
+
+
+def test_request_scope_without_http_middlewares() -> None:
+    """🐀 di :: scoped ::
+    the request scope should be opened by a pure asgi middleware, without any http middleware
+    """
+    app = Pest.create(root_module=DIScopesModule)
+
+    with TestClient(app) as client:
+        r1 = client.get('/scopes/scoped').json()
+        r2 = client.get('/scopes/scoped').json()
+
+        stack = app.middleware_stack
+        while stack is not None and not isinstance(stack, DIScopeMiddleware):
+            assert not isinstance(stack, BaseHTTPMiddleware)
+            stack = getattr(stack, 'app', None)
+
+    assert isinstance(stack, DIScopeMiddleware)
+    assert len(set(r1)) == 1
+    assert len(set(r2)) == 1
+    assert r1 != r2
+
+
+def test_missing_dependency_fails_at_startup() -> None:
+    """🐀 di :: validation :: should fail when the app starts, not on the first request"""
+
+    class Mailer:
+        pass
+
+    @controller('/signup')
+    class SignupController:
+        mailer: Mailer
+
+        @get('/')
+        def signup(self) -> dict:
+            return {}
+
+    @module(controllers=[SignupController])
+    class SignupModule:
+        pass
+
+    with raises(PestException, match='SignupController depends on Mailer, which is not provided'):
+        with TestClient(Pest.create(SignupModule)):
+            pass
+
+
+class UnitOfWork:
+    created = 0
+
+    def __init__(self) -> None:
+        UnitOfWork.created += 1
+        self.changes: List[str] = []
+        self.resets = 0
+
+    def reset(self) -> None:
+        self.changes.clear()
+        self.resets += 1
+
+
+class Orders:
+    def __init__(self, uow: UnitOfWork) -> None:
+        self.uow = uow
+
+
+@controller('/orders')
+class OrdersController:
+    uow: UnitOfWork
+    orders: Orders
+
+    @get('/')
+    def place(self) -> dict:
+        self.orders.uow.changes.append('order')
+        return {'id': id(self.uow), 'changes': list(self.uow.changes), 'resets': self.uow.resets}
+
+
+@module(
+    providers=[
+        ClassProvider(provide=UnitOfWork, use_class=UnitOfWork, scope=Scope.SCOPED, pool=1),
+        Orders,
+    ],
+    controllers=[OrdersController],
+)
+class OrdersModule:
+    pass
+
+
+def test_pooled_provider() -> None:
+    """🐀 di :: pooled ::
+    should reuse (and reset) scoped instances across requests, keeping one per request
+    """
+    with TestClient(Pest.create(OrdersModule)) as client:
+        UnitOfWork.created = 0  # controllers are instantiated (once) while bootstrapping
+        r1 = client.get('/orders').json()
+        r2 = client.get('/orders').json()
+
+    # the instance injected into the controller and into Orders is the same one
+    assert r1['changes'] == r2['changes'] == ['order']
+    assert r1['id'] == r2['id']
+    assert (r1['resets'], r2['resets']) == (0, 1)
+    assert UnitOfWork.created == 1
+
+
+async def test_pooled_provider_bounded() -> None:
+    """🐀 di :: pooled :: should keep at most `pool` idle instances"""
+    app = Pest.create(OrdersModule)
+
+    async with app.router.lifespan_context(app):
+        UnitOfWork.created = 0
+        module = root_module(app)
+        with ActivationScope() as s1, ActivationScope() as s2:
+            first = module.get(UnitOfWork, s1)
+            second = module.get(UnitOfWork, s2)
+            assert first is not second
+            await release_pooled(s1)
+            await release_pooled(s2)
+
+        with ActivationScope() as s3:
+            assert module.get(UnitOfWork, s3) is first
+
+    assert UnitOfWork.created == 2
+
+
+def test_pooled_provider_must_be_scoped() -> None:
+    """🐀 di :: pooled :: should fail at startup when pooling a non-scoped provider"""
+
+    @module(providers=[ClassProvider(provide=UnitOfWork, use_class=UnitOfWork, pool=4)])
+    class TransientPoolModule:
+        pass
+
+    with raises(PestException, match='UnitOfWork is pooled, but only scoped providers'):
+        with TestClient(Pest.create(TransientPoolModule)):
+            pass
+
+
+class RequestState:
+    pass
+
+
+class StatefulUnitOfWork:
+    def __init__(self, state: RequestState) -> None:
+        self.state = state
+
+
+class Repository:
+    def __init__(self, uow: StatefulUnitOfWork) -> None:
+        self.uow = uow
+
+
+def test_pooled_provider_scoped_dependencies() -> None:
+    """🐀 di :: pooled :: should fail at startup when a pooled provider depends on scoped ones"""
+
+    @module(
+        providers=[
+            ClassProvider(provide=RequestState, use_class=RequestState, scope=Scope.SCOPED),
+            ClassProvider(
+                provide=StatefulUnitOfWork,
+                use_class=StatefulUnitOfWork,
+                scope=Scope.SCOPED,
+                pool=4,
+            ),
+            ClassProvider(provide=Repository, use_class=Repository, scope=Scope.SCOPED, pool=4),
+        ]
+    )
+    class LeakyPoolModule:
+        pass
+
+    with raises(PestException) as e:
+        with TestClient(Pest.create(LeakyPoolModule)):
+            pass
+
+    message = str(e.value)
+    assert (
+        'StatefulUnitOfWork is pooled, but depends on RequestState, which is scoped: '
+        'StatefulUnitOfWork -> RequestState'
+    ) in message
+    # pooled tokens are scoped as well
+    assert 'Repository is pooled, but depends on StatefulUnitOfWork, which is scoped' in message
@@ -1,7 +1,31 @@
+import asyncio
 import sys
 from base64 import b64encode
+from typing import Annotated, List, Set
 
 import pytest
+from fastapi import Query, Request
+from fastapi.testclient import TestClient
+
+from pest import (
+    ClassProvider,
+    Guard,
+    GuardCache,
+    GuardCb,
+    GuardCtx,
+    GuardExtra,
+    Pest,
+    Scope,
+    controller,
+    get,
+    meta,
+    module,
+    use_guard,
+    use_guards,
+)
+from pest.exceptions.base.pest import PestException
+from pest.metadata.meta import get_meta
+from pest.tracing import HistogramExporter, RequestTrace
 
 
 @pytest.mark.asyncio
@@ -51,3 +75,367 @@ async def test_guards_typed(guards_annotated_app) -> None:
     unauth = client.get('/secure/typed')
     assert unauth.status_code == 401
     assert unauth.json() == {'code': 401, 'error': 'Unauthorized', 'message': 'Not authenticated'}
+
+
+class GuardClient:
+    """some expensive client a guard would like to keep around"""
+
+
+class CountingGuard(Guard):
+    instances: Set['CountingGuard'] = set()
+    contexts: List[GuardCtx] = []
+    client: GuardClient  # 💉 automatically injected
+
+    def can_activate(self, request: Request, *, context: GuardCtx, set_result: GuardCb) -> bool:
+        self.instances.add(self)
+        self.contexts.append(context)
+        return context.dep('allow') == 'yes'
+
+
+def allow(allow: str = Query('no')) -> str:
+    return allow
+
+
+@controller('/guarded')
+class GuardedController:
+    @get('/')
+    @meta({'roles': ['admin']})
+    @use_guard(CountingGuard, allow=allow)
+    def guarded(self) -> dict:
+        return {'ok': True}
+
+
+@pytest.fixture(autouse=True)
+def clear_counting_guard():
+    CountingGuard.instances.clear()
+    CountingGuard.contexts.clear()
+
+
+def test_guards_resolved_once() -> None:
+    """🐀 guard :: di :: guards should be singletons resolved from the controller's module"""
+
+    @module(controllers=[GuardedController], providers=[GuardClient])
+    class GuardedModule:
+        pass
+
+    with TestClient(Pest.create(GuardedModule)) as client:
+        assert client.get('/guarded/?allow=yes').status_code == 200
+        assert client.get('/guarded/?allow=no').status_code == 403
+        assert client.get('/guarded/?allow=yes').status_code == 200
+
+    assert len(CountingGuard.instances) == 1
+    assert isinstance(CountingGuard.instances.pop().client, GuardClient)
+
+
+def test_guards_request_scoped() -> None:
+    """🐀 guard :: di :: guards provided as scoped should be resolved for each request"""
+
+    @module(
+        controllers=[GuardedController],
+        providers=[
+            GuardClient,
+            ClassProvider(provide=CountingGuard, use_class=CountingGuard, scope=Scope.SCOPED),
+        ],
+    )
+    class ScopedGuardModule:
+        pass
+
+    with TestClient(Pest.create(ScopedGuardModule)) as client:
+        assert client.get('/guarded/?allow=yes').status_code == 200
+        assert client.get('/guarded/?allow=yes').status_code == 200
+
+    assert len(CountingGuard.instances) == 2
+
+
+def test_guards_traced() -> None:
+    """🐀 guard :: tracing :: should record a span for each guard with its verdict"""
+
+    @module(controllers=[GuardedController], providers=[GuardClient])
+    class TracedGuardModule:
+        pass
+
+    traces: List[RequestTrace] = []
+    exporter = HistogramExporter()
+
+    app = Pest.create(TracedGuardModule, tracing=[traces.append, exporter])
+    with TestClient(app) as client:
+        assert client.get('/guarded/?allow=yes').status_code == 200
+        assert client.get('/guarded/?allow=no').status_code == 403
+
+    verdicts = [
+        [span.attributes['allowed'] for span in trace.spans if span.kind == 'guard']
+        for trace in traces
+    ]
+    assert verdicts == [[True], [False]]
+    assert [trace.status for trace in traces] == [200, 403]
+
+    histogram = exporter.histogram('guard', 'CountingGuard')
+    assert histogram is not None and histogram.count == 2
+
+
+def test_guards_context() -> None:
+    """🐀 guard :: context :: should be an immutable per-request view of the handler metadata"""
+
+    @module(controllers=[GuardedController], providers=[GuardClient])
+    class GuardedModule:
+        pass
+
+    with TestClient(Pest.create(GuardedModule)) as client:
+        client.get('/guarded/?allow=yes')
+        client.get('/guarded/?allow=no')
+
+    first, second = CountingGuard.contexts
+    assert first['roles'] == ['admin']
+    assert first.dep('allow') == 'yes'
+    assert second.dep('allow') == 'no'
+
+    with pytest.raises(TypeError):
+        first['roles'] = []  # type: ignore
+
+    # the metadata of the handler is left untouched
+    assert '__pest_guard_deps__' not in get_meta(GuardedController.guarded)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CachedGuard(Guard):
+    calls: List[str] = []
+
+    def can_activate(self, request: Request, *, context: GuardCtx, set_result: GuardCb) -> bool:
+        self.calls.append(context.dep('allow'))
+        set_result({'who': context.dep('allow')})
+        return context.dep('allow') != 'no'
+
+
+clock = Clock()
+guard_cache = GuardCache(key=lambda _, ctx: ctx.dep('allow'), ttl=10, maxsize=2, timer=clock)
+
+
+@controller('/cached')
+@use_guard(CachedGuard, options={'cache': guard_cache}, allow=allow)
+class CachedController:
+    @get('/')
+    def cached(self, who: Annotated[str, GuardExtra]) -> dict:
+        return {'who': who}
+
+    @get('/other')
+    def other(self, who: Annotated[str, GuardExtra]) -> dict:
+        return {'who': who}
+
+
+@module(controllers=[CachedController])
+class CachedModule:
+    pass
+
+
+@pytest.fixture()
+def cached_client():
+    CachedGuard.calls.clear()
+    guard_cache.clear()
+    clock.now = 0.0
+    with TestClient(Pest.create(CachedModule)) as client:
+        yield client
+
+
+def test_guard_cache_hits(cached_client: TestClient) -> None:
+    """🐀 guard :: cache :: should skip the guard for requests with a cached verdict"""
+    assert cached_client.get('/cached/?allow=yes').json() == {'who': 'yes'}
+    assert cached_client.get('/cached/?allow=yes').json() == {'who': 'yes'}
+    assert cached_client.get('/cached/?allow=no').status_code == 403
+    assert cached_client.get('/cached/?allow=no').status_code == 403
+
+    assert CachedGuard.calls == ['yes', 'no']
+    assert (guard_cache.hits, guard_cache.misses) == (2, 2)
+
+    # verdicts are cached per handler
+    assert cached_client.get('/cached/other?allow=yes').json() == {'who': 'yes'}
+    assert CachedGuard.calls == ['yes', 'no', 'yes']
+
+
+def test_guard_cache_ttl(cached_client: TestClient) -> None:
+    """🐀 guard :: cache :: cached verdicts should expire after their ttl"""
+    cached_client.get('/cached/?allow=yes')
+    clock.now = 9.9
+    cached_client.get('/cached/?allow=yes')
+    clock.now = 10.0
+    cached_client.get('/cached/?allow=yes')
+
+    assert CachedGuard.calls == ['yes', 'yes']
+    assert (guard_cache.hits, guard_cache.misses) == (1, 2)
+
+
+def test_guard_cache_lru(cached_client: TestClient) -> None:
+    """🐀 guard :: cache :: should drop the least recently used verdicts when full"""
+    cached_client.get('/cached/?allow=a')
+    cached_client.get('/cached/?allow=b')
+    cached_client.get('/cached/?allow=a')  # hit, `b` is now the least recently used
+    cached_client.get('/cached/?allow=c')  # evicts `b`
+    assert len(guard_cache) == 2
+
+    cached_client.get('/cached/?allow=a')
+    cached_client.get('/cached/?allow=b')
+
+    assert CachedGuard.calls == ['a', 'b', 'c', 'b']
+
+
+events: List[str] = []
+rendezvous: List[asyncio.Event] = []
+
+
+class PingGuard(Guard):
+    async def can_activate(
+        self, request: Request, *, context: GuardCtx, set_result: GuardCb
+    ) -> bool:
+        # only completes if `PongGuard` runs at the same time
+        rendezvous[0].set()
+        await asyncio.wait_for(rendezvous[1].wait(), timeout=1)
+        set_result({'ping': True, 'who': 'ping'})
+        return True
+
+
+class PongGuard(Guard):
+    async def can_activate(
+        self, request: Request, *, context: GuardCtx, set_result: GuardCb
+    ) -> bool:
+        rendezvous[1].set()
+        await asyncio.wait_for(rendezvous[0].wait(), timeout=1)
+        set_result({'pong': True, 'who': 'pong'})
+        return context.dep('allow') != 'no'
+
+
+class SlowGuard(Guard):
+    async def can_activate(
+        self, request: Request, *, context: GuardCtx, set_result: GuardCb
+    ) -> bool:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append('cancelled')
+            raise
+        return True
+
+
+class AllowGuard(Guard):
+    def can_activate(self, request: Request, *, context: GuardCtx, set_result: GuardCb) -> bool:
+        set_result({'by': 'allow'})
+        return context.dep('allow') != 'no'
+
+
+class FailingGuard(Guard):
+    def can_activate(self, request: Request, *, context: GuardCtx, set_result: GuardCb) -> bool:
+        raise RuntimeError('boom')
+
+
+@controller('/composed')
+class ComposedController:
+    @get('/all')
+    @use_guards(PingGuard, PongGuard, allow=allow)
+    def all(self, extras: GuardExtra) -> dict:
+        return extras
+
+    @get('/all-slow')
+    @use_guards(SlowGuard, AllowGuard, allow=allow)
+    def all_slow(self) -> dict:
+        return {}
+
+    @get('/any')
+    @use_guards(SlowGuard, AllowGuard, FailingGuard, options={'mode': 'any'}, allow=allow)
+    def any(self, by: Annotated[str, GuardExtra]) -> dict:
+        return {'by': by}
+
+    @get('/any-failing')
+    @use_guards(FailingGuard, AllowGuard, options={'mode': 'any'}, allow=allow)
+    def any_failing(self) -> dict:
+        return {}
+
+
+@module(controllers=[ComposedController])
+class ComposedModule:
+    pass
+
+
+@pytest.fixture()
+def composed_client():
+    events.clear()
+    with TestClient(Pest.create(ComposedModule), raise_server_exceptions=False) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def fresh_rendezvous():
+    rendezvous[:] = [asyncio.Event(), asyncio.Event()]
+
+
+def test_use_guards_concurrent(composed_client: TestClient) -> None:
+    """🐀 guard :: use_guards :: should evaluate the guards concurrently and merge their extras"""
+    response = composed_client.get('/composed/all?allow=yes')
+    assert response.status_code == 200
+    assert response.json() == {'ping': True, 'pong': True, 'who': 'pong'}
+
+    rendezvous[:] = [asyncio.Event(), asyncio.Event()]
+    assert composed_client.get('/composed/all?allow=no').status_code == 403
+
+
+def test_use_guards_all_short_circuit(composed_client: TestClient) -> None:
+    """🐀 guard :: use_guards :: should deny as soon as a guard denies in `all` mode"""
+    assert composed_client.get('/composed/all-slow?allow=no').status_code == 403
+    assert events == ['cancelled']
+
+
+def test_use_guards_any(composed_client: TestClient) -> None:
+    """🐀 guard :: use_guards :: should allow as soon as a guard allows in `any` mode"""
+    assert composed_client.get('/composed/any?allow=yes').json() == {'by': 'allow'}
+    assert events == ['cancelled']
+
+    assert composed_client.get('/composed/any-failing?allow=yes').status_code == 200
+    # if no guard allows the request, the error of the first failing guard is raised
+    assert composed_client.get('/composed/any-failing?allow=no').status_code == 500
+
+
+def test_use_guards_invalid() -> None:
+    """🐀 guard :: use_guards :: should fail on a missing guard or invalid options"""
+    with pytest.raises(PestException):
+        use_guards()
+
+    with pytest.raises(PestException, match='Invalid guard mode'):
+        use_guards(AllowGuard, options={'mode': 'some'})  # type: ignore
+
+    # options can't be taken for dependencies, nor the other way around
+    with pytest.raises(PestException, match='Unknown guard options: allow'):
+        use_guards(AllowGuard, options={'allow': allow})  # type: ignore
+
+    with pytest.raises(PestException, match='Invalid guard options'):
+        use_guard(AllowGuard, options=allow)  # type: ignore
+
+
+def test_guard_dependencies_named_like_options() -> None:
+    """🐀 guard :: use_guard :: should take `mode` and `cache` keywords as dependencies"""
+
+    class DepsGuard(Guard):
+        def can_activate(self, request: Request, *, context: GuardCtx, set_result: GuardCb) -> bool:
+            set_result({'deps': dict(context.deps())})
+            return True
+
+    def cache() -> str:
+        return 'redis'
+
+    @controller('/deps')
+    class DepsController:
+        @get('/')
+        @use_guard(DepsGuard, mode=allow, cache=cache)
+        def deps(self, extras: GuardExtra) -> dict:
+            return extras
+
+    @module(controllers=[DepsController])
+    class DepsModule:
+        pass
+
+    with TestClient(Pest.create(DepsModule)) as client:
+        response = client.get('/deps?allow=yes')
+        assert response.json() == {'deps': {'mode': 'yes', 'cache': 'redis'}}
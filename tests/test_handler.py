@@ -4,6 +4,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from pest import Pest
+from pest.core.controller import injectors_of
 from pest.decorators.handler import delete, get, head, options, patch, post, put, trace
 from pest.metadata.meta import META_KEY
 from pest.metadata.types._meta import PestType
@@ -233,3 +234,23 @@ def test_handler_can_inject_functional_deps_annotations() -> None:
         assert response.status_code == 200
         assert isinstance(response.json().get('id'), str)
         assert response.json().get('id') == 'foo'
+
+
+def test_injectors_resolution_plan():
+    """🐀 handlers :: injectors :: should compile their resolution plans at module setup"""
+    from .cfg.test_modules.rodi_route_dependencies import FooController, Service
+
+    app = Pest.create(root_module=RodiDependenciesModule)
+
+    with TestClient(app) as client:
+        injectors = injectors_of(FooController)
+        # one for the controller itself in each handler + two injected services
+        assert len(injectors) == 5
+        assert all(injector.plan is not None for injector in injectors)
+
+        service_plans = [i.plan for i in injectors if i.token is Service]
+        assert len(service_plans) == 2
+        assert all(plan.owner is app.__pest_module__ for plan in service_plans)
+
+        response = client.get('/assigned')
+        assert response.status_code == 200
@@ -1,3 +1,5 @@
+import json
+from pathlib import Path
 from typing import Any, List, Optional
 
 try:
@@ -9,9 +11,12 @@ import pytest
 from fastapi.testclient import TestClient
 
 from pest import (
+    ClassProvider,
     OnApplicationBootstrap,
+    OnApplicationShutdown,
     OnModuleInit,
     Pest,
+    Scope,
     ValueProvider,
     controller,
     get,
@@ -229,3 +234,85 @@ async def test_async_lifecycle_hooks() -> None:
             'AsyncController.on_application_bootstrap',
             'AsyncModule.on_application_bootstrap',
         ]
+
+
+def test_shutdown_lifecycle_hooks() -> None:
+    """🐀 lifecycle :: hooks :: should be called on shutdown in reverse order"""
+
+    class Database(OnApplicationShutdown):
+        async def on_application_shutdown(self, app) -> None:
+            LIFECYCLE_CALLS.append('Database.on_application_shutdown')
+
+    class Broken(OnApplicationShutdown):
+        def on_application_shutdown(self, app) -> None:
+            raise RuntimeError('boom')
+
+    @controller('/db')
+    class DbController(OnApplicationShutdown):
+        def on_application_shutdown(self, app) -> None:
+            LIFECYCLE_CALLS.append('DbController.on_application_shutdown')
+
+    @module(
+        controllers=[DbController],
+        providers=[
+            ValueProvider(provide=Database, use_value=Database()),
+            ClassProvider(provide=Broken, use_class=Broken, scope=Scope.SINGLETON),
+        ],
+        exports=[Database],
+    )
+    class DbModule(OnApplicationShutdown):
+        def on_application_shutdown(self, app) -> None:
+            LIFECYCLE_CALLS.append('DbModule.on_application_shutdown')
+
+    @module(imports=[DbModule])
+    class ShutdownModule(OnApplicationShutdown):
+        async def on_application_shutdown(self, app) -> None:
+            LIFECYCLE_CALLS.append('ShutdownModule.on_application_shutdown')
+
+    with TestClient(Pest.create(root_module=ShutdownModule)):
+        assert LIFECYCLE_CALLS == []
+
+    assert LIFECYCLE_CALLS == [
+        'ShutdownModule.on_application_shutdown',
+        'DbModule.on_application_shutdown',
+        'DbController.on_application_shutdown',
+        # a failing hook doesn't prevent the rest of them from being called
+        'Database.on_application_shutdown',
+    ]
+
+
+def test_startup_profile(tmp_path: Path) -> None:
+    """🐀 lifecycle :: profiler :: should record how long each startup step takes"""
+    output = tmp_path / 'profile.json'
+    app = Pest.create(root_module=RootModule, bootstrap={'profile_output': str(output)})
+
+    with TestClient(app):
+        pass
+
+    profile = json.loads(output.read_text())
+
+    assert set(profile['phases']) == {'modules', 'routes', 'application_bootstrap'}
+    assert set(profile['routes']) == {'FooController /foo', 'BarController /bar'}
+
+    root = profile['modules']
+    assert root['name'] == 'RootModule'
+    assert root['setup'] >= root['init']
+    assert root['providers'] == [
+        {
+            'name': 'FooService',
+            'on_module_init': root['providers'][0]['on_module_init'],
+            'on_application_bootstrap': root['providers'][0]['on_application_bootstrap'],
+        }
+    ]
+    assert set(root['controllers'][0]) == {
+        'name',
+        'setup',
+        'on_module_init',
+        'on_application_bootstrap',
+    }
+
+    [child] = root['imports']
+    assert child['name'] == 'ChildModule'
+    assert child['controllers'][0]['name'] == 'BarController'
+    assert root['setup'] >= child['setup']
+    assert root['bootstrap'] >= child['bootstrap']
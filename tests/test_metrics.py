@@ -0,0 +1,119 @@
+import os
+from typing import Dict
+
+from fastapi.testclient import TestClient
+
+from pest import Pest, module
+from pest.metrics import Metrics, MetricsModule, mark_process_dead
+from pest.metrics.module.services.metrics import DURATION, IN_FLIGHT, REQUESTS
+from pest.metrics.store import MmapStore, Sample, read_file, store_path
+
+from .cfg.test_apps.todo_app.app_module import AppModule
+
+TODO_GET_ALL = (('controller', 'TodoController'), ('handler', 'get_all_todos'))
+
+
+@module(imports=[AppModule, MetricsModule])
+class MeteredModule:
+    pass
+
+
+def exposed(text: str) -> Dict[str, float]:
+    """parses the samples of a text exposition"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_per_handler() -> None:
+    """🐀 metrics :: MetricsModule :: should record metrics per controller and handler"""
+
+    with TestClient(Pest.create(MeteredModule)) as client:
+        assert client.get('/todo').status_code == 200
+        assert client.get('/todo/').status_code == 200
+        assert client.get('/todo/999').status_code == 404
+        assert client.get('/missing').status_code == 404
+
+        metrics = client.app.resolve(Metrics)
+        values = metrics.collect()
+        assert values[(REQUESTS, (*TODO_GET_ALL, ('status', '200')))] == 2
+        assert values[(f'{DURATION}_count', TODO_GET_ALL)] == 2
+        assert values[(IN_FLIGHT, TODO_GET_ALL)] == 0
+
+        # unmatched requests and the metrics endpoint itself are not recorded
+        assert all('/missing' not in str(sample) for sample in values)
+
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+        assert '# TYPE pest_http_request_duration_seconds histogram' in response.text
+
+        samples = exposed(response.text)
+        labels = 'controller="TodoController",handler="get_all_todos"'
+        assert samples[f'pest_http_requests_total{{{labels},status="200"}}'] == 2
+        assert samples[f'pest_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 2
+        assert samples[f'pest_http_request_duration_seconds_count{{{labels}}}'] == 2
+        assert (
+            samples[
+                'pest_http_requests_total{controller="TodoController",'
+                'handler="get_todo_by_id",status="404"}'
+            ]
+            == 1
+        )
+        assert not any('MetricsController' in name for name in samples)
+
+
+def test_metrics_multiprocess(tmp_path, monkeypatch) -> None:
+    """🐀 metrics :: multiprocess :: should aggregate the metrics of every worker"""
+
+    monkeypatch.setenv('PEST_METRICS_DIR', str(tmp_path))
+
+    # another worker that handled 3 requests and is handling one more
+    other = os.getpid() + 1
+    counters = MmapStore(store_path(str(tmp_path), 'counter', other))
+    counters.inc((REQUESTS, (*TODO_GET_ALL, ('status', '200'))), 3)
+    gauges = MmapStore(store_path(str(tmp_path), 'gauge', other))
+    gauges.inc((IN_FLIGHT, TODO_GET_ALL), 1)
+
+    with TestClient(Pest.create(MeteredModule)) as client:
+        client.get('/todo')
+
+        samples = exposed(client.get('/metrics').text)
+        labels = 'controller="TodoController",handler="get_all_todos"'
+        assert samples[f'pest_http_requests_total{{{labels},status="200"}}'] == 4
+        assert samples[f'pest_http_requests_in_flight{{{labels}}}'] == 1
+
+        # once the other worker dies, its gauges are dropped but its counters are kept
+        mark_process_dead(other)
+        samples = exposed(client.get('/metrics').text)
+        assert samples[f'pest_http_requests_total{{{labels},status="200"}}'] == 4
+        assert samples[f'pest_http_requests_in_flight{{{labels}}}'] == 0
+
+    counters.close()
+    gauges.close()
+
+
+def test_metrics_mmap_store(tmp_path) -> None:
+    """🐀 metrics :: MmapStore :: should grow and be readable by other processes"""
+
+    path = str(tmp_path / 'counter_1.db')
+    store = MmapStore(path)
+    samples: Dict[Sample, float] = {
+        ('metric', (('label', 'x' * 100), ('n', str(i)))): float(i) for i in range(1000)
+    }
+    for sample, value in samples.items():
+        store.inc(sample, value)
+        store.inc(sample, 0.5)
+
+    assert os.path.getsize(path) > 1 << 16
+    assert read_file(path) == {sample: value + 0.5 for sample, value in samples.items()}
+    store.close()
+
+    # reopening a worker's file (e.g. a recycled pid) keeps its values
+    reopened = MmapStore(path)
+    reopened.inc(('metric', (('label', 'x' * 100), ('n', '0'))), 1)
+    assert reopened.collect()[('metric', (('label', 'x' * 100), ('n', '0')))] == 1.5
+    reopened.close()
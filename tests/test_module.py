@@ -1,9 +1,12 @@
-from typing import cast
+import asyncio
+from typing import Any, Awaitable, Callable, List, cast
+from unittest.mock import patch
 
 import pytest
 from dij import Container
 from pytest import raises
 
+from pest.core.bootstrap import BootstrapContext
 from pest.core.common import status
 from pest.core.module import Status, parent_of
 from pest.core.module import setup_module as _setup_module
@@ -11,7 +14,9 @@ from pest.decorators.module import Module, module
 from pest.exceptions.base.pest import PestException
 from pest.metadata.meta import META_KEY
 from pest.metadata.types._meta import PestType
+from pest.metadata.types.injectable_meta import ClassProvider, FactoryProvider, Scope
 
+from .cfg.test_modules.deep_tree import LeafConsumer, RootSingleton, deep_module_tree, deepest
 from .cfg.test_modules.pest_primitives import (
     FooController,
     Mod,
@@ -218,3 +223,402 @@ def test_parent_of_fn_failing(parent_mod: Module):
     assert 'NotAModule is not a module' in str_ex
     # assert has a hint
     assert '🐀 Hint ⇝' in str_ex
+
+
+def test_module_owner_of(parent_mod: Module):
+    """🐀 modules :: owner_of ::
+    should return the module that actually provides a token, following imports and parents
+    """
+    child_mod = parent_mod.imports[0]
+
+    # exported by the child module
+    assert parent_mod.owner_of(ProviderBar) is child_mod
+    # provided by the module itself
+    assert parent_mod.owner_of(ProviderBaz) is parent_mod
+    # provided by the parent module
+    assert child_mod.owner_of(ProviderBaz) is parent_mod
+
+
+@pytest.mark.asyncio
+async def test_module_resolution_plan(parent_mod: Module):
+    """🐀 modules :: resolution_plan :: should resolve tokens straight from their owner"""
+    child_mod = parent_mod.imports[0]
+
+    plan = parent_mod.resolution_plan(ProviderBar)
+    assert plan.owner is child_mod
+
+    bar = await plan()
+    assert isinstance(bar, ProviderBar)
+    assert bar.do_the_foo() == 'foo'
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('depth', [1, 2, 5, 10, 20])
+async def test_module_resolution_depth_scaling(depth: int):
+    """🐀 modules :: linked providers ::
+    resolving a root provider from a deep module should cost the same regardless of the depth
+    """
+    root = await _setup_module(deep_module_tree(depth))
+    leaf = deepest(root)
+
+    assert leaf.owner_of(RootSingleton) is root
+
+    with patch.object(Container, 'aresolve', autospec=True, side_effect=Container.aresolve) as spy:
+        consumer = await leaf.aget(LeafConsumer)
+        # one call in the leaf container for the consumer, one in the root's for the singleton
+        assert spy.call_count == 2
+
+    assert isinstance(consumer.singleton, RootSingleton)
+    assert consumer.singleton is await root.aget(RootSingleton)
+
+
+def sibling_modules(count: int, calls: List[str], in_flight: List[int]) -> type:
+    """
+    creates a root module importing `count` sibling modules, each one with a singleton whose
+    `on_module_init` hook waits until every sibling hook has started
+    """
+    started = asyncio.Event()
+    waiting: List[int] = [0]
+
+    def hook(name: str) -> Callable[[Any], Awaitable[None]]:
+        async def on_module_init(self) -> None:
+            calls.append(f'{name}:start')
+            waiting[0] += 1
+            in_flight.append(waiting[0])
+            if waiting[0] == count:
+                started.set()
+            try:
+                await asyncio.wait_for(started.wait(), timeout=0.2)
+            finally:
+                waiting[0] -= 1
+            calls.append(f'{name}:end')
+
+        return on_module_init
+
+    siblings = []
+    for i in range(count):
+        service = type(f'SiblingService{i}', (), {'on_module_init': hook(f'Sibling{i}')})
+        provider = ClassProvider(provide=service, use_class=service, scope=Scope.SINGLETON)
+        siblings.append(module(providers=[provider])(type(f'Sibling{i}', (), {})))
+
+    async def root_init(self) -> None:
+        calls.append('Root')
+
+    return module(imports=siblings)(type('SiblingsRoot', (), {'on_module_init': root_init}))
+
+
+@pytest.mark.asyncio
+async def test_module_concurrent_bootstrap():
+    """🐀 modules :: concurrent bootstrap ::
+    should set up sibling modules concurrently and initialize the parent after its imports
+    """
+    calls: List[str] = []
+    in_flight: List[int] = []
+    ctx = BootstrapContext({'concurrent': True})
+
+    root = await _setup_module(sibling_modules(3, calls, in_flight), ctx=ctx)
+
+    assert root.__class_status__ == Status.READY
+    assert max(in_flight) == 3
+    assert calls[:3] == ['Sibling0:start', 'Sibling1:start', 'Sibling2:start']
+    assert calls[-1] == 'Root'
+    assert set(ctx.timings) == {root, *root.imports}
+
+
+@pytest.mark.asyncio
+async def test_module_sequential_bootstrap_by_default():
+    """🐀 modules :: bootstrap :: should set up sibling modules one after another by default"""
+    calls: List[str] = []
+
+    with raises(asyncio.TimeoutError):
+        await _setup_module(sibling_modules(2, calls, []))
+
+    assert calls == ['Sibling0:start']
+
+
+@pytest.mark.asyncio
+async def test_module_concurrent_bootstrap_limit():
+    """🐀 modules :: concurrent bootstrap :: should respect the concurrency limit for hooks"""
+    calls: List[str] = []
+    in_flight: List[int] = []
+    ctx = BootstrapContext({'concurrent': True, 'max_concurrency': 1})
+
+    # hooks can't all be running at once, so they time out waiting for each other
+    with raises(asyncio.TimeoutError):
+        await _setup_module(sibling_modules(2, calls, in_flight), ctx=ctx)
+
+    assert max(in_flight) == 1
+
+
+@pytest.mark.asyncio
+async def test_module_bootstrap_report():
+    """🐀 modules :: bootstrap :: should report the time each module took to bootstrap"""
+    ctx = BootstrapContext({'concurrent': True})
+    root = await _setup_module(sibling_modules(2, [], []), ctx=ctx)
+
+    report = ctx.report(root).splitlines()
+    assert len(report) == 4
+    assert report[1].startswith('SiblingsRoot')
+    assert report[2].startswith('  Sibling0')
+    assert report[3].startswith('  Sibling1')
+
+    root_timing = ctx.timings[root]
+    assert root_timing.setup >= max(ctx.timings[child].setup for child in root.imports)
+    assert root_timing.init <= root_timing.setup
+
+
+@pytest.mark.asyncio
+async def test_module_eager_singletons():
+    """🐀 modules :: eager :: should instantiate eager singletons while bootstrapping"""
+    built: List[str] = []
+
+    def service(name: str, **attrs: Any) -> type:
+        return type(name, (), {'__init__': lambda self: built.append(name), **attrs})
+
+    Eager, Lazy, Hooked = service('Eager'), service('Lazy'), service('Hooked')
+    Hooked.on_module_init = lambda self: None
+
+    @module(
+        providers=[
+            ClassProvider(provide=Eager, use_class=Eager, scope=Scope.SINGLETON),
+            ClassProvider(provide=Lazy, use_class=Lazy, scope=Scope.SINGLETON, eager=False),
+        ]
+    )
+    class EagerByDefault:
+        pass
+
+    eager_module = await _setup_module(EagerByDefault)
+    assert built == ['Eager']
+    await eager_module.aget(Lazy)
+    assert built == ['Eager', 'Lazy']
+
+    built.clear()
+
+    @module(
+        eager=False,
+        providers=[
+            ClassProvider(provide=Eager, use_class=Eager, scope=Scope.SINGLETON, eager=True),
+            ClassProvider(provide=Lazy, use_class=Lazy, scope=Scope.SINGLETON),
+            ClassProvider(provide=Hooked, use_class=Hooked, scope=Scope.SINGLETON),
+        ],
+    )
+    class LazyByDefault:
+        pass
+
+    await _setup_module(LazyByDefault)
+    # singletons with lifecycle hooks are instantiated anyway, to call them
+    assert sorted(built) == ['Eager', 'Hooked']
+
+
+@pytest.mark.asyncio
+async def test_module_eager_singletons_order():
+    """🐀 modules :: eager :: should instantiate singletons after their dependencies,
+    concurrently when they don't depend on each other
+    """
+    calls: List[str] = []
+
+    class Db:
+        pass
+
+    class Cache:
+        pass
+
+    class Repo:
+        def __init__(self, db: Db, cache: Cache) -> None:
+            calls.append('Repo')
+
+    async def connect(name: str) -> None:
+        calls.append(f'{name}:start')
+        await asyncio.sleep(0.01)
+        calls.append(f'{name}:end')
+
+    async def make_db() -> Db:
+        await connect('Db')
+        return Db()
+
+    async def make_cache() -> Cache:
+        await connect('Cache')
+        return Cache()
+
+    @module(
+        providers=[
+            ClassProvider(provide=Repo, use_class=Repo, scope=Scope.SINGLETON),
+            FactoryProvider(provide=Db, use_factory=make_db, scope=Scope.SINGLETON),
+            FactoryProvider(provide=Cache, use_factory=make_cache, scope=Scope.SINGLETON),
+        ]
+    )
+    class Data:
+        pass
+
+    await _setup_module(Data, ctx=BootstrapContext({'concurrent': True}))
+    assert calls == ['Db:start', 'Cache:start', 'Db:end', 'Cache:end', 'Repo']
+
+    calls.clear()
+    await _setup_module(Data)
+    assert calls == ['Db:start', 'Db:end', 'Cache:start', 'Cache:end', 'Repo']
+
+
+@pytest.mark.asyncio
+async def test_module_eager_singletons_fail_fast():
+    """🐀 modules :: eager :: should fail the bootstrap as soon as a singleton can't be built"""
+    cancelled = asyncio.Event()
+
+    class Broken:
+        def __init__(self) -> None:
+            raise ConnectionError('database is down')
+
+    class Slow:
+        pass
+
+    async def make_slow() -> Slow:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return Slow()
+
+    @module(
+        providers=[
+            FactoryProvider(provide=Slow, use_factory=make_slow, scope=Scope.SINGLETON),
+            ClassProvider(provide=Broken, use_class=Broken, scope=Scope.SINGLETON),
+        ]
+    )
+    class BrokenModule:
+        pass
+
+    with raises(PestException, match='Failed to instantiate Broken') as error:
+        await asyncio.wait_for(
+            _setup_module(BrokenModule, ctx=BootstrapContext({'concurrent': True})), timeout=1
+        )
+
+    assert isinstance(error.value.__cause__, ConnectionError)
+    await asyncio.sleep(0)
+    assert cancelled.is_set()
+
+
+class Config:
+    pass
+
+
+class Database:
+    config: Config
+
+
+class UserRepo:
+    def __init__(self, db: Database) -> None:
+        self.db = db
+
+
+class RequestContext:
+    pass
+
+
+@pytest.mark.asyncio
+async def test_module_dependency_graph():
+    """🐀 modules :: dependency graph :: should link dependencies to their owners, in order"""
+
+    @module(providers=[UserRepo, Database], exports=[UserRepo])
+    class Users:
+        pass
+
+    @module(imports=[Users], providers=[Config])
+    class App:
+        pass
+
+    root = await _setup_module(App)
+    users = root.imports[0]
+
+    graph = users.dependency_graph
+    assert graph is not None
+    assert graph.edges[UserRepo] == [(users, Database)]
+    assert graph.edges[Database] == [(root, Config)]
+    assert graph.order.index(Database) < graph.order.index(UserRepo)
+
+
+@pytest.mark.asyncio
+async def test_module_dependency_graph_missing():
+    """🐀 modules :: dependency graph :: should fail before instantiating anything if a token
+    can't be provided
+    """
+    built: List[str] = []
+
+    class Eager:
+        def __init__(self) -> None:
+            built.append('Eager')
+
+    @module(
+        providers=[
+            ClassProvider(provide=Eager, use_class=Eager, scope=Scope.SINGLETON),
+            ClassProvider(provide=UserRepo, use_class=UserRepo, scope=Scope.SINGLETON),
+        ]
+    )
+    class Incomplete:
+        pass
+
+    with raises(PestException, match='UserRepo depends on Database, which is not provided'):
+        await _setup_module(Incomplete)
+
+    assert built == []
+
+
+@pytest.mark.asyncio
+async def test_module_dependency_graph_cycles():
+    """🐀 modules :: dependency graph :: should detect circular dependencies"""
+
+    class Chicken:
+        def __init__(self, egg: 'Egg') -> None: ...
+
+    class Egg:
+        def __init__(self, chicken: Chicken) -> None: ...
+
+    Chicken.__init__.__annotations__['egg'] = Egg
+
+    @module(providers=[Chicken, Egg])
+    class Farm:
+        pass
+
+    with raises(PestException, match='circular dependency: Chicken -> Egg -> Chicken'):
+        await _setup_module(Farm)
+
+
+@pytest.mark.asyncio
+async def test_module_dependency_graph_scopes():
+    """🐀 modules :: dependency graph :: should not let singletons depend on scoped providers"""
+
+    class Handler:
+        context: RequestContext
+
+    class Cache:
+        handler: Handler
+
+    @module(
+        providers=[
+            ClassProvider(provide=RequestContext, use_class=RequestContext, scope=Scope.SCOPED),
+            Handler,
+            ClassProvider(provide=Cache, use_class=Cache, scope=Scope.SINGLETON),
+        ]
+    )
+    class Captive:
+        pass
+
+    with raises(PestException) as error:
+        await _setup_module(Captive)
+
+    assert 'Cache is a singleton, but depends on RequestContext, which is scoped' in str(
+        error.value
+    )
+    assert 'Cache -> Handler -> RequestContext' in str(error.value)
+
+    # transient and scoped providers can depend on scoped ones
+    @module(
+        providers=[
+            ClassProvider(provide=RequestContext, use_class=RequestContext, scope=Scope.SCOPED),
+            Handler,
+            ClassProvider(provide=Cache, use_class=Cache, scope=Scope.SCOPED),
+        ]
+    )
+    class Scoped:
+        pass
+
+    assert (await _setup_module(Scoped)).dependency_graph is not None
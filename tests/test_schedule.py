@@ -1,6 +1,12 @@
 import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List
+from functools import partial
+from multiprocessing import get_context
+from time import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from unittest.mock import patch
 
 import pytest
@@ -9,9 +15,22 @@ from fastapi.testclient import TestClient
 from pest import Pest, ValueProvider, module
 from pest.exceptions.base.pest import PestException
 from pest.metadata.meta import get_meta
-from pest.schedule import ScheduleModule, cron, scheduler
+from pest.schedule import (
+    FileLock,
+    JobState,
+    RedisLock,
+    ScheduleModule,
+    SchedulerLock,
+    SchedulerOptions,
+    SchedulerRegistry,
+    SQLiteLock,
+    cron,
+    scheduler,
+)
 from pest.schedule.decorators.types.cron_meta import SchedulerType
-from pest.schedule.module.services.scheduler_explorer import get_delta, repeat_at
+from pest.schedule.module.services.scheduler_engine import CronJob, SchedulerEngine
+from pest.schedule.module.services.scheduler_explorer import get_delta, repeat_at, schedule_of
+from pest.schedule.module.services.scheduler_lock import LOCK_ENV, Fire, lock_from_env
 
 # region: test fixtures and utilities
 
@@ -32,7 +51,7 @@ def mock_datetime():
 @pytest.fixture
 def mock_sleep():
     """fixture to mock asyncio.sleep"""
-    with patch('pest.schedule.module.services.scheduler_explorer.sleep') as mock_sleep:
+    with patch('pest.schedule.module.services.scheduler_engine.sleep') as mock_sleep:
         mock_sleep.return_value = None
         yield mock_sleep
 
@@ -40,10 +59,37 @@ def mock_sleep():
 @pytest.fixture
 def mock_ensure_future():
     """fixture to mock asyncio.ensure_future"""
-    with patch('pest.schedule.module.services.scheduler_explorer.ensure_future') as mock_ef:
+    with patch('pest.schedule.module.services.scheduler_engine.ensure_future') as mock_ef:
         yield mock_ef
 
 
+class Every:
+    """schedule that fires every `period` seconds"""
+
+    def __init__(self, period: float) -> None:
+        self.period = period
+        self.current = time()
+
+    def get_next(self, ret_type: Any = datetime, start_time: Optional[datetime] = None) -> Any:
+        if start_time is not None:
+            self.current = start_time.timestamp()
+        self.current += self.period
+        return datetime.fromtimestamp(self.current)
+
+
+def dispatchers() -> int:
+    """number of dispatcher tasks of scheduler engines running in the event loop"""
+    return sum('__dispatch' in t.get_coro().__qualname__ for t in asyncio.all_tasks())
+
+
+async def until(condition: Any) -> None:
+    """waits (up to 2 seconds) for a condition to be met"""
+    for _ in range(400):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+
+
 # test classes
 @scheduler
 class FooScheduler:
@@ -160,3 +206,517 @@ def test_schedule_module_required_dependencies():
             importlib.reload(scheduler_module)
 
         assert 'Failed to import croniter' in str(exc_info.value)
+
+
+async def test_engine_single_dispatcher():
+    """🐀 scheduler :: SchedulerEngine :: should run every job from a single dispatcher task"""
+    engine = SchedulerEngine()
+    fired: List[str] = []
+
+    def job(name: str) -> Any:
+        async def run() -> None:
+            fired.append(name)
+
+        return run
+
+    for i in range(50):
+        engine.add(CronJob(f'job{i}', job(f'job{i}'), Every(0.05 + i / 2000), max_repetitions=3))
+    engine.start()
+
+    await asyncio.sleep(0)
+    assert dispatchers() == 1
+
+    await until(lambda: len(fired) == 150 and not engine.running)
+    assert all(fired.count(f'job{i}') == 3 for i in range(50))
+    # the first round fires in order of their next run
+    assert fired[:50] == [f'job{i}' for i in range(50)]
+    assert dispatchers() == 0
+
+
+async def test_engine_wakes_up_for_earlier_jobs():
+    """🐀 scheduler :: SchedulerEngine :: should wake up early when an earlier job is added"""
+    engine = SchedulerEngine()
+    fired: List[str] = []
+
+    async def later() -> None:
+        fired.append('later')
+
+    async def sooner() -> None:
+        fired.append('sooner')
+
+    engine.add(CronJob('later', later, Every(3600)))
+    engine.start()
+    await asyncio.sleep(0.01)
+
+    engine.add(CronJob('sooner', sooner, Every(0.01), max_repetitions=1))
+    await until(lambda: fired)
+
+    assert fired == ['sooner']
+    assert dispatchers() == 1
+    await engine.shutdown()
+
+
+def test_cron_job_skips_missed_runs():
+    """🐀 scheduler :: CronJob :: should skip the fire times it missed while running late"""
+    now = time()
+    job = CronJob('job', lambda: None, schedule_of('* * * * *'))
+    assert now < job.advance(now) <= now + 60
+
+    late = now + 3600
+    assert late < job.advance(late) <= late + 60
+
+
+@scheduler
+class ReportScheduler:
+    @cron('*/5 * * * *', name='cleanup')
+    async def clean_up(self) -> None:
+        pass
+
+    @cron('0 0 * * *')
+    def report(self) -> None:
+        pass
+
+
+def test_registry_jobs():
+    """🐀 scheduler :: SchedulerRegistry :: should expose the registered jobs by name"""
+
+    @module(imports=[ScheduleModule], providers=[ReportScheduler])
+    class ReportModule:
+        pass
+
+    app = Pest.create(ReportModule)
+    with TestClient(app):
+        registry = app.resolve(SchedulerRegistry)
+        assert registry.names() == ['cleanup', 'ReportScheduler.report']
+
+        cleanup = registry.get('cleanup')
+        assert cleanup.state == JobState.SCHEDULED
+        assert cleanup.runs == 0
+        assert 0 < (cleanup.next_run - datetime.now()).total_seconds() <= 300
+
+        with pytest.raises(PestException, match='There is no cron job named missing'):
+            registry.get('missing')
+
+
+async def test_registry_operations():
+    """🐀 scheduler :: SchedulerRegistry :: should start, stop, pause and trigger jobs"""
+    engine = SchedulerEngine()
+    registry = SchedulerRegistry(engine)
+    runs: List[str] = []
+
+    async def tick() -> None:
+        runs.append('tick')
+
+    def fail() -> None:
+        raise RuntimeError('boom')
+
+    engine.add(CronJob('tick', tick, Every(0.01)))
+    engine.add(CronJob('fail', fail, Every(3600)))
+    engine.start()
+
+    await until(lambda: len(runs) >= 2)
+    registry.pause('tick')
+    await asyncio.sleep(0.02)  # a run might have been in progress
+    paused = len(runs)
+    await asyncio.sleep(0.05)
+    assert len(runs) == paused
+    assert registry.get('tick').state == JobState.PAUSED
+    assert registry.get('tick').next_run is not None
+
+    registry.start('tick')
+    await until(lambda: len(runs) > paused)
+    assert registry.get('tick').last_duration is not None
+
+    registry.stop('tick')
+    await asyncio.sleep(0.02)
+    stopped = len(runs)
+    await asyncio.sleep(0.05)
+    assert len(runs) == stopped
+    assert registry.get('tick').next_run is None
+
+    # triggered runs don't put stopped jobs back in the schedule
+    await registry.trigger('tick')
+    assert len(runs) == stopped + 1
+    assert registry.get('tick').state == JobState.STOPPED
+
+    await registry.trigger('fail')
+    failed = registry.get('fail')
+    assert (failed.runs, failed.errors) == (1, 1)
+    assert isinstance(failed.last_error, RuntimeError)
+
+    await engine.shutdown()
+
+
+class Slow:
+    """job that takes `duration` seconds, keeping track of how many of its runs overlap"""
+
+    def __init__(self, duration: float) -> None:
+        self.duration = duration
+        self.runs = 0
+        self.running = 0
+        self.overlap = 0
+
+    async def run(self) -> None:
+        self.runs += 1
+        self.running += 1
+        self.overlap = max(self.overlap, self.running)
+        await asyncio.sleep(self.duration)
+        self.running -= 1
+
+
+async def test_overlap_skip():
+    """🐀 scheduler :: on_overlap :: should skip fire times while the job is running"""
+    engine = SchedulerEngine()
+    slow = Slow(0.05)
+    engine.add(CronJob('slow', slow.run, Every(0.01)))
+    engine.start()
+
+    await until(lambda: slow.runs >= 3)
+    await engine.shutdown()
+    assert slow.overlap == 1
+    assert engine.jobs['slow'].queued == 0
+
+
+async def test_overlap_queue():
+    """🐀 scheduler :: on_overlap :: should queue fire times until a run is over"""
+    engine = SchedulerEngine()
+    slow = Slow(0.05)
+    job = engine.add(CronJob('slow', slow.run, Every(0.01), max_concurrent=2, on_overlap='queue'))
+    engine.start()
+
+    await until(lambda: job.queued == 2)
+    assert slow.overlap == 2
+    await until(lambda: job.skipped > 0)
+
+    engine.stop(job)
+    assert job.queued == 0
+    await until(lambda: not engine.running)
+    assert slow.overlap == 2
+    assert job.repetitions == slow.runs
+
+
+async def test_overlap_run():
+    """🐀 scheduler :: on_overlap :: should run the job anyway"""
+    engine = SchedulerEngine()
+    slow = Slow(0.05)
+    engine.add(CronJob('slow', slow.run, Every(0.01), on_overlap='run', max_repetitions=4))
+    engine.start()
+
+    await until(lambda: slow.runs == 4 and not engine.running)
+    assert slow.overlap > 1
+    assert engine.jobs['slow'].state == JobState.DONE
+
+
+def test_overlap_options():
+    """🐀 scheduler :: on_overlap :: should reject invalid concurrency options"""
+    with pytest.raises(PestException, match='Invalid concurrency options'):
+        CronJob('job', lambda: None, Every(1), max_concurrent=0)
+
+    with pytest.raises(PestException, match='Invalid concurrency options'):
+        CronJob('job', lambda: None, Every(1), on_overlap='wait')  # type: ignore
+
+
+async def test_engine_max_concurrent():
+    """🐀 scheduler :: SchedulerEngine :: should cap the runs of every job at the same time"""
+    engine = SchedulerEngine()
+    engine.configure({'max_concurrent': 2})
+    slow = Slow(0.05)
+    for i in range(5):
+        engine.add(CronJob(f'job{i}', slow.run, Every(0.01), max_repetitions=1))
+    engine.start()
+
+    await until(lambda: slow.runs == 5 and not engine.running)
+    assert slow.overlap == 2
+
+
+def test_scheduler_options():
+    """🐀 scheduler :: SchedulerOptions :: should configure the engine of the ScheduleModule"""
+    slow = Slow(0.05)
+
+    @scheduler
+    class SlowScheduler:
+        @cron('0 0 * * *', name='slow', on_overlap='run')
+        async def slow(self) -> None:
+            await slow.run()
+
+    options = SchedulerOptions(max_concurrent=2, max_threads=1, max_processes=1)
+
+    @module(
+        imports=[ScheduleModule],
+        providers=[ValueProvider(provide=SchedulerOptions, use_value=options), SlowScheduler],
+    )
+    class LimitedModule:
+        pass
+
+    app = Pest.create(LimitedModule)
+    with TestClient(app) as client:
+        engine = app.resolve(SchedulerEngine)
+        registry = app.resolve(SchedulerRegistry)
+        assert (engine.max_concurrent, engine.max_threads, engine.max_processes) == (2, 1, 1)
+
+        async def trigger() -> None:
+            await asyncio.gather(*(registry.trigger('slow') for _ in range(5)))
+
+        client.portal.call(trigger)
+        assert slow.runs == 5
+        assert slow.overlap == 2
+
+        with pytest.raises(PestException, match='already started'):
+            engine.configure(options)
+
+    # the defaults are used when no options are provided
+    assert SchedulerEngine().max_concurrent is None
+    assert SchedulerEngine().max_threads == 4
+
+    with pytest.raises(PestException, match='Invalid scheduler options'):
+        SchedulerEngine().configure({'max_threads': 0})
+
+
+async def test_sync_jobs_run_in_own_threads():
+    """🐀 scheduler :: SchedulerEngine :: should run sync jobs in its own thread pool"""
+    engine = SchedulerEngine()
+    threads: List[str] = []
+
+    def job() -> None:
+        threads.append(threading.current_thread().name)
+
+    engine.add(CronJob('job', job, Every(0.01), max_repetitions=1))
+    engine.start()
+
+    await until(lambda: threads and not engine.running)
+    assert threads[0].startswith('pest-cron')
+    await engine.shutdown()
+    assert engine.threads is None
+
+
+class Settings:
+    def __init__(self, factor: int) -> None:
+        self.factor = factor
+
+
+@scheduler
+class CrunchScheduler:
+    @staticmethod
+    @cron('0 0 * * *', executor='process')
+    def crunch(settings: Settings) -> Any:
+        return settings.factor, os.getpid()
+
+
+def explode() -> None:
+    raise ValueError('boom')
+
+
+async def test_process_jobs():
+    """🐀 scheduler :: executor :: should run jobs in a process and keep their results"""
+    engine = SchedulerEngine()
+    crunch = partial(CrunchScheduler.crunch, Settings(2))
+    job = engine.add(CronJob('crunch', crunch, Every(3600), executor='process'))
+    failing = engine.add(CronJob('explode', explode, Every(3600), executor='process'))
+
+    factor, pid = await engine.trigger(job)
+    assert factor == 2
+    assert pid != os.getpid()
+    assert job.last_result == (2, pid)
+
+    await engine.trigger(failing)
+    assert failing.errors == 1
+    assert isinstance(failing.last_error, ValueError)
+
+    await engine.shutdown()
+    assert engine.processes is None
+
+
+def test_process_jobs_injection():
+    """🐀 scheduler :: executor :: should inject the arguments of process jobs"""
+    settings = Settings(3)
+
+    @module(
+        imports=[ScheduleModule],
+        providers=[ValueProvider(provide=Settings, use_value=settings), CrunchScheduler],
+    )
+    class CrunchModule:
+        pass
+
+    app = Pest.create(CrunchModule)
+    with TestClient(app) as client:
+        engine = app.resolve(SchedulerEngine)
+        registry = app.resolve(SchedulerRegistry)
+        assert engine.jobs['CrunchScheduler.crunch'].func.args == (settings,)
+
+        async def trigger() -> Any:
+            return await registry.trigger('CrunchScheduler.crunch')
+
+        assert client.portal.call(trigger)[0] == 3
+        assert registry.get('CrunchScheduler.crunch').last_result[0] == 3
+        assert engine.processes is not None
+
+    # the pools are shut down along with the application
+    assert engine.processes is None
+    assert not engine.started
+
+
+def test_process_jobs_must_be_static():
+    """🐀 scheduler :: executor :: should reject process jobs that aren't static methods"""
+
+    @scheduler
+    class BoundScheduler:
+        @cron('0 0 * * *', executor='process')
+        def crunch(self) -> None:
+            pass
+
+    @module(imports=[ScheduleModule], providers=[BoundScheduler])
+    class BoundModule:
+        pass
+
+    with pytest.raises(PestException, match='is not a static method'):
+        with TestClient(Pest.create(BoundModule)):
+            pass
+
+    with pytest.raises(PestException, match='Invalid executor'):
+        CronJob('job', explode, Every(1), executor='fork')  # type: ignore
+
+
+class Aligned(Every):
+    """schedule that fires at the multiples of `period` seconds, the same ones in every process"""
+
+    def get_next(self, ret_type: Any = datetime, start_time: Optional[datetime] = None) -> Any:
+        if start_time is not None:
+            self.current = start_time.timestamp()
+        self.current = (self.current // self.period + 1) * self.period
+        return datetime.fromtimestamp(self.current)
+
+
+def cron_worker(lock: SchedulerLock, ready: Any, duration: float) -> Tuple[List[float], int]:
+    """
+    worker process of the multi-process harness: once every worker is `ready`, runs a job for a
+    while, at the same fire times as the other workers. Returns the fire times it claimed and
+    its runs
+    """
+    claimed: List[float] = []
+    runs: List[float] = []
+
+    class RecordingLock:
+        async def claim(self, fires: Sequence[Fire]) -> List[bool]:
+            won = await lock.claim(fires)
+            claimed.extend(fire_time for (_, fire_time), w in zip(fires, won) if w)
+            return won
+
+    async def tick() -> None:
+        runs.append(time())
+
+    async def main() -> None:
+        engine = SchedulerEngine()
+        engine.lock = RecordingLock()
+        engine.add(CronJob('tick', tick, Aligned(0.125)))
+        engine.start()
+        await asyncio.sleep(duration)
+        await engine.shutdown()
+
+    ready.wait()
+    asyncio.run(main())
+    return claimed, len(runs)
+
+
+def run_workers(lock: SchedulerLock, workers: int, duration: float) -> List[Any]:
+    """runs `cron_worker` in some processes at the same time"""
+    context = get_context('spawn')
+    with context.Manager() as manager, ProcessPoolExecutor(workers, mp_context=context) as pool:
+        ready = manager.Barrier(workers)
+        results = [pool.submit(cron_worker, lock, ready, duration) for _ in range(workers)]
+        return [result.result() for result in results]
+
+
+@pytest.mark.parametrize(
+    'backend',
+    [
+        pytest.param(FileLock, marks=pytest.mark.skipif(os.name == 'nt', reason='no fcntl')),
+        SQLiteLock,
+    ],
+)
+def test_lock_multiple_workers(tmp_path, backend):
+    """🐀 scheduler :: SchedulerLock :: should run each fire time in a single worker"""
+    lock = backend(str(tmp_path / 'cron.lock'))
+    results = run_workers(lock, workers=4, duration=1)
+
+    claimed = [fire_time for fire_times, _ in results for fire_time in fire_times]
+    assert len(claimed) >= 4
+    assert len(claimed) == len(set(claimed))
+    assert sum(runs for _, runs in results) == len(claimed)
+
+
+class KeyValue:
+    def __init__(self) -> None:
+        self.values: Dict[str, Any] = {}
+        self.ttls: Dict[str, int] = {}
+
+    def set(self, name: str, value: Any, *, nx: bool, px: int) -> Optional[bool]:
+        if nx and name in self.values:
+            return None
+        self.values[name] = value
+        self.ttls[name] = px
+        return True
+
+
+class AsyncKeyValue(KeyValue):
+    async def set(self, name: str, value: Any, *, nx: bool, px: int) -> Optional[bool]:
+        return super().set(name, value, nx=nx, px=px)
+
+
+@pytest.mark.parametrize('client', [KeyValue, AsyncKeyValue])
+async def test_redis_lock(client):
+    """🐀 scheduler :: SchedulerLock :: should claim fire times in a redis-like store"""
+    store = client()
+    first, second = RedisLock(store, ttl=60), RedisLock(store, ttl=60)
+
+    assert await first.claim([('a', 1.0), ('b', 1.0)]) == [True, True]
+    assert await second.claim([('a', 1.0), ('a', 2.0)]) == [False, True]
+    assert set(store.ttls.values()) == {60_000}
+
+
+def test_lock_configuration(tmp_path, monkeypatch):
+    """🐀 scheduler :: SchedulerLock :: should be provided by the app or set with an env var"""
+    monkeypatch.delenv(LOCK_ENV, raising=False)
+    assert lock_from_env() is None
+
+    monkeypatch.setenv(LOCK_ENV, str(tmp_path / 'cron.lock'))
+    assert isinstance(lock_from_env(), FileLock)
+
+    monkeypatch.setenv(LOCK_ENV, f'sqlite:{tmp_path / "cron.db"}')
+    assert isinstance(lock_from_env(), SQLiteLock)
+
+    lock = RedisLock(KeyValue())
+
+    @module(
+        imports=[ScheduleModule],
+        providers=[ValueProvider(provide=SchedulerLock, use_value=lock), ReportScheduler],
+    )
+    class LockedModule:
+        pass
+
+    app = Pest.create(LockedModule)
+    with TestClient(app):
+        assert app.resolve(SchedulerEngine).lock is lock
+
+
+async def test_lock_skips_unclaimed_fire_times():
+    """🐀 scheduler :: SchedulerLock :: should only run the fire times this worker claims"""
+    claims: List[Fire] = []
+
+    class OddLock:
+        async def claim(self, fires: Sequence[Fire]) -> List[bool]:
+            claims.extend(fires)
+            return [len(claims) % 2 == 1 for _ in fires]
+
+    engine = SchedulerEngine()
+    engine.lock = OddLock()
+    runs: List[float] = []
+
+    async def tick() -> None:
+        runs.append(time())
+
+    job = engine.add(CronJob('tick', tick, Every(0.01), max_repetitions=3))
+    engine.start()
+
+    await until(lambda: job.state == JobState.DONE and not engine.running)
+    assert len(runs) == 3
+    assert len(claims) == 5
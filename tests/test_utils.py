@@ -1,12 +1,19 @@
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass
+from unittest.mock import patch
 
 import pytest
+from starlette.responses import PlainTextResponse
+from starlette.routing import Mount, Route, Router
+from starlette.testclient import TestClient
 
+from pest import ClassProvider, Pest, get
 from pest.core.module import setup_module as _setup_module
 from pest.exceptions.http.http import exc_response
-from pest.metadata.meta import get_meta, get_meta_value
+from pest.metadata.meta import get_meta, get_meta_value, inject_metadata
+from pest.metadata.types.handler_meta import HandlerMeta
 from pest.utils.colorize import c
 from pest.utils.decorators import meta
+from pest.utils.fastapi.dispatch import RouteDispatcher, RouteIndex, RouteTable
 from pest.utils.module import _get_provider_name, as_tree
 
 from .cfg.test_modules.pest_primitives import FooModule
@@ -101,6 +108,80 @@ def test_meta_docorator_dataclass_meta():
     assert metadata == {'foo': 'foo', 'baz': 'baz'}
 
 
+def test_meta_snapshots():
+    """🐀 utils :: `get_meta` :: should cache dataclass snapshots until the metadata changes"""
+
+    @dataclass
+    class QuuxMeta:
+        foo: str
+
+    @meta({'foo': 'bar', 'baz': 'qux'})
+    class Quux:
+        pass
+
+    snapshot = get_meta(Quux, QuuxMeta)
+    assert get_meta(Quux, QuuxMeta) is snapshot
+    # snapshots are cached per output type and cleaning options
+    assert get_meta(Quux, QuuxMeta, clean=True, drop=['baz']) is not snapshot
+
+    inject_metadata(Quux, foo='quux')
+    updated = get_meta(Quux, QuuxMeta)
+    assert updated is not snapshot
+    assert updated.foo == 'quux'
+
+    # modifying the raw metadata also drops the snapshots
+    get_meta(Quux)['foo'] = 'corge'
+    assert get_meta(Quux, QuuxMeta).foo == 'corge'
+
+
+def test_meta_records():
+    """🐀 utils :: `get_meta` :: should store pest's metadata as is and expose it as a dict"""
+
+    @meta({'roles': ['admin']})
+    @get('/foo', summary='foo')
+    def handler() -> None:
+        pass
+
+    record = get_meta(handler, HandlerMeta)
+    assert isinstance(record, HandlerMeta)
+    assert get_meta(handler, HandlerMeta) is record
+    assert not hasattr(record, '__dict__')
+    with pytest.raises(FrozenInstanceError):
+        record.path = '/bar'  # type: ignore
+
+    # dict view
+    view = get_meta(handler)
+    assert view['path'] == '/foo'
+    assert view['summary'] == 'foo'
+    assert view['roles'] == ['admin']
+    assert get_meta_value(handler, 'methods') == ['GET']
+    assert record.methods == ('GET',)  # the record keeps its lists as tuples
+
+    # metadata that's not part of the record (or that doesn't change it) leaves it untouched
+    inject_metadata(handler, tags=None, extra=True)
+    assert get_meta(handler, HandlerMeta) is record
+
+    # overriding one of its fields replaces it
+    inject_metadata(handler, summary='bar')
+    updated = get_meta(handler, HandlerMeta)
+    assert updated is not record
+    assert updated.summary == 'bar'
+    assert updated.path == '/foo'
+
+
+def test_provider_subclasses():
+    """🐀 utils :: providers :: should be extensible by user dataclasses"""
+
+    @dataclass
+    class TaggedProvider(ClassProvider):
+        tag: str = ''
+
+    provider = TaggedProvider(provide=HandlerMeta, use_class=HandlerMeta, tag='meta')
+    provider.tag = 'record'
+    assert provider.tag == 'record'
+    assert provider.scope is None
+
+
 def test_exception_example_generator():
     """
     🐀 utils :: `exc_response` :: should generate the right example response for a given error code
@@ -123,3 +204,101 @@ def test_exception_example_generator():
         'message': 'Detailed error message',
         'error': "I'm a teapot",
     }
+
+
+def _endpoint(request) -> PlainTextResponse:
+    return PlainTextResponse('ok')
+
+
+def _scope(path: str, method: str = 'GET') -> dict:
+    return {'type': 'http', 'path': path, 'root_path': '', 'method': method}
+
+
+def test_route_index():
+    """🐀 utils :: route index :: should match routes the way starlette's router does"""
+    routes = [
+        Route('/users/{id}', _endpoint, name='user'),
+        Route('/users/me', _endpoint, name='me'),
+        Route('/users', _endpoint, name='create', methods=['POST']),
+        Route('/users', _endpoint, name='list', methods=['GET']),
+        Route('/files/{path:path}', _endpoint, name='files'),
+        Mount('/static', routes=[Route('/{name}', _endpoint)], name='static'),
+    ]
+    index = RouteIndex()
+    index.compile(routes)
+
+    def name_of(path: str, method: str = 'GET') -> object:
+        route, _ = index.match(_scope(path, method))
+        return route.name if route is not None else None
+
+    # registration order wins, even over more specific static routes
+    assert name_of('/users/me') == 'user'
+    assert index.match(_scope('/users/42'))[1]['path_params'] == {'id': '42'}
+    assert name_of('/users') == 'list'
+    assert name_of('/users', 'POST') == 'create'
+    # partial matches (wrong method) are returned if there's no full one
+    assert name_of('/users/1', 'DELETE') == 'user'
+    assert name_of('/files/a/b/c.txt') == 'files'
+    assert isinstance(index.match(_scope('/static/app.js'))[0], Mount)
+    assert name_of('/nope') is None
+    assert name_of('/users/1/nope') is None
+
+    # candidates only include the routes that might match
+    assert [r.name for r in index.candidates('/users/me')] == ['user', 'me', 'files', 'static']
+
+
+def test_route_index_trailing_slash():
+    """🐀 utils :: route index :: should match paths with or without their trailing slash"""
+    index = RouteIndex()
+    index.compile([Route('/users', _endpoint, name='users'), Route('/', _endpoint, name='root')])
+
+    assert index.match(_scope('/users/'))[0].name == 'users'
+    assert index.match(_scope('/users'))[0].name == 'users'
+    assert index.match(_scope('/'))[0].name == 'root'
+
+    # the exact path wins over the path with(out) its trailing slash, whatever the route order
+    index.compile(
+        [
+            Route('/users/{id}/', _endpoint, name='slash'),
+            Route('/users/{id}', _endpoint, name='bare'),
+        ]
+    )
+    assert index.match(_scope('/users/1'))[0].name == 'bare'
+    assert index.match(_scope('/users/1/'))[0].name == 'slash'
+    assert index.match(_scope('/users/1'))[1]['path_params'] == {'id': '1'}
+
+
+def _text(text: str) -> Route:
+    return Route('/hello', lambda _: PlainTextResponse(text))
+
+
+def test_route_dispatcher_recompiles():
+    """🐀 utils :: route dispatcher :: should rebuild its index whenever the routes change"""
+    router = Router(routes=[_text('first'), Route('/other', _endpoint)])
+    client = TestClient(RouteDispatcher(router, RouteIndex()))
+
+    assert client.get('/hello').text == 'first'
+
+    # same number of routes, but a different one
+    router.routes[0] = _text('replaced')
+    assert client.get('/hello').text == 'replaced'
+
+    router.routes.reverse()
+    router.routes.insert(0, _text('inserted'))
+    assert client.get('/hello').text == 'inserted'
+
+    router.routes = [_text('swapped')]
+    assert client.get('/hello').text == 'swapped'
+
+
+def test_route_index_compiled_at_bootstrap():
+    """🐀 utils :: route dispatcher :: should compile the index once, while the app starts"""
+    with patch.object(RouteIndex, 'compile', autospec=True, side_effect=RouteIndex.compile) as spy:
+        app = Pest.create(FooModule)
+        with TestClient(app) as client:
+            assert spy.call_count == 1
+            assert isinstance(app.router.routes, RouteTable)
+
+            assert client.get('/openapi.json').status_code == 200
+            assert client.get('/missing').status_code == 404
+            assert spy.call_count == 1